@@ -3,6 +3,7 @@
 Usage:
     python3 scripts/qa/extract_paper_trade_metrics.py --input outputs/paper_trade_report.json --output outputs/paper_trade_metrics.json
 """
+
 import argparse
 import json
 from pathlib import Path
@@ -17,6 +18,8 @@ def extract(input_path: Path, output_path: Path) -> dict:
         "final_net": final_net,
         "trades_count": len(trades),
     }
+    # Equity-curve metrics (max drawdown, exposure, Sharpe) computed by the simulator.
+    metrics.update(data.get("metrics") or {})
     output_path.write_text(json.dumps(metrics, indent=2))
     return metrics
 
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
-Validate OHLCV CSV for MATRIX (docs-first, stdlib-only).
+Validate OHLCV CSV for MATRIX (docs-first).
 Checks columns, UTC timestamps, monotonicity, duplicates, volume, gaps.
+
+Uses the shared typed reader (matrix.sensor.ohlcv.read_ohlcv_csv) and
+vectorized checks when pandas/numpy are installed; otherwise falls back to a
+stdlib-only row scan with the same checks and messages.
 """
 
 import argparse
@@ -10,49 +14,87 @@ import pathlib
 import datetime
 import sys
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
 
-def main():
-    parser = argparse.ArgumentParser(description="Validate OHLCV CSV for MATRIX.")
-    parser.add_argument("--file", required=True)
-    parser.add_argument("--timeframe", required=True)
-    args = parser.parse_args()
-    path = pathlib.Path(args.file)
-    required_cols = ["datetime", "open", "high", "low", "close", "volume"]
+try:
+    import numpy as np
+    from src.matrix.sensor.ohlcv import read_ohlcv_csv
+except ImportError:  # stdlib-only environments
+    np = None
+    read_ohlcv_csv = None
+
+REQUIRED_COLS = ["datetime", "open", "high", "low", "close", "volume"]
+BAR_SECONDS = 300
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def scan_fast(path):
+    """Return (n_rows, non_increasing, bad_volume, gaps) via the typed reader."""
+    df = read_ohlcv_csv(
+        path, time_col="datetime", usecols=["volume"], time_format=TIME_FORMAT
+    )
+    deltas = np.diff(df.index.asi8)
+    return (
+        len(df),
+        int(np.count_nonzero(deltas <= 0)),
+        int(np.count_nonzero(df["volume"].to_numpy() <= 0)),
+        int(np.count_nonzero(deltas != BAR_SECONDS * 10**9)),
+    )
+
+
+def scan_stdlib(path):
+    """Return (n_rows, non_increasing, bad_volume, gaps) with csv/strptime."""
     rows = []
     with open(path) as f:
         reader = csv.DictReader(f)
         for row in reader:
             rows.append(row)
-    # Check columns
-    fieldnames = reader.fieldnames or []
-    if not all(col in fieldnames for col in required_cols):
-        print(f"Missing columns: {set(required_cols) - set(fieldnames)}")
-        sys.exit(1)
-    # Check timestamps
     times = []
     for r in rows:
         try:
-            dt = datetime.datetime.strptime(r["datetime"], "%Y-%m-%d %H:%M:%S")
+            dt = datetime.datetime.strptime(r["datetime"], TIME_FORMAT)
             times.append(dt)
         except Exception:
-            print(f"Bad timestamp: {r['datetime']}")
-            sys.exit(1)
+            raise ValueError(f"Bad timestamp: {r['datetime']}")
+    pairs = list(zip(times, times[1:]))
+    return (
+        len(rows),
+        sum(t2 <= t1 for t1, t2 in pairs),
+        sum(float(r["volume"]) <= 0 for r in rows),
+        sum((t2 - t1).total_seconds() != BAR_SECONDS for t1, t2 in pairs),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate OHLCV CSV for MATRIX.")
+    parser.add_argument("--file", required=True)
+    parser.add_argument("--timeframe", required=True)
+    args = parser.parse_args()
+    path = pathlib.Path(args.file)
+    # Check columns
+    with open(path, newline="") as f:
+        fieldnames = next(csv.reader(f), [])
+    if not all(col in fieldnames for col in REQUIRED_COLS):
+        print(f"Missing columns: {set(REQUIRED_COLS) - set(fieldnames)}")
+        sys.exit(1)
+    # Check timestamps
+    try:
+        scan = scan_fast if read_ohlcv_csv is not None else scan_stdlib
+        n_rows, non_increasing, bad_vol, gaps = scan(path)
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
     # Monotonicity & duplicates
-    if any(t2 <= t1 for t1, t2 in zip(times, times[1:])):
+    if non_increasing:
         print("Timestamps not strictly increasing or duplicate found.")
         sys.exit(1)
     # Volume check
-    bad_vol = sum(float(r["volume"]) <= 0 for r in rows)
     if bad_vol:
         print(f"Warning: {bad_vol} rows with volume <= 0.")
     # Gaps check (for 5m)
-    gaps = 0
-    for t1, t2 in zip(times, times[1:]):
-        if (t2 - t1).total_seconds() != 300:
-            gaps += 1
-    if gaps > len(times) * 0.1:
+    if gaps > n_rows * 0.1:
         print(f"Warning: {gaps} gaps detected (>10%).")
-    print(f"Checked {len(rows)} rows: OK")
+    print(f"Checked {n_rows} rows: OK")
     sys.exit(0)
 
 
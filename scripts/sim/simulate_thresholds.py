@@ -6,20 +6,53 @@ Purpose: Generate synthetic prediction series, map to signals, compute proxy met
 Usage:
     python simulate_thresholds.py --len 500 --noise 0.2 --up 0.1 --dn -0.1 --hysteresis 0.02 --cooldown 3 --out docs/summaries/SIM_SUMMARY_<TAG>.md
 
+Sweep mode (all combinations, process pool, one results table):
+    python simulate_thresholds.py --sweep --len 100000 --up-range 0.05:0.5:0.05 --dn-range=-0.5:-0.05:0.05 \
+        --hysteresis-range 0,0.02,0.05 --cooldown-range 0:6:1 --workers 8 --out outputs/sweep.csv
+
+Ranges are start:stop:step (inclusive) or comma-separated values (write --flag=value for negative
+ranges); a missing range falls back to the single-value flag. The prediction array is placed in
+shared memory once and read by every worker.
+
+--preds FILE scores a real prediction series (model output) instead of the synthetic one, in
+both modes: .npy (1-D array) or a .parquet/.pkl/.csv table, whose column is picked with
+--pred-column (default: "pred", or the only column of a one-column table). NaN predictions
+never trigger.
+
 Output: Markdown summary with trigger_rate, long/short split, churn proxy, avg hold bars, ASCII sparkline.
+Sweep output: CSV (or Parquet when --out ends with .parquet) with one row per combination.
 
 NO LIVE ACTION; OFFLINE ONLY.
 """
 
 import argparse
+import csv
 import math
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
 import sys
 import textwrap
 
-sys.path.insert(0, "src/matrix/strategy")
-from mapping import map_predictions_to_signals
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.matrix.strategy.mapping import (  # noqa: E402
+    GRID_COLUMNS,
+    map_predictions_grid,
+    map_predictions_to_signals,
+    threshold_grid,
+)
+from src.matrix.strategy.signal_metrics import (  # noqa: E402
+    COUNT_KEYS,
+    METRIC_KEYS,
+    signal_metrics,
+)
+
+SWEEP_COLUMNS = list(GRID_COLUMNS) + list(METRIC_KEYS) + list(COUNT_KEYS)
 
 
 def generate_preds(length: int, noise: float) -> list[float]:
@@ -29,56 +62,71 @@ def generate_preds(length: int, noise: float) -> list[float]:
     ]
 
 
+def load_preds(path, column: str | None = None) -> np.ndarray:
+    """Read a prediction series from .npy or a .parquet/.pkl/.csv table column."""
+    path = Path(path)
+    if path.suffix == ".npy":
+        return np.asarray(np.load(path), dtype=np.float64).ravel()
+    import pandas as pd
+
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=[column] if column else None)
+    elif path.suffix == ".pkl":
+        df = pd.read_pickle(path)
+    elif path.suffix == ".csv":
+        df = pd.read_csv(path)
+    else:
+        raise ValueError(f"Unsupported prediction file: {path.suffix}")
+    if isinstance(df, pd.Series):
+        return df.to_numpy(dtype=np.float64)
+    if column is None:
+        if "pred" in df.columns:
+            column = "pred"
+        elif len(df.columns) == 1:
+            column = df.columns[0]
+        else:
+            raise ValueError(
+                f"{path} has several columns {list(df.columns)}; pass --pred-column"
+            )
+    if column not in df.columns:
+        raise KeyError(f"Column {column!r} not in {path}")
+    return df[column].to_numpy(dtype=np.float64)
+
+
 def ascii_sparkline(vals: list[float], width: int = 60) -> str:
-    minv, maxv = min(vals), max(vals)
+    # Non-finite values (NaN predictions) are drawn as blanks
+    arr = np.asarray(vals, dtype=np.float64)
+    finite = arr[np.isfinite(arr)]
+    minv, maxv = (finite.min(), finite.max()) if finite.shape[0] else (0.0, 0.0)
     scale = (maxv - minv) or 1
-    step = max(1, len(vals) // width)
+    step = max(1, len(arr) // width)
     chars = "▁▂▃▄▅▆▇█"
     out = ""
-    for i in range(0, len(vals), step):
-        v = vals[i]
+    for i in range(0, len(arr), step):
+        v = arr[i]
+        if not np.isfinite(v):
+            out += " "
+            continue
         idx = int((v - minv) / scale * (len(chars) - 1))
         out += chars[idx]
     return out
 
 
 def compute_metrics(signals: dict, preds: list[float], cooldown: int) -> dict:
-    entries = sum(signals["enter_long"]) + sum(signals["enter_short"])
-    exits_lt_cooldown = 0
-    last_entry = None
-    for i, (el, es) in enumerate(zip(signals["enter_long"], signals["enter_short"])):
-        if el or es:
-            last_entry = i
-        if signals["exit_long"][i] or signals["exit_short"][i]:
-            if last_entry is not None and (i - last_entry) < cooldown:
-                exits_lt_cooldown += 1
-            last_entry = None
-    hold_times = []
-    state = None
-    entry_idx = None
-    for i, (el, es) in enumerate(zip(signals["enter_long"], signals["enter_short"])):
-        if el or es:
-            state = "long" if el else "short"
-            entry_idx = i
-        if state and (signals["exit_long"][i] or signals["exit_short"][i]):
-            hold_times.append(i - entry_idx)
-            state = None
-    avg_hold = round(sum(hold_times) / len(hold_times), 2) if hold_times else 0
-    trigger_rate = round(entries / len(preds), 4)
-    long_rate = round(sum(signals["enter_long"]) / entries, 4) if entries else 0
-    short_rate = round(sum(signals["enter_short"]) / entries, 4) if entries else 0
-    churn_rate = round(exits_lt_cooldown / entries, 4) if entries else 0
+    m = signal_metrics(signals, cooldown)
+    has_entries = m["n_entries"] > 0
     return dict(
-        trigger_rate=trigger_rate,
-        long_rate=long_rate,
-        short_rate=short_rate,
-        churn_rate=churn_rate,
-        avg_hold=avg_hold,
+        trigger_rate=round(m["trigger_rate"], 4),
+        long_rate=round(m["long_rate"], 4) if has_entries else 0,
+        short_rate=round(m["short_rate"], 4) if has_entries else 0,
+        churn_rate=round(m["churn_rate"], 4) if has_entries else 0,
+        avg_hold=round(m["avg_hold"], 2) if m["n_holds"] else 0,
     )
 
 
 def render_summary(metrics: dict, preds: list[float], args) -> str:
-    return textwrap.dedent(f"""
+    return textwrap.dedent(
+        f"""
     # MATRIX Synthetic Simulator Summary
 
     **Parameters:**
@@ -98,7 +146,82 @@ def render_summary(metrics: dict, preds: list[float], args) -> str:
 
     **Predictions Sparkline:**
     {ascii_sparkline(preds)}
-    """)
+    """
+    )
+
+
+def parse_range(spec: str) -> list[float]:
+    """Parse 'start:stop:step' (inclusive stop) or 'a,b,c' into a list of floats."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {spec}")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 10) for i in range(max(count, 0))]
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+
+# Worker-side view of the shared prediction array (set by _attach_preds).
+_SHM = None
+_PREDS = None
+
+
+def _attach_preds(name: str, length: int) -> None:
+    global _SHM, _PREDS
+    _SHM = shared_memory.SharedMemory(name=name)
+    _PREDS = np.ndarray((length,), dtype=np.float64, buffer=_SHM.buf)
+
+
+def _sweep_chunk(params: np.ndarray) -> dict:
+    return map_predictions_grid(_PREDS, params, stats_only=True)
+
+
+def run_sweep(preds, grid: np.ndarray, workers: int) -> dict:
+    """
+    Evaluate every grid row over preds and return column arrays (SWEEP_COLUMNS).
+
+    The grid is split into contiguous chunks (rows sharing UP/DOWN levels stay
+    together so workers reuse threshold crossings); predictions are shared via
+    multiprocessing.shared_memory rather than pickled into each task.
+    """
+    arr = np.asarray(preds, dtype=np.float64)
+    if workers <= 1 or len(grid) <= 1:
+        results = [map_predictions_grid(arr, grid, stats_only=True)]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        try:
+            np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)[:] = arr
+            chunks = np.array_split(grid, min(len(grid), workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_preds,
+                initargs=(shm.name, arr.shape[0]),
+            ) as pool:
+                results = list(pool.map(_sweep_chunk, chunks))
+        finally:
+            shm.close()
+            shm.unlink()
+    merged = {k: np.concatenate([r[k] for r in results]) for k in results[0]}
+    columns = {c: merged["params"][:, i] for i, c in enumerate(GRID_COLUMNS)}
+    columns["cooldown_bars"] = columns["cooldown_bars"].astype(np.int64)
+    for k in list(METRIC_KEYS) + list(COUNT_KEYS):
+        columns[k] = merged[k]
+    return columns
+
+
+def write_sweep_table(columns: dict, out: Path) -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        import pandas as pd
+
+        pd.DataFrame({c: columns[c] for c in SWEEP_COLUMNS}).to_parquet(
+            out, index=False
+        )
+        return
+    with open(out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SWEEP_COLUMNS)
+        writer.writerows(zip(*(columns[c].tolist() for c in SWEEP_COLUMNS)))
 
 
 def main():
@@ -112,8 +235,49 @@ def main():
     parser.add_argument("--hysteresis", type=float, default=0.02)
     parser.add_argument("--cooldown", type=int, default=3)
     parser.add_argument("--out", type=str, required=True)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sweep", action="store_true")
+    parser.add_argument("--up-range", default=None)
+    parser.add_argument("--dn-range", default=None)
+    parser.add_argument("--hysteresis-range", default=None)
+    parser.add_argument("--cooldown-range", default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--preds",
+        default=None,
+        help="Prediction file (.npy, .parquet, .pkl, .csv) instead of synthetic preds",
+    )
+    parser.add_argument("--pred-column", default=None)
     args = parser.parse_args()
-    preds = generate_preds(args.len, args.noise)
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.preds:
+        preds = load_preds(args.preds, args.pred_column)
+        args.len = len(preds)
+    else:
+        preds = generate_preds(args.len, args.noise)
+    if args.sweep:
+        grid = threshold_grid(
+            up=parse_range(args.up_range) if args.up_range else [args.up],
+            dn=parse_range(args.dn_range) if args.dn_range else [args.dn],
+            hysteresis=(
+                parse_range(args.hysteresis_range)
+                if args.hysteresis_range
+                else [args.hysteresis]
+            ),
+            cooldown_bars=[
+                int(c)
+                for c in (
+                    parse_range(args.cooldown_range)
+                    if args.cooldown_range
+                    else [args.cooldown]
+                )
+            ],
+        )
+        columns = run_sweep(preds, grid, args.workers)
+        write_sweep_table(columns, Path(args.out))
+        print(f"Sweep of {len(grid)} combinations written to {args.out}")
+        return
     signals = map_predictions_to_signals(
         preds,
         up=args.up,
@@ -6,14 +6,33 @@ accepts a simple signal function (buy/sell/hold per row) and simulates fills at
 applies a flat fee and percentage slippage, and writes a report JSON and trade CSV to outputs/.
 
 This is intentionally small and deterministic for reproducible smoke runs.
+
+Engines:
+- numpy (default): event-driven; signal bars are located with vectorized
+  operations and Python only iterates over trades, not bars.
+- loop: the original per-row reference loop, kept for equivalence checks.
+Both produce the same cash/position/trade ledger.
+
+Portfolio mode (--portfolio): loads every pair of a static pairlist from
+--dataset-template, aligns them on their common timestamps and simulates one
+shared cash balance with one-unit positions per pair and --max-open-trades.
+Per-pair and portfolio equity curves are written next to the report.
+
+Chunked mode (--chunk-rows N): streams a Parquet dataset in row chunks and
+carries cash/position across chunk boundaries; results match the in-memory run.
 """
 
 import argparse
+import heapq
 import json
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import numpy as np
 import pandas as pd
 import csv
 
+ENGINES = ("numpy", "loop")
+
 
 def load_dataset(path: Path) -> pd.DataFrame:
     if path.suffix == ".parquet":
@@ -22,6 +41,68 @@ def load_dataset(path: Path) -> pd.DataFrame:
         return pd.read_pickle(path)
 
 
+def iter_dataset_chunks(
+    path: Path, chunk_rows: int, columns: Optional[list[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a Parquet dataset in row chunks instead of reading it whole.
+
+    Uses pyarrow's batch reader (chunk_rows rows per batch) when available and
+    falls back to fastparquet, which streams one row group at a time (the row
+    group size then bounds memory instead of chunk_rows).
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        pq = None
+    if pq is not None:
+        pf = pq.ParquetFile(path)
+        meta = pf.schema_arrow.pandas_metadata or {}
+        index_cols = [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+        cols = None if columns is None else list(columns) + index_cols
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=cols):
+            yield batch.to_pandas()
+        return
+    from fastparquet import ParquetFile
+
+    for df in ParquetFile(str(path)).iter_row_groups(columns=columns):
+        yield df
+
+
+def prepare_ohlc(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure open/close columns (synthesizing from labels if needed) and a DatetimeIndex."""
+    # If dataset lacks OHLCV columns, try to synthesize a close series from labels/features
+    if "close" not in df.columns:
+        if "label_R_H3_pct" in df.columns:
+            # treat as pct returns per row and build price series
+            pct = df["label_R_H3_pct"].fillna(0).astype(float)
+            price = 100.0 * (1.0 + pct).cumprod()
+            df = df.copy()
+            df["close"] = price
+            df["open"] = df["close"].shift(1).fillna(df["close"]).astype(float)
+            df["high"] = df[["open", "close"]].max(axis=1)
+            df["low"] = df[["open", "close"]].min(axis=1)
+            df["volume"] = 1.0
+        elif "label_R_H3" in df.columns:
+            val = df["label_R_H3"].fillna(0).astype(float)
+            price = 100.0 + val.cumsum()
+            df = df.copy()
+            df["close"] = price
+            df["open"] = df["close"].shift(1).fillna(df["close"]).astype(float)
+            df["high"] = df[["open", "close"]].max(axis=1)
+            df["low"] = df[["open", "close"]].min(axis=1)
+            df["volume"] = 1.0
+        else:
+            raise SystemExit(
+                "Dataset missing OHLCV columns and no suitable label to synthesize price"
+            )
+
+    # ensure datetime index
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    return df
+
+
 def simple_signal(df: pd.DataFrame) -> pd.Series:
     # Very small deterministic signal for smoke: buy when close > open, sell when close < open
     sig = pd.Series(index=df.index, data=0)
@@ -30,10 +111,279 @@ def simple_signal(df: pd.DataFrame) -> pd.Series:
     return sig
 
 
-def run_sim(df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: float):
+def simple_signal_array(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """NumPy equivalent of simple_signal: 1 if close > open, -1 if close < open, else 0."""
+    return (close > open_).astype(np.int8) - (close < open_).astype(np.int8)
+
+
+def bar_timestamps(index: pd.Index, bars: np.ndarray) -> list[str]:
+    """Ledger timestamps of bar positions, formatted like the loop's str(ts)."""
+    # Per element: DatetimeIndex.astype(str) drops the time when every value
+    # is at midnight.
+    return [str(ts) for ts in index[bars]]
+
+
+def simulate_arrays(
+    close: np.ndarray,
+    signal: np.ndarray,
+    initial_cash: float,
+    fee: float,
+    slippage_pct,
+    holding: bool = False,
+    fill_delay: int = 1,
+) -> dict:
+    """
+    Event-driven one-unit long-only simulation over price/signal arrays.
+
+    Semantics match the reference loop: a signal at bar i fills at close[i + 1];
+    buy (signal 1) when flat and cash covers price + fee, sell (signal -1) when
+    holding. Only bars 0..n-2 can trade. holding=True starts with the unit
+    already open (used to resume across chunks).
+
+    slippage_pct may be a scalar or a per-bar array (slippage of the fill for
+    the signal at that bar); fill_delay > 1 fills at close[i + fill_delay]
+    instead (the last fill_delay bars cannot trade). Both are used by the
+    robustness runner.
+
+    Returns:
+        dict with cash, position (0/1), sold (bool), and per-trade arrays
+        trade_bar (int64), trade_buy (bool), trade_price and trade_cash (float64).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal)
+    n_trade_bars = max(close.shape[0] - fill_delay, 0)
+    nxt = close[fill_delay:]
+    slip = np.asarray(slippage_pct, dtype=np.float64)
+    if slip.ndim:
+        slip = slip[:n_trade_bars]
+    buy_fill = nxt * (1 + slip)
+    sell_fill = nxt * (1 - slip)
+    buy_cost = buy_fill + fee
+    buy_bars = np.flatnonzero(signal[:n_trade_bars] == 1)
+    sell_bars = np.flatnonzero(signal[:n_trade_bars] == -1)
+
+    cash = initial_cash
+    sold = False
+    bars, sides, prices, cashes = [], [], [], []
+    t = 0
+    while True:
+        if not holding:
+            # Flat: first buy bar >= t whose cost is covered (cash is constant here).
+            k = int(np.searchsorted(buy_bars, t))
+            if k >= buy_bars.shape[0]:
+                break
+            i = int(buy_bars[k])
+            if not cash >= buy_cost[i]:
+                affordable = np.flatnonzero(buy_cost[buy_bars[k:]] <= cash)
+                if affordable.shape[0] == 0:
+                    break
+                i = int(buy_bars[k + affordable[0]])
+            fill_price = float(buy_fill[i])
+            cash -= fill_price + fee
+            holding = True
+            bars.append(i)
+            sides.append(True)
+            prices.append(fill_price)
+            cashes.append(cash)
+            t = i + 1
+
+        # Holding: first sell bar after the buy bar.
+        k = int(np.searchsorted(sell_bars, t))
+        if k >= sell_bars.shape[0]:
+            break
+        i = int(sell_bars[k])
+        fill_price = float(sell_fill[i])
+        cash += fill_price - fee
+        holding = False
+        sold = True
+        bars.append(i)
+        sides.append(False)
+        prices.append(fill_price)
+        cashes.append(cash)
+        t = i + 1
+
+    return {
+        "cash": float(cash),
+        "position": 1 if holding else 0,
+        "sold": sold,
+        "trade_bar": np.asarray(bars, dtype=np.int64),
+        "trade_buy": np.asarray(sides, dtype=bool),
+        "trade_price": np.asarray(prices, dtype=np.float64),
+        "trade_cash": np.asarray(cashes, dtype=np.float64),
+    }
+
+
+def run_sim(
+    df: pd.DataFrame,
+    initial_cash: float,
+    fee: float,
+    slippage_pct: float,
+    engine: str = "numpy",
+    with_equity: bool = False,
+):
+    """
+    Run the single-series simulation.
+
+    With with_equity=True, returns (report, equity DataFrame) and the report
+    gains a "metrics" block (max drawdown, exposure time, Sharpe) computed from
+    the per-bar equity curve; otherwise returns the report only.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    close = df["close"].to_numpy(dtype=np.float64)
+    if engine == "loop":
+        out, bars = _loop_ledger(df, initial_cash, fee, slippage_pct)
+        if not with_equity:
+            return out
+        res = {
+            "trade_bar": np.asarray(bars, dtype=np.int64),
+            "trade_buy": np.asarray([t["side"] == "buy" for t in out["trades"]]),
+            "trade_price": np.asarray(
+                [t["price"] for t in out["trades"]], dtype=np.float64
+            ),
+        }
+        return _with_equity(out, df.index, close, res, fee, initial_cash)
+    signal = simple_signal_array(df["open"].to_numpy(dtype=np.float64), close)
+    res = simulate_arrays(close, signal, initial_cash, fee, slippage_pct)
+    trades = [
+        {"ts": ts, "side": "buy" if buy else "sell", "price": price, "cash": cash}
+        for ts, buy, price, cash in zip(
+            bar_timestamps(df.index, res["trade_bar"]),
+            res["trade_buy"].tolist(),
+            res["trade_price"].tolist(),
+            res["trade_cash"].tolist(),
+        )
+    ]
+    # Reference ledger types: 1.0 while holding, int 0 after a sell, 0.0 if never sold.
+    position = 1.0 if res["position"] else (0 if res["sold"] else 0.0)
+    final_close = float(close[-1])
+    cash = res["cash"] if trades else initial_cash
+    out = {
+        "initial_cash": initial_cash,
+        "final_net": cash + position * final_close,
+        "cash": cash,
+        "position": position,
+        "trades": trades,
+    }
+    if with_equity:
+        return _with_equity(out, df.index, close, res, fee, initial_cash)
+    return out
+
+
+def _with_equity(
+    out: dict,
+    index: pd.Index,
+    close: np.ndarray,
+    res: dict,
+    fee: float,
+    initial_cash: float,
+) -> tuple[dict, pd.DataFrame]:
+    pair_res = dict(res, trade_pair=np.zeros(len(res["trade_bar"]), dtype=np.int64))
+    equity, units = pair_equity_curves(close[:, None], pair_res, fee)
+    equity = initial_cash + equity[:, 0]
+    out["metrics"] = equity_metrics(equity, units[:, 0] > 0, bars_per_year(index))
+    return out, equity_frame(equity, index)
+
+
+def run_sim_chunked(
+    chunks: Iterable[pd.DataFrame],
+    initial_cash: float,
+    fee: float,
+    slippage_pct: float,
+    equity_path: Optional[Path] = None,
+) -> dict:
+    """
+    Out-of-core counterpart of run_sim(engine="numpy", with_equity=True).
+
+    Chunks must be consecutive slices of one OHLC frame (open/close columns).
+    Cash, position and the last row of each chunk (whose signal fills at the
+    next chunk's first close) are carried across boundaries, so the ledger is
+    identical to the in-memory run. The equity curve is streamed to
+    equity_path (if given) and its metrics are accumulated with EquityStats.
+    """
+    cash, holding, sold = initial_cash, False, False
+    trades: list[dict] = []
+    stats = EquityStats()
+    periods = 0.0
+    pending: Optional[pd.DataFrame] = None
+    writer = _EquityWriter(equity_path) if equity_path is not None else None
+
+    def emit(frame: pd.DataFrame, equity: np.ndarray, units: np.ndarray) -> None:
+        if writer is not None:
+            writer.write(equity_frame(equity, frame.index, stats.peak))
+        stats.update(equity, units > 0)
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if "close" not in chunk.columns or "open" not in chunk.columns:
+            raise SystemExit("Chunked mode requires open/close columns in the dataset")
+        chunk = chunk[["open", "close"]]
+        if not isinstance(chunk.index, pd.DatetimeIndex):
+            chunk.index = pd.to_datetime(chunk.index)
+        if pending is not None:
+            chunk = pd.concat([pending, chunk])
+        if not periods:
+            periods = bars_per_year(chunk.index)
+        close = chunk["close"].to_numpy(dtype=np.float64)
+        signal = simple_signal_array(chunk["open"].to_numpy(dtype=np.float64), close)
+        start_cash, start_units = cash, 1.0 if holding else 0.0
+        res = simulate_arrays(close, signal, cash, fee, slippage_pct, holding=holding)
+        trades.extend(
+            {"ts": ts, "side": "buy" if buy else "sell", "price": price, "cash": c}
+            for ts, buy, price, c in zip(
+                bar_timestamps(chunk.index, res["trade_bar"]),
+                res["trade_buy"].tolist(),
+                res["trade_price"].tolist(),
+                res["trade_cash"].tolist(),
+            )
+        )
+        cash, holding = res["cash"], bool(res["position"])
+        sold = sold or res["sold"]
+
+        # Every row but the last is settled; the last one may still trade.
+        res["trade_pair"] = np.zeros(res["trade_bar"].shape[0], dtype=np.int64)
+        rel, units = pair_equity_curves(close[:, None], res, fee)
+        units = start_units + units[:, 0]
+        equity = start_cash + rel[:, 0] + start_units * close
+        emit(chunk.iloc[:-1], equity[:-1], units[:-1])
+        pending = chunk.iloc[-1:]
+
+    if pending is None:
+        raise SystemExit("Dataset is empty")
+    final_close = float(pending["close"].iloc[-1])
+    # Reference ledger types: 1.0 while holding, int 0 after a sell, 0.0 if never sold.
+    position = 1.0 if holding else (0 if sold else 0.0)
+    cash = cash if trades else initial_cash
+    final_net = cash + position * final_close
+    emit(pending, np.array([final_net]), np.array([1.0 if holding else 0.0]))
+    if writer is not None:
+        writer.close()
+    return {
+        "initial_cash": initial_cash,
+        "final_net": final_net,
+        "cash": cash,
+        "position": position,
+        "trades": trades,
+        "metrics": stats.result(periods),
+    }
+
+
+def run_sim_loop(
+    df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: float
+):
+    """Reference per-row implementation (slow; kept for equivalence tests)."""
+    return _loop_ledger(df, initial_cash, fee, slippage_pct)[0]
+
+
+def _loop_ledger(
+    df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: float
+) -> tuple[dict, list[int]]:
+    # run_sim_loop plus the signal bar position of every trade
     cash = initial_cash
     position = 0.0
     trades = []
+    bars = []
 
     signals = simple_signal(df)
 
@@ -52,6 +402,7 @@ def run_sim(df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: flo
                 trades.append(
                     {"ts": str(ts), "side": "buy", "price": fill_price, "cash": cash}
                 )
+                bars.append(i)
         elif sig == -1 and position >= 0:
             # sell existing position
             fill_price = nxt_close * (1 - slippage_pct)
@@ -61,6 +412,7 @@ def run_sim(df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: flo
                 trades.append(
                     {"ts": str(ts), "side": "sell", "price": fill_price, "cash": cash}
                 )
+                bars.append(i)
                 position = 0
 
     # final mark-to-market
@@ -72,7 +424,392 @@ def run_sim(df: pd.DataFrame, initial_cash: float, fee: float, slippage_pct: flo
         "cash": cash,
         "position": position,
         "trades": trades,
+    }, bars
+
+
+def pair_slug(pair: str) -> str:
+    """File-name form of a pair: 'BTC/USDT' -> 'BTC_USDT'."""
+    return pair.replace("/", "_")
+
+
+def load_portfolio(
+    pairs: list[str], template: str, timeframe: str
+) -> dict[str, pd.DataFrame]:
+    """
+    Load one dataset per pair and align them on their common timestamps.
+
+    template is formatted with pair (slug form) and timeframe, e.g.
+    "data/{pair}_{timeframe}.parquet". Missing files are skipped with a notice.
+    """
+    frames = {}
+    for pair in pairs:
+        path = Path(template.format(pair=pair_slug(pair), timeframe=timeframe))
+        if not path.exists():
+            print("Dataset not found, skipping pair:", pair, path)
+            continue
+        frames[pair] = prepare_ohlc(load_dataset(path))
+    if not frames:
+        return {}
+    common = None
+    for df in frames.values():
+        common = df.index if common is None else common.intersection(df.index)
+    common = common.sort_values()
+    return {pair: df.loc[common] for pair, df in frames.items()}
+
+
+def simulate_portfolio_arrays(
+    close: np.ndarray,
+    signal: np.ndarray,
+    initial_cash: float,
+    fee: float,
+    slippage_pct: float,
+    max_open_trades: int,
+) -> dict:
+    """
+    Shared-cash, one-unit-per-pair simulation over aligned (bars x pairs) arrays.
+
+    Per bar, pairs are processed in column order with the single-pair rules
+    (fill at next close, buy needs cash and a free slot, sell when holding).
+    A heap holds the next relevant bar of every pair, so the loop visits trades
+    and rejected buys only; a buy rejected for lack of slots jumps straight to
+    the next bar at which another pair can sell.
+
+    Returns:
+        dict with cash, holding (bool per pair) and per-trade arrays
+        trade_bar, trade_pair (int64), trade_buy (bool), trade_price, trade_cash.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal)
+    n_bars, n_pairs = close.shape
+    n_trade_bars = max(n_bars - 1, 0)
+    nxt = close[1:]
+    buy_bars = [np.flatnonzero(signal[:n_trade_bars, p] == 1) for p in range(n_pairs)]
+    sell_bars = [np.flatnonzero(signal[:n_trade_bars, p] == -1) for p in range(n_pairs)]
+
+    def next_bar(bars: np.ndarray, t: int):
+        k = int(np.searchsorted(bars, t))
+        return int(bars[k]) if k < bars.shape[0] else None
+
+    cash = initial_cash
+    holding = [False] * n_pairs
+    pending_sell: dict[int, int] = {}
+    open_trades = 0
+    heap = []
+    for p in range(n_pairs):
+        i = next_bar(buy_bars[p], 0)
+        if i is not None:
+            heap.append((i, p))
+    heapq.heapify(heap)
+
+    bars, pairs, sides, prices, cashes = [], [], [], [], []
+    while heap:
+        i, p = heapq.heappop(heap)
+        if holding[p]:
+            fill_price = nxt[i, p] * (1 - slippage_pct)
+            cash += fill_price - fee
+            holding[p] = False
+            del pending_sell[p]
+            open_trades -= 1
+            bars.append(i)
+            pairs.append(p)
+            sides.append(False)
+            prices.append(fill_price)
+            cashes.append(cash)
+            nb = next_bar(buy_bars[p], i + 1)
+        elif open_trades >= max_open_trades:
+            if not pending_sell:
+                continue
+            nb = next_bar(buy_bars[p], max(i + 1, min(pending_sell.values())))
+        elif cash >= nxt[i, p] * (1 + slippage_pct) + fee:
+            fill_price = nxt[i, p] * (1 + slippage_pct)
+            cash -= fill_price + fee
+            holding[p] = True
+            open_trades += 1
+            bars.append(i)
+            pairs.append(p)
+            sides.append(True)
+            prices.append(fill_price)
+            cashes.append(cash)
+            nb = next_bar(sell_bars[p], i + 1)
+            if nb is not None:
+                pending_sell[p] = nb
+        else:
+            nb = next_bar(buy_bars[p], i + 1)
+        if nb is not None:
+            heapq.heappush(heap, (nb, p))
+
+    return {
+        "cash": float(cash),
+        "holding": np.asarray(holding, dtype=bool),
+        "trade_bar": np.asarray(bars, dtype=np.int64),
+        "trade_pair": np.asarray(pairs, dtype=np.int64),
+        "trade_buy": np.asarray(sides, dtype=bool),
+        "trade_price": np.asarray(prices, dtype=np.float64),
+        "trade_cash": np.asarray(cashes, dtype=np.float64),
+    }
+
+
+def pair_equity_curves(
+    close: np.ndarray, res: dict, fee: float, fill_delay: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-pair equity and units held (both bars x pairs).
+
+    Equity is cumulative trade cash flows plus mark-to-market of the open unit
+    at each bar's close. A trade's cash flow and unit are booked on its fill
+    bar (signal bar + fill_delay), where its fill price is that bar's close
+    (plus slippage), so a position is never marked at a price it was not
+    filled against.
+    """
+    n_bars, n_pairs = close.shape
+    flows = np.zeros((n_bars, n_pairs), dtype=np.float64)
+    units = np.zeros((n_bars, n_pairs), dtype=np.float64)
+    sign = np.where(res["trade_buy"], -1.0, 1.0)
+    amount = sign * res["trade_price"] - fee
+    fill_bar = res["trade_bar"] + fill_delay
+    np.add.at(flows, (fill_bar, res["trade_pair"]), amount)
+    np.add.at(units, (fill_bar, res["trade_pair"]), -sign)
+    units = np.cumsum(units, axis=0)
+    return np.cumsum(flows, axis=0) + units * close, units
+
+
+def bars_per_year(index: pd.Index) -> float:
+    """Annualization factor from the median bar spacing (0.0 if unknown)."""
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return 0.0
+    step = np.median(np.diff(index.asi8)) / 1e9
+    return 365.0 * 24 * 3600 / step if step > 0 else 0.0
+
+
+def equity_frame(
+    equity: np.ndarray, index: pd.Index, peak: float = -np.inf
+) -> pd.DataFrame:
+    """
+    Per-bar equity and drawdown (fraction below running peak, <= 0) as float64.
+
+    peak carries the running peak of earlier bars when the curve is built in slices.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    peak = np.maximum.accumulate(np.maximum(equity, peak))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, equity / peak - 1.0, 0.0)
+    return pd.DataFrame({"equity": equity, "drawdown": drawdown}, index=index)
+
+
+class EquityStats:
+    """
+    Streaming accumulator for equity-curve run metrics.
+
+    Feed consecutive slices of the per-bar equity curve with update(); result()
+    returns the same dict as equity_metrics over the concatenated curve
+    (Sharpe up to floating-point rounding of the merged mean/variance).
+    """
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.in_position = 0
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+        self.last = np.nan
+        self.n_ret = 0
+        self.ret_mean = 0.0
+        self.ret_m2 = 0.0
+
+    def update(self, equity: np.ndarray, in_position: np.ndarray) -> None:
+        equity = np.asarray(equity, dtype=np.float64)
+        if equity.shape[0] == 0:
+            return
+        peak = np.maximum.accumulate(np.maximum(equity, self.peak))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dd_pct = np.where(peak > 0, 1.0 - equity / peak, 0.0)
+            prev = np.concatenate(([self.last], equity[:-1]))
+            rets = (equity - prev) / prev
+        rets = rets[np.isfinite(rets)]
+        self.max_drawdown = max(self.max_drawdown, float(np.max(peak - equity)))
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(np.max(dd_pct)))
+        self.peak = float(peak[-1])
+        self.last = float(equity[-1])
+        self.n += equity.shape[0]
+        self.in_position += int(np.count_nonzero(in_position))
+        m = rets.shape[0]
+        if m:
+            # Chan et al. pairwise merge of mean and sum of squared deviations.
+            mean = float(np.mean(rets))
+            m2 = float(np.sum((rets - mean) ** 2))
+            total = self.n_ret + m
+            delta = mean - self.ret_mean
+            self.ret_m2 += m2 + delta * delta * self.n_ret * m / total
+            self.ret_mean += delta * m / total
+            self.n_ret = total
+
+    def result(self, periods_per_year: float) -> dict:
+        std = float(np.sqrt(self.ret_m2 / (self.n_ret - 1))) if self.n_ret > 1 else 0.0
+        sharpe = self.ret_mean / std if std > 0 else 0.0
+        if periods_per_year > 0:
+            sharpe *= float(np.sqrt(periods_per_year))
+        return {
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "exposure_time_pct": self.in_position / self.n if self.n else 0.0,
+            "sharpe": sharpe,
+        }
+
+
+def equity_metrics(
+    equity: np.ndarray, in_position: np.ndarray, periods_per_year: float
+) -> dict:
+    """
+    Vectorized run metrics from a per-bar equity curve.
+
+    Returns:
+        max_drawdown (cash units, >= 0), max_drawdown_pct (fraction, >= 0),
+        exposure_time_pct (share of bars with an open position) and sharpe
+        (mean/std of bar returns, annualized when periods_per_year > 0).
+    """
+    stats = EquityStats()
+    stats.update(equity, in_position)
+    return stats.result(periods_per_year)
+
+
+def run_portfolio(
+    frames: dict[str, pd.DataFrame],
+    initial_cash: float,
+    fee: float,
+    slippage_pct: float,
+    max_open_trades: int,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    Simulate aligned pair frames (see load_portfolio) against shared cash.
+
+    Returns:
+        (report dict, equity DataFrame with one column per pair plus
+        'portfolio' and its 'drawdown')
+    """
+    names = list(frames)
+    index = frames[names[0]].index
+    close = np.column_stack([frames[n]["close"].to_numpy(np.float64) for n in names])
+    open_ = np.column_stack([frames[n]["open"].to_numpy(np.float64) for n in names])
+    res = simulate_portfolio_arrays(
+        close,
+        simple_signal_array(open_, close),
+        initial_cash,
+        fee,
+        slippage_pct,
+        max_open_trades,
+    )
+    equity, units = pair_equity_curves(close, res, fee)
+    equity_df = pd.DataFrame(equity, index=index, columns=names)
+    equity_df["portfolio"] = initial_cash + equity.sum(axis=1)
+    equity_df["drawdown"] = equity_frame(equity_df["portfolio"].to_numpy(), index)[
+        "drawdown"
+    ]
+
+    trades = [
+        {
+            "ts": ts,
+            "pair": names[p],
+            "side": "buy" if buy else "sell",
+            "price": price,
+            "cash": cash,
+        }
+        for ts, p, buy, price, cash in zip(
+            bar_timestamps(index, res["trade_bar"]),
+            res["trade_pair"].tolist(),
+            res["trade_buy"].tolist(),
+            res["trade_price"].tolist(),
+            res["trade_cash"].tolist(),
+        )
+    ]
+    final_close = close[-1] if len(index) else np.zeros(len(names))
+    per_pair = {
+        name: {
+            "trades": int(np.count_nonzero(res["trade_pair"] == p)),
+            "position": float(res["holding"][p]),
+            "final_equity": float(equity[-1, p]) if len(index) else 0.0,
+        }
+        for p, name in enumerate(names)
+    }
+    report = {
+        "initial_cash": initial_cash,
+        "final_net": float(res["cash"] + res["holding"] @ final_close),
+        "cash": res["cash"],
+        "max_open_trades": max_open_trades,
+        "n_bars": int(len(index)),
+        "pairs": per_pair,
+        "metrics": equity_metrics(
+            equity_df["portfolio"].to_numpy(),
+            (units > 0).any(axis=1),
+            bars_per_year(index),
+        ),
+        "trades": trades,
     }
+    return report, equity_df
+
+
+def write_equity(equity: pd.DataFrame, path: Path) -> Path:
+    """Write an equity table as Parquet (CSV if no Parquet engine is available)."""
+    try:
+        equity.to_parquet(path)
+        return path
+    except Exception:
+        path = path.with_suffix(".csv")
+        equity.to_csv(path)
+        return path
+
+
+class _EquityWriter:
+    """Append equity chunks to one Parquet file (CSV if no Parquet engine)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._pq_writer = None
+        self._started = False
+        try:
+            import pyarrow  # noqa: F401
+
+            self._engine = "pyarrow"
+        except ImportError:
+            try:
+                import fastparquet  # noqa: F401
+
+                self._engine = "fastparquet"
+            except ImportError:
+                self._engine = "csv"
+                self.path = path.with_suffix(".csv")
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        if self._engine == "pyarrow":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame)
+            if self._pq_writer is None:
+                self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+            self._pq_writer.write_table(table)
+        elif self._engine == "fastparquet":
+            from fastparquet import write
+
+            write(str(self.path), frame, append=self._started)
+        else:
+            frame.to_csv(
+                self.path, mode="a" if self._started else "w", header=not self._started
+            )
+        self._started = True
+
+    def close(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+
+
+def write_trades_csv(trades: list[dict], path: Path) -> None:
+    with open(path, "w", newline="") as f:
+        if trades:
+            writer = csv.DictWriter(f, fieldnames=trades[0].keys())
+            writer.writeheader()
+            writer.writerows(trades)
 
 
 def main():
@@ -82,55 +819,79 @@ def main():
     parser.add_argument("--fee", type=float, default=0.1)
     parser.add_argument("--slippage-pct", type=float, default=0.001)
     parser.add_argument("--output", default="outputs/paper_trade_report.json")
+    parser.add_argument("--engine", choices=ENGINES, default="numpy")
+    parser.add_argument("--portfolio", action="store_true")
+    parser.add_argument("--pairlist", default="configs/pairlist.static.json")
+    parser.add_argument("--dataset-template", default="data/{pair}_{timeframe}.parquet")
+    parser.add_argument("--timeframe", default="5m")
+    parser.add_argument("--max-open-trades", type=int, default=3)
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=0,
+        help="Stream the Parquet dataset in chunks of this many rows (0 = in memory)",
+    )
     args = parser.parse_args()
 
+    if args.portfolio:
+        pairs = json.loads(Path(args.pairlist).read_text(encoding="utf-8"))["pairs"]
+        frames = load_portfolio(pairs, args.dataset_template, args.timeframe)
+        if not frames:
+            print("No pair datasets found for template:", args.dataset_template)
+            return
+        out, equity = run_portfolio(
+            frames,
+            args.initial_cash,
+            args.fee,
+            args.slippage_pct,
+            args.max_open_trades,
+        )
+        outp = Path(args.output)
+        outp.parent.mkdir(parents=True, exist_ok=True)
+        outp.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        write_trades_csv(out["trades"], outp.with_name(outp.stem + "_trades.csv"))
+        eq_path = write_equity(equity, outp.with_name(outp.stem + "_equity.parquet"))
+        print("Wrote portfolio report:", outp, "equity:", eq_path)
+        return
+
     p = Path(args.dataset)
     if not p.exists():
         print("Dataset not found:", p)
         return
 
-    df = load_dataset(p)
-    # If dataset lacks OHLCV columns, try to synthesize a close series from labels/features
-    if "close" not in df.columns:
-        if "label_R_H3_pct" in df.columns:
-            # treat as pct returns per row and build price series
-            pct = df["label_R_H3_pct"].fillna(0).astype(float)
-            price = 100.0 * (1.0 + pct).cumprod()
-            df = df.copy()
-            df["close"] = price
-            df["open"] = df["close"].shift(1).fillna(df["close"]).astype(float)
-            df["high"] = df[["open", "close"]].max(axis=1)
-            df["low"] = df[["open", "close"]].min(axis=1)
-            df["volume"] = 1.0
-        elif "label_R_H3" in df.columns:
-            val = df["label_R_H3"].fillna(0).astype(float)
-            price = 100.0 + val.cumsum()
-            df = df.copy()
-            df["close"] = price
-            df["open"] = df["close"].shift(1).fillna(df["close"]).astype(float)
-            df["high"] = df[["open", "close"]].max(axis=1)
-            df["low"] = df[["open", "close"]].min(axis=1)
-            df["volume"] = 1.0
-        else:
-            raise SystemExit(
-                "Dataset missing OHLCV columns and no suitable label to synthesize price"
-            )
+    if args.chunk_rows > 0:
+        if p.suffix != ".parquet":
+            raise SystemExit("--chunk-rows requires a Parquet dataset")
+        outp = Path(args.output)
+        outp.parent.mkdir(parents=True, exist_ok=True)
+        out = run_sim_chunked(
+            iter_dataset_chunks(p, args.chunk_rows, columns=["open", "close"]),
+            args.initial_cash,
+            args.fee,
+            args.slippage_pct,
+            equity_path=outp.with_name(outp.stem + "_equity.parquet"),
+        )
+        outp.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        write_trades_csv(out["trades"], outp.with_name(outp.stem + "_trades.csv"))
+        print("Wrote report:", outp)
+        return
 
-    # ensure datetime index
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index)
+    df = prepare_ohlc(load_dataset(p))
 
-    out = run_sim(df, args.initial_cash, args.fee, args.slippage_pct)
+    out, equity = run_sim(
+        df,
+        args.initial_cash,
+        args.fee,
+        args.slippage_pct,
+        args.engine,
+        with_equity=True,
+    )
     outp = Path(args.output)
     outp.parent.mkdir(parents=True, exist_ok=True)
     outp.write_text(json.dumps(out, indent=2), encoding="utf-8")
     # write trades CSV
-    trades_csv = outp.with_name(outp.stem + "_trades.csv")
-    with open(trades_csv, "w", newline="") as f:
-        if out["trades"]:
-            writer = csv.DictWriter(f, fieldnames=out["trades"][0].keys())
-            writer.writeheader()
-            writer.writerows(out["trades"])
+    write_trades_csv(out["trades"], outp.with_name(outp.stem + "_trades.csv"))
+    write_equity(equity, outp.with_name(outp.stem + "_equity.parquet"))
     print("Wrote report:", outp)
 
 
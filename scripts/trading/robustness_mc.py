@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Monte Carlo fee/slippage robustness runner for the paper-trading simulator.
+
+Runs many perturbed variants of paper_trading_sim's single-series simulation
+and reports distribution quantiles of final_net and max drawdown instead of one
+deterministic number per (fee, slippage_pct) pair.
+
+Each run draws:
+- a fee from --fee-tiers,
+- a run slippage level uniformly from --slippage-range, jittered per fill
+  (uniform 0..2x, mean preserving),
+- a fill delay in bars from --fill-delays,
+- a circular block-bootstrapped price path (--block-size bars per block; bar
+  returns and their signals are resampled together; 0 keeps the original path).
+
+Price and signal arrays are placed once in multiprocessing.shared_memory and
+worker processes attach to them; runs are dispatched in chunks and every run
+is a vectorized event-driven simulation (simulate_arrays). Results depend only
+on --seed and the run id, not on --workers.
+
+Usage:
+    python scripts/trading/robustness_mc.py --dataset data/dataset_SMOKE.parquet \\
+        --runs 2000 --fee-tiers 0.05,0.1,0.2 --slippage-range 0.0005:0.003 \\
+        --fill-delays 1,2,3 --block-size 288 --output outputs/paper_trade_mc.json
+
+Outputs the JSON summary (quantiles and run parameters) and a per-run table
+<output>_runs.csv.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from scripts.trading.paper_trading_sim import (  # noqa: E402
+    load_dataset,
+    pair_equity_curves,
+    prepare_ohlc,
+    simple_signal_array,
+    simulate_arrays,
+)
+
+RUN_COLUMNS = (
+    "run",
+    "fee",
+    "slippage_pct",
+    "fill_delay",
+    "final_net",
+    "max_drawdown",
+    "max_drawdown_pct",
+    "trades_count",
+)
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def draw_run_params(
+    runs: int,
+    fee_tiers,
+    slippage_range: tuple[float, float],
+    fill_delays,
+    seed: int,
+) -> dict:
+    """Draw per-run fee, slippage level and fill delay (vectorized)."""
+    rng = np.random.default_rng([seed, 0])
+    return {
+        "fee": rng.choice(np.asarray(fee_tiers, dtype=np.float64), size=runs),
+        "slippage_pct": rng.uniform(slippage_range[0], slippage_range[1], size=runs),
+        "fill_delay": rng.choice(np.asarray(fill_delays, dtype=np.int64), size=runs),
+    }
+
+
+def bootstrap_path(
+    close: np.ndarray, signal: np.ndarray, block_size: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Circular block bootstrap of bar returns, keeping each bar's signal with it.
+
+    The first bar is kept; bars 1..n-1 are rebuilt by chaining resampled
+    close-to-close ratios from close[0].
+    """
+    n = close.shape[0]
+    if block_size <= 0 or n < 3:
+        return close, signal
+    m = n - 1
+    ratio = close[1:] / close[:-1]
+    n_blocks = -(-m // block_size)
+    starts = rng.integers(0, m, size=n_blocks)
+    idx = (starts[:, None] + np.arange(block_size)).ravel()[:m] % m
+    path = np.empty(n, dtype=np.float64)
+    path[0] = close[0]
+    path[1:] = close[0] * np.cumprod(ratio[idx])
+    sig = np.empty_like(signal)
+    sig[0] = signal[0]
+    sig[1:] = signal[idx + 1]
+    return path, sig
+
+
+def simulate_run(
+    close: np.ndarray,
+    signal: np.ndarray,
+    initial_cash: float,
+    fee: float,
+    slippage_pct: float,
+    fill_delay: int,
+    block_size: int,
+    rng: np.random.Generator,
+) -> dict:
+    """One perturbed run: bootstrap path, jittered slippage, delayed fills."""
+    close, signal = bootstrap_path(close, signal, block_size, rng)
+    slip = slippage_pct * rng.uniform(0.0, 2.0, size=close.shape[0])
+    res = simulate_arrays(
+        close, signal, initial_cash, fee, slip, fill_delay=int(fill_delay)
+    )
+    res["trade_pair"] = np.zeros(res["trade_bar"].shape[0], dtype=np.int64)
+    rel, _ = pair_equity_curves(close[:, None], res, fee, int(fill_delay))
+    equity = initial_cash + rel[:, 0]
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd_pct = np.where(peak > 0, 1.0 - equity / peak, 0.0)
+    return {
+        "final_net": float(equity[-1]),
+        "max_drawdown": float(np.max(peak - equity)),
+        "max_drawdown_pct": float(np.max(dd_pct)),
+        "trades_count": int(res["trade_bar"].shape[0]),
+    }
+
+
+def _run_many(
+    close, signal, run_ids, params, initial_cash, block_size, seed
+) -> list[dict]:
+    rows = []
+    for j, run in enumerate(run_ids):
+        rng = np.random.default_rng([seed, 1, int(run)])
+        row = simulate_run(
+            close,
+            signal,
+            initial_cash,
+            float(params["fee"][j]),
+            float(params["slippage_pct"][j]),
+            int(params["fill_delay"][j]),
+            block_size,
+            rng,
+        )
+        row.update(
+            run=int(run),
+            fee=float(params["fee"][j]),
+            slippage_pct=float(params["slippage_pct"][j]),
+            fill_delay=int(params["fill_delay"][j]),
+        )
+        rows.append(row)
+    return rows
+
+
+# Worker-side views of the shared close/signal arrays (set by _attach_arrays).
+_SHM = None
+_ARRAYS = None
+
+
+def _attach_arrays(name: str, length: int) -> None:
+    global _SHM, _ARRAYS
+    _SHM = shared_memory.SharedMemory(name=name)
+    _ARRAYS = np.ndarray((2, length), dtype=np.float64, buffer=_SHM.buf)
+
+
+def _mc_chunk(task) -> list[dict]:
+    run_ids, params, initial_cash, block_size, seed = task
+    return _run_many(
+        _ARRAYS[0], _ARRAYS[1], run_ids, params, initial_cash, block_size, seed
+    )
+
+
+def run_monte_carlo(
+    close: np.ndarray,
+    signal: np.ndarray,
+    runs: int,
+    initial_cash: float,
+    fee_tiers,
+    slippage_range: tuple[float, float],
+    fill_delays,
+    block_size: int,
+    seed: int,
+    workers: int,
+) -> list[dict]:
+    """
+    Run `runs` perturbed simulations and return one result row per run (RUN_COLUMNS).
+
+    With workers > 1 the arrays are shared via multiprocessing.shared_memory
+    and runs are split into contiguous chunks across a process pool.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal, dtype=np.float64)
+    params = draw_run_params(runs, fee_tiers, slippage_range, fill_delays, seed)
+    run_ids = np.arange(runs)
+    if workers <= 1 or runs <= 1:
+        return _run_many(close, signal, run_ids, params, initial_cash, block_size, seed)
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes * 2, 1))
+    try:
+        shared = np.ndarray((2, close.shape[0]), dtype=np.float64, buffer=shm.buf)
+        shared[0] = close
+        shared[1] = signal
+        tasks = [
+            (
+                ids,
+                {k: v[ids] for k, v in params.items()},
+                initial_cash,
+                block_size,
+                seed,
+            )
+            for ids in np.array_split(run_ids, min(runs, workers * 4))
+        ]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_arrays,
+            initargs=(shm.name, close.shape[0]),
+        ) as pool:
+            chunks = list(pool.map(_mc_chunk, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+    return [row for chunk in chunks for row in chunk]
+
+
+def summarize(rows: list[dict], quantiles=DEFAULT_QUANTILES) -> dict:
+    """Quantiles of final_net and max drawdown across runs."""
+    out = {}
+    for key in ("final_net", "max_drawdown", "max_drawdown_pct"):
+        values = np.asarray([r[key] for r in rows], dtype=np.float64)
+        qs = (
+            np.quantile(values, quantiles)
+            if values.shape[0]
+            else [np.nan] * len(quantiles)
+        )
+        out[key] = {f"p{round(q * 100):02d}": float(v) for q, v in zip(quantiles, qs)}
+        out[key]["mean"] = float(values.mean()) if values.shape[0] else float("nan")
+    return out
+
+
+def _floats(spec: str) -> list[float]:
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo fee/slippage robustness runner for the paper simulator."
+    )
+    parser.add_argument("--dataset", default="data/dataset_SMOKE.parquet")
+    parser.add_argument("--initial-cash", type=float, default=1000.0)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--fee-tiers", default="0.05,0.1,0.2")
+    parser.add_argument("--slippage-range", default="0.0005:0.003")
+    parser.add_argument("--fill-delays", default="1,2,3")
+    parser.add_argument("--block-size", type=int, default=288)
+    parser.add_argument("--quantiles", default="0.05,0.25,0.5,0.75,0.95")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="outputs/paper_trade_mc.json")
+    args = parser.parse_args()
+
+    p = Path(args.dataset)
+    if not p.exists():
+        print("Dataset not found:", p)
+        return
+    df = prepare_ohlc(load_dataset(p))
+    close = df["close"].to_numpy(dtype=np.float64)
+    signal = simple_signal_array(df["open"].to_numpy(dtype=np.float64), close)
+    lo, hi = (float(x) for x in args.slippage_range.split(":"))
+    fill_delays = [int(x) for x in _floats(args.fill_delays)]
+    if min(fill_delays) < 1:
+        raise SystemExit("--fill-delays must be >= 1")
+
+    rows = run_monte_carlo(
+        close,
+        signal,
+        args.runs,
+        args.initial_cash,
+        _floats(args.fee_tiers),
+        (lo, hi),
+        fill_delays,
+        args.block_size,
+        args.seed,
+        args.workers,
+    )
+    summary = {
+        "runs": args.runs,
+        "initial_cash": args.initial_cash,
+        "params": {
+            "fee_tiers": _floats(args.fee_tiers),
+            "slippage_range": [lo, hi],
+            "fill_delays": fill_delays,
+            "block_size": args.block_size,
+            "seed": args.seed,
+        },
+        "quantiles": summarize(rows, _floats(args.quantiles)),
+    }
+    outp = Path(args.output)
+    outp.parent.mkdir(parents=True, exist_ok=True)
+    outp.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    with open(outp.with_name(outp.stem + "_runs.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RUN_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print("Wrote Monte Carlo summary:", outp)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,55 +2,86 @@
 """
 Build reproducible local dataset for MATRIX (offline, pandas/numpy only).
 Enforces DATASET_SCHEMA.md, LABELS.md, TRAINING_PROTOCOL.md, CONTRACTS.md, hooks.py docstrings.
+
+Batch mode (--manifest): builds every (pair, timeframe, H, transform) job of a
+JSON manifest across a process pool into a partitioned layout
+<out-dir>/pair=<PAIR>/timeframe=<TF>/H<H>_<transform>.parquet with one
+<out-dir>/_manifest.json describing all jobs (see plan_jobs).
+
+Append mode (--append): extends an existing dataset with the candles added to
+its CSV since the last build, using the sidecar's last_ts/source_rows (see
+append_one).
+
+f_vol_z is a right-aligned rolling robust z-score over --vol-window bars
+(matrix.feature.rolling), so every feature only looks a bounded number of
+rows back.
+
+--feature-store DIR (or "feature_store" in a batch manifest) caches computed
+feature matrices keyed by OHLCV content and feature parameters
+(matrix.feature.store); rebuilding other H/transform labels over the same
+candles then skips feature computation.
+
+--H accepts a comma-separated list of horizons (e.g. 3,6,12): every
+label_R_H<H>_<transform> column is computed from the same close array in one
+pass (matrix.freqai.hooks.label_matrix) and written to the same dataset; the
+tail drop uses max(H).
+
+--dtype float32 stores features and labels as float32 (computed in float64,
+rounded once on output), halving dataset size and training memory; readers
+keep the stored dtype.
 """
 
 import argparse
+import os
 import pandas as pd
 import numpy as np
 import json
 from pathlib import Path
+from typing import List, Sequence, Tuple, Union
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.matrix.feature.store import DEFAULT_MAX_BYTES, FeatureStore  # noqa: E402
+from src.matrix.freqai.hooks import (  # noqa: E402
+    VOL_WINDOW,
+    generate_features,
+    label_matrix,
+    label_names,
+)
+from src.matrix.infra.dataset_io import write_dataset as write_sorted  # noqa: E402
+from src.matrix.sensor.ohlcv import read_ohlcv_csv  # noqa: E402
 
 FEATURES = ["f_ret_1", "f_ret_3", "f_ret_12", "f_hl_range", "f_oc_range", "f_vol_z"]
+DTYPES = ("float64", "float32")
 
-LABEL_PATTERN = "label_R_H{H}_{transform}"
 
+def parse_horizons(H: Union[int, str, Sequence[int]]) -> List[int]:
+    """Normalize H (int, "3,6,12" or a list) into a list of horizons."""
+    if isinstance(H, str):
+        horizons = [int(h) for h in H.split(",") if h.strip()]
+    elif isinstance(H, (int, np.integer)):
+        horizons = [int(H)]
+    else:
+        horizons = [int(h) for h in H]
+    if not horizons:
+        raise ValueError("At least one horizon H is required")
+    return horizons
 
-def robust_zscore(vol):
-    med = np.median(vol)
-    q75, q25 = np.percentile(vol, [75, 25])
-    iqr = q75 - q25
-    if iqr == 0:
-        return np.zeros_like(vol)
-    return (vol - med) / iqr
 
+def load_ohlcv_csv(
+    ohlcv_path: Path, skip_rows: int = 0, cache_dir: Path = None
+) -> pd.DataFrame:
+    """
+    Load an OHLCV CSV with a 'date' or 'datetime' column as a sorted UTC index.
 
-def main():
-    parser = argparse.ArgumentParser(description="Build MATRIX dataset from OHLCV CSV.")
-    parser.add_argument("--ohlcv", required=True)
-    parser.add_argument("--timeframe", required=True)
-    parser.add_argument("--H", type=int, required=True)
-    parser.add_argument("--transform", choices=["pct", "log"], required=True)
-    parser.add_argument("--windows", required=True)
-    parser.add_argument("--out", required=True)
-    parser.add_argument("--sidecar-json", default=None)
-    args = parser.parse_args()
-    windows = [int(w) for w in args.windows.split(",") if w.strip()]
-    ohlcv_path = Path(args.ohlcv)
-    out_path = Path(args.out)
-    sidecar_path = (
-        Path(args.sidecar_json) if args.sidecar_json else out_path.with_suffix(".json")
-    )
-    # Load CSV
-    df = pd.read_csv(ohlcv_path)
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], utc=True)
-        df.set_index("date", inplace=True)
-    elif "datetime" in df.columns:
-        df["datetime"] = pd.to_datetime(df["datetime"], utc=True)
-        df.set_index("datetime", inplace=True)
-    else:
-        raise ValueError("CSV must have 'date' or 'datetime' column.")
+    Parsing goes through matrix.sensor.ohlcv.read_ohlcv_csv (typed float64
+    columns, vectorized timestamp parsing, optional Parquet cache in
+    cache_dir). skip_rows skips that many data rows after the header (append mode).
+    """
+    df = read_ohlcv_csv(ohlcv_path, skip_rows=skip_rows, cache_dir=cache_dir)
     df = df.sort_index()
     if not df.index.is_monotonic_increasing:
         raise ValueError("Index must be monotonic increasing.")
@@ -58,69 +89,452 @@ def main():
     for col in ["open", "high", "low", "close", "volume"]:
         if col not in df.columns:
             raise ValueError(f"Missing required column: {col}")
-    # Compute features
-    for w in windows:
-        if w not in [1, 3, 12]:
-            continue
-        if args.transform == "pct":
-            df[f"f_ret_{w}"] = df["close"].pct_change(w)
-        else:
-            df[f"f_ret_{w}"] = np.log(df["close"] / df["close"].shift(w))
-    df["f_hl_range"] = (df["high"] - df["low"]) / df["close"]
-    df["f_oc_range"] = (df["close"] - df["open"]) / df["open"]
-    df["f_vol_z"] = robust_zscore(df["volume"].values)
-    # Compute label
-    H = args.H
-    if args.transform == "pct":
-        label = df["close"].shift(-H) / df["close"] - 1
+    return df
+
+
+def compute_columns(
+    df: pd.DataFrame,
+    windows,
+    H: Union[int, Sequence[int]],
+    transform: str,
+    vol_window: int = VOL_WINDOW,
+    store: FeatureStore = None,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Compute feature and label columns for df; returns (frame, label names).
+
+    Features come from matrix.freqai.hooks.generate_features (shared with
+    inference), or from the feature store when given. Features look back at
+    most max(max(windows), vol_window - 1) rows and the labels max(H) rows
+    ahead; H may be one horizon or several (see parse_horizons).
+    """
+    feature_windows = [w for w in windows if w in [1, 3, 12]]
+    if store is not None:
+        out = store.features(df, feature_windows, transform, vol_window)
     else:
-        label = np.log(df["close"].shift(-H) / df["close"])
-    label_name = LABEL_PATTERN.format(H=H, transform=args.transform)
-    df[label_name] = label
-    # Warmup drop
-    warmup = max(max(windows), H)
-    df = df.iloc[warmup:]
-    df = df[:-H] if H > 0 else df
-    # Select columns
+        out = generate_features(df, feature_windows, transform, vol_window)
+    # Compute labels
+    horizons = parse_horizons(H)
+    labels = label_matrix(df["close"].to_numpy(dtype=np.float64), horizons, transform)
+    names = label_names(horizons, transform)
+    for j, name in enumerate(names):
+        out[name] = labels[:, j]
+    return out, names
+
+
+def finalize_frame(
+    df: pd.DataFrame, windows, label_cols: List[str], dtype: str = "float64"
+) -> pd.DataFrame:
+    """Select f_* + label columns, drop NaNs, cast to dtype and ensure a UTC index."""
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported dtype {dtype!r}; expected one of {DTYPES}")
     keep_cols = [f"f_ret_{w}" for w in windows if w in [1, 3, 12]] + [
         "f_hl_range",
         "f_oc_range",
         "f_vol_z",
-        label_name,
+        *label_cols,
     ]
     df = df[keep_cols]
     # Drop NaN
     df = df.dropna()
+    if dtype != "float64":
+        df = df.astype(dtype)
     # Ensure UTC tz-aware index
     if not (df.index.tz and str(df.index.tz) == "UTC"):
         df.index = df.index.tz_localize("UTC")
-    # Output
-    n_rows = len(df)
+    return df
+
+
+def build_frame(
+    df: pd.DataFrame,
+    windows,
+    H: Union[int, Sequence[int]],
+    transform: str,
+    vol_window: int = VOL_WINDOW,
+    store: FeatureStore = None,
+    dtype: str = "float64",
+):
+    """
+    Compute features and label, drop warmup/trailing rows and NaNs.
+
+    Returns:
+        (dataset DataFrame, label column names, warmup)
+    """
+    df, label_cols = compute_columns(df, windows, H, transform, vol_window, store)
+    # Warmup drop: every kept row has full return and f_vol_z windows
+    max_h = max(parse_horizons(H))
+    warmup = max(max(windows), vol_window - 1, max_h)
+    df = df.iloc[warmup:]
+    df = df[:-max_h] if max_h > 0 else df
+    return finalize_frame(df, windows, label_cols, dtype), label_cols, warmup
+
+
+def write_dataset(df: pd.DataFrame, out_path: Path):
+    """
+    Write Parquet, falling back to pickle; returns (path written, format).
+
+    Parquet files have time-sorted row groups with statistics
+    (matrix.infra.dataset_io), so readers can prune by time and column.
+    Pickle is only used when no Parquet engine is installed.
+    """
+    return write_sorted(df, out_path)
+
+
+def build_one(
+    ohlcv_path: Path,
+    timeframe: str,
+    H: Union[int, Sequence[int]],
+    transform: str,
+    windows,
+    out_path: Path,
+    sidecar_path: Path = None,
+    cache_dir: Path = None,
+    vol_window: int = VOL_WINDOW,
+    feature_store: Path = None,
+    feature_store_max_bytes: int = DEFAULT_MAX_BYTES,
+    dtype: str = "float64",
+) -> dict:
+    """
+    Build one dataset from one OHLCV CSV.
+
+    Writes the dataset (and the sidecar JSON if sidecar_path is given) and
+    returns the sidecar summary plus 'path' and 'format' of the artifact.
+    Raises ValueError when the warmup/trailing drop leaves no rows.
+    cache_dir keeps a parsed Parquet copy of the CSV for later rebuilds;
+    feature_store caches the computed feature matrix (matrix.feature.store);
+    dtype ("float64" or "float32") is the stored feature/label dtype.
+    """
     started_at = datetime.utcnow().isoformat() + "Z"
-    try:
-        df.to_parquet(out_path)
-        out_fmt = "parquet"
-    except Exception:
-        out_path = out_path.with_suffix(".pkl")
-        df.to_pickle(out_path)
-        out_fmt = "pickle"
+    horizons = parse_horizons(H)
+    raw = load_ohlcv_csv(Path(ohlcv_path), cache_dir=cache_dir)
+    source_rows = len(raw)
+    store = (
+        FeatureStore(feature_store, feature_store_max_bytes)
+        if feature_store is not None
+        else None
+    )
+    df, label_cols, warmup = build_frame(
+        raw, windows, H, transform, vol_window, store, dtype
+    )
+    n_rows = len(df)
+    if n_rows == 0:
+        raise ValueError(
+            f"No rows left in {ohlcv_path}: {source_rows} candles, {warmup} warmup"
+            f" (max(windows), vol_window - 1, H) and {max(horizons)} trailing rows"
+            " dropped; use a longer CSV or a smaller --vol-window/--windows/--H"
+        )
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out_path, out_fmt = write_dataset(df, Path(out_path))
     finished_at = datetime.utcnow().isoformat() + "Z"
     summary = {
         "n_rows": n_rows,
         "n_features": 6,
-        "label_name": label_name,
-        "label_H": H,
-        "windows": windows,
+        "label_name": label_cols[0],
+        "label_names": label_cols,
+        "label_H": horizons[0] if len(horizons) == 1 else horizons,
+        "transform": transform,
+        "windows": list(windows),
         "dropped_warmup": warmup,
-        "timeframe": args.timeframe,
+        "timeframe": timeframe,
         "started_at": started_at,
         "finished_at": finished_at,
         "sha_note": "binary artifacts are not tracked",
         "schema": "right-aligned",
+        "last_ts": str(df.index[-1]) if n_rows else None,
+        "source_rows": source_rows,
+        "vol_window": vol_window,
+        "dtype": dtype,
     }
+    if sidecar_path is not None:
+        with open(sidecar_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    return dict(summary, path=str(out_path), format=out_fmt)
+
+
+def append_dataset(out_path: Path, rows: pd.DataFrame) -> str:
+    """
+    Append rows to an existing dataset file.
+
+    Parquet files get a new row group via fastparquet; otherwise (pyarrow-only
+    or pickle) the file is read, concatenated and rewritten.
+    """
+    if out_path.suffix == ".parquet":
+        try:
+            from fastparquet import write
+
+            write(str(out_path), rows, append=True, stats=True)
+            return "row_group"
+        except Exception:
+            old = pd.read_parquet(out_path)
+            pd.concat([old, rows]).to_parquet(out_path)
+            return "rewrite"
+    old = pd.read_pickle(out_path)
+    pd.concat([old, rows]).to_pickle(out_path)
+    return "rewrite"
+
+
+def append_one(ohlcv_path: Path, out_path: Path, sidecar_path: Path) -> dict:
+    """
+    Extend a dataset built by build_one with the candles added to its CSV.
+
+    Only the CSV rows after the previous build plus a warm-up tail (the
+    feature lookback max(max(windows), vol_window - 1) and max(H)) are parsed;
+    features and labels are computed for that slice and rows newer than the
+    sidecar's last_ts are appended, so the result equals a full rebuild. The
+    sidecar is updated in place.
+    """
+    meta = json.loads(Path(sidecar_path).read_text(encoding="utf-8"))
+    missing = [k for k in ("last_ts", "source_rows", "vol_window") if k not in meta]
+    if missing or meta["last_ts"] is None:
+        raise ValueError(
+            f"Sidecar {sidecar_path} lacks append state {missing or ['last_ts']};"
+            " rebuild the dataset once without --append"
+        )
+    windows = meta["windows"]
+    horizons = parse_horizons(meta["label_H"])
+    H = max(horizons)
+    transform = meta.get("transform") or meta["label_name"].rsplit("_", 1)[-1]
+    vol_window = int(meta["vol_window"])
+    last_ts = pd.Timestamp(meta["last_ts"])
+    history = max(max(windows), vol_window - 1)
+    skip = max(int(meta["source_rows"]) - history - H, 0)
+    tail = load_ohlcv_csv(Path(ohlcv_path), skip_rows=skip)
+    new_pos = int(tail.index.searchsorted(last_ts, side="right"))
+    if skip and new_pos < history:
+        # The CSV changed before the previous end; fall back to a full parse.
+        skip = 0
+        tail = load_ohlcv_csv(Path(ohlcv_path))
+        new_pos = int(tail.index.searchsorted(last_ts, side="right"))
+    tail, label_cols = compute_columns(tail, windows, horizons, transform, vol_window)
+    delta = tail.iloc[new_pos:]
+    delta = delta[:-H] if H > 0 else delta
+    delta = finalize_frame(delta, windows, label_cols, meta.get("dtype", "float64"))
+    mode = append_dataset(Path(out_path), delta) if len(delta) else "noop"
+    meta.update(
+        n_rows=int(meta["n_rows"]) + len(delta),
+        last_ts=str(delta.index[-1]) if len(delta) else meta["last_ts"],
+        source_rows=skip + len(tail),
+        finished_at=datetime.utcnow().isoformat() + "Z",
+    )
     with open(sidecar_path, "w") as f:
-        json.dump(summary, f, indent=2)
-    print(f"Built dataset: {out_path} ({out_fmt}), rows={n_rows}, label={label_name}")
+        json.dump(meta, f, indent=2)
+    return dict(meta, appended_rows=len(delta), append_mode=mode)
+
+
+def _pair_slug(pair: str) -> str:
+    return pair.replace("/", "_").replace(":", "_")
+
+
+def plan_jobs(manifest: dict, out_dir: Path) -> list:
+    """
+    Expand a batch manifest into build_one keyword arguments.
+
+    Manifest layout (JSON):
+        {"ohlcv_template": "data/raw/{pair}_{timeframe}.csv",
+         "windows": [1, 3, 12],
+         "jobs": [{"pair": "BTC/USDT", "timeframe": "5m", "H": 3,
+                   "transform": "pct"}, ...]}
+    "H" may also be a list of horizons written as label columns of one
+    dataset (file H<H1>-<H2>-..._<transform>.parquet). A job may override
+    "ohlcv", "windows", "vol_window" and "dtype"; an optional top-level "cache_dir"
+    caches parsed CSVs (see read_ohlcv_csv) and "feature_store" (with
+    "feature_store_max_bytes") computed features shared by jobs over the same
+    candles (see matrix.feature.store). Outputs are partitioned as
+    <out_dir>/pair=<PAIR>/timeframe=<TF>/H<H>_<transform>.parquet.
+    """
+    template = manifest.get("ohlcv_template")
+    cache_dir = manifest.get("cache_dir")
+    feature_store = manifest.get("feature_store")
+    store_max_bytes = int(manifest.get("feature_store_max_bytes", DEFAULT_MAX_BYTES))
+    default_vol_window = manifest.get("vol_window", VOL_WINDOW)
+    default_windows = manifest.get("windows", [1, 3, 12])
+    default_dtype = manifest.get("dtype", "float64")
+    planned = []
+    for job in manifest["jobs"]:
+        slug = _pair_slug(job["pair"])
+        ohlcv = job.get("ohlcv")
+        if ohlcv is None:
+            if template is None:
+                raise ValueError(
+                    f"Job for {job['pair']} has no 'ohlcv' and no template"
+                )
+            ohlcv = template.format(pair=slug, timeframe=job["timeframe"], H=job["H"])
+        windows = job.get("windows", default_windows)
+        if isinstance(windows, str):
+            windows = [int(w) for w in windows.split(",") if w.strip()]
+        part = out_dir / f"pair={slug}" / f"timeframe={job['timeframe']}"
+        horizons = parse_horizons(job["H"])
+        h_tag = "-".join(str(h) for h in horizons)
+        planned.append(
+            {
+                "pair": job["pair"],
+                "ohlcv_path": Path(ohlcv),
+                "timeframe": job["timeframe"],
+                "H": horizons[0] if len(horizons) == 1 else horizons,
+                "transform": job["transform"],
+                "windows": [int(w) for w in windows],
+                "out_path": part / f"H{h_tag}_{job['transform']}.parquet",
+                "cache_dir": Path(cache_dir) if cache_dir else None,
+                "vol_window": int(job.get("vol_window", default_vol_window)),
+                "feature_store": Path(feature_store) if feature_store else None,
+                "feature_store_max_bytes": store_max_bytes,
+                "dtype": job.get("dtype", default_dtype),
+            }
+        )
+    return planned
+
+
+def _build_job(job: dict) -> dict:
+    kwargs = {k: v for k, v in job.items() if k != "pair"}
+    try:
+        summary = build_one(**kwargs)
+    except Exception as exc:
+        return {"pair": job["pair"], "timeframe": job["timeframe"], "error": str(exc)}
+    return dict(summary, pair=job["pair"])
+
+
+def build_batch(manifest: dict, out_dir: Path, workers: int) -> dict:
+    """
+    Run every manifest job across a process pool and write <out_dir>/_manifest.json.
+
+    Failed jobs are recorded with an 'error' entry instead of aborting the batch.
+    """
+    jobs = plan_jobs(manifest, out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.utcnow().isoformat() + "Z"
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_build_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_build_job, jobs))
+    for res in results:
+        if "path" in res:
+            res["path"] = Path(res["path"]).relative_to(out_dir).as_posix()
+    batch = {
+        "partitioning": ["pair", "timeframe"],
+        "started_at": started_at,
+        "finished_at": datetime.utcnow().isoformat() + "Z",
+        "n_jobs": len(jobs),
+        "n_failed": sum(1 for r in results if "error" in r),
+        "jobs": results,
+    }
+    with open(out_dir / "_manifest.json", "w") as f:
+        json.dump(batch, f, indent=2)
+    return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build MATRIX dataset from OHLCV CSV.")
+    parser.add_argument("--ohlcv")
+    parser.add_argument("--timeframe")
+    parser.add_argument(
+        "--H", help="Label horizon in bars, or comma-separated horizons (3,6,12)"
+    )
+    parser.add_argument("--transform", choices=["pct", "log"])
+    parser.add_argument("--windows")
+    parser.add_argument("--out")
+    parser.add_argument("--sidecar-json", default=None)
+    parser.add_argument(
+        "--cache-dir", default=None, help="Cache parsed OHLCV CSVs as Parquet here"
+    )
+    parser.add_argument(
+        "--vol-window",
+        type=int,
+        default=VOL_WINDOW,
+        help="Rolling window (bars) of the f_vol_z robust z-score",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=DTYPES,
+        default="float64",
+        help="Stored dtype of features and labels",
+    )
+    parser.add_argument(
+        "--feature-store",
+        default=None,
+        help="Cache computed feature matrices in this directory",
+    )
+    parser.add_argument(
+        "--feature-store-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 2**20,
+        help="Feature store size limit; least recently used entries are evicted",
+    )
+    parser.add_argument(
+        "--manifest", default=None, help="Batch mode: JSON manifest of build jobs"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Append candles added to --ohlcv since the last build of --out",
+    )
+    parser.add_argument("--out-dir", default="data/datasets")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    if args.manifest:
+        manifest = json.loads(Path(args.manifest).read_text(encoding="utf-8"))
+        batch = build_batch(manifest, Path(args.out_dir), args.workers)
+        print(
+            f"Built {batch['n_jobs'] - batch['n_failed']}/{batch['n_jobs']} datasets"
+            f" under {args.out_dir}"
+        )
+        exit(1 if batch["n_failed"] else 0)
+    if args.append:
+        if args.ohlcv is None or args.out is None:
+            parser.error("--append requires --ohlcv and --out")
+        out_path = Path(args.out)
+        sidecar_path = (
+            Path(args.sidecar_json)
+            if args.sidecar_json
+            else out_path.with_suffix(".json")
+        )
+        summary = append_one(Path(args.ohlcv), out_path, sidecar_path)
+        print(
+            f"Appended {summary['appended_rows']} rows to {out_path}"
+            f" ({summary['append_mode']}), rows={summary['n_rows']}"
+        )
+        exit(0)
+    missing = [
+        flag
+        for flag, value in [
+            ("--ohlcv", args.ohlcv),
+            ("--timeframe", args.timeframe),
+            ("--H", args.H),
+            ("--transform", args.transform),
+            ("--windows", args.windows),
+            ("--out", args.out),
+        ]
+        if value is None
+    ]
+    if missing:
+        parser.error("the following arguments are required: " + ", ".join(missing))
+    windows = [int(w) for w in args.windows.split(",") if w.strip()]
+    out_path = Path(args.out)
+    sidecar_path = (
+        Path(args.sidecar_json) if args.sidecar_json else out_path.with_suffix(".json")
+    )
+    try:
+        summary = build_one(
+            Path(args.ohlcv),
+            args.timeframe,
+            parse_horizons(args.H),
+            args.transform,
+            windows,
+            out_path,
+            sidecar_path,
+            Path(args.cache_dir) if args.cache_dir else None,
+            args.vol_window,
+            Path(args.feature_store) if args.feature_store else None,
+            args.feature_store_max_mb * 2**20,
+            args.dtype,
+        )
+    except ValueError as exc:
+        print(f"Build failed: {exc}", file=sys.stderr)
+        exit(1)
+    print(
+        f"Built dataset: {summary['path']} ({summary['format']}), "
+        f"rows={summary['n_rows']}, label={','.join(summary['label_names'])}"
+    )
     exit(0)
 
 
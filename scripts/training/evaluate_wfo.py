@@ -10,14 +10,49 @@ Usage:
     --out-json docs/summaries/WFO_SUMMARY_SAMPLE.json \
     --out-md docs/summaries/WFO_SUMMARY_SAMPLE.md \
     --run-tag SAMPLE_3D
+
+With --refit every block fits the train_baseline model on its train window
+(ridge with an unpenalized intercept and --alpha when sklearn is installed,
+OLS/Tikhonov without intercept and --lmbd otherwise), predicts the test
+window, maps the predictions to signals (--up/--dn/--hysteresis/--cooldown)
+and reports prediction and trading metrics (hit_rate, pnl, max_dd,
+churn_rate) instead of label statistics. X^T X, X^T y and the column sums
+are accumulated once as prefix sums over the sorted train window boundaries
+(ridge centers each window from them), so expanding windows reuse the
+previous block's sums and each block only solves a d x d system.
+
+Block boundaries are resolved once with searchsorted into integer row slices
+and blocks are evaluated over zero-copy slices of the label array (NaN counts
+come from one prefix sum), optionally across a thread pool (--workers).
 """
 
-import argparse, sys, json
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.matrix.infra.dataset_io import (  # noqa: E402
+    dataset_columns,
+    dataset_time_range,
+    read_dataset,
+)
+from src.matrix.strategy.mapping import map_predictions_to_signals  # noqa: E402
+from src.matrix.strategy.signal_metrics import signal_metrics  # noqa: E402
+from scripts.training.train_baseline import (  # noqa: E402
+    SKLEARN_AVAILABLE,
+    compute_metrics,
+    select_features,
+    solve_normal_equations,
+)
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="Offline WFO evaluation runner for MATRIX.")
@@ -30,14 +65,39 @@ def parse_args():
     p.add_argument("--out-json", required=True)
     p.add_argument("--out-md", required=True)
     p.add_argument("--run-tag", required=True)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument(
+        "--refit",
+        action="store_true",
+        help="Fit the baseline model per block and evaluate its signals",
+    )
+    p.add_argument("--features", default="", help="Comma-separated feature names")
+    p.add_argument("--alpha", type=float, default=0.1, help="Ridge alpha (if sklearn)")
+    p.add_argument(
+        "--lmbd", type=float, default=0.0, help="OLS regularization (if no sklearn)"
+    )
+    p.add_argument(
+        "--purge-bars",
+        type=int,
+        default=None,
+        help="Drop the last N train rows of each block"
+        " (default: H of a label_R_H<H>_* --label-name)",
+    )
+    p.add_argument("--up", type=float, default=0.1)
+    p.add_argument("--dn", type=float, default=-0.1)
+    p.add_argument("--hysteresis", type=float, default=0.02)
+    p.add_argument("--cooldown", type=int, default=3)
     return p.parse_args()
 
 
-def load_dataset(path):
-    try:
-        df = pd.read_parquet(path)
-    except Exception:
-        df = pd.read_pickle(Path(path).with_suffix(".pkl"))
+def dataset_path(path):
+    path = Path(path)
+    return path if path.exists() else path.with_suffix(".pkl")
+
+
+def load_dataset(path, columns=None, start=None, end=None):
+    # Reads only `columns` and the row groups overlapping [start, end]
+    df = read_dataset(dataset_path(path), columns, start, end)
     if not df.index.is_monotonic_increasing:
         raise ValueError("Index must be monotonic increasing.")
     if not (df.index.tz and str(df.index.tz) == "UTC"):
@@ -45,7 +105,8 @@ def load_dataset(path):
     return df
 
 
-def build_blocks(df, from_date, to_date, block_days, gap_days):
+def build_blocks(first_ts, from_date, to_date, block_days, gap_days):
+    # first_ts: first dataset timestamp (train windows start there)
     blocks = []
     dt_from = pd.Timestamp(from_date).tz_localize("UTC")
     dt_to = pd.Timestamp(to_date).tz_localize("UTC")
@@ -55,9 +116,7 @@ def build_blocks(df, from_date, to_date, block_days, gap_days):
         test_to = cur + timedelta(days=block_days)
         train_to = test_from - pd.Timedelta(minutes=5)
         train_from = (
-            df.index[df.index < train_to][0]
-            if len(df.index[df.index < train_to]) > 0
-            else train_to
+            first_ts if first_ts is not None and first_ts < train_to else train_to
         )
         blocks.append(
             {
@@ -71,41 +130,335 @@ def build_blocks(df, from_date, to_date, block_days, gap_days):
     return blocks
 
 
-def block_metrics(df, label_col, test_from, test_to):
-    block = df.loc[(df.index >= test_from) & (df.index < test_to)]
-    n = len(block)
+def block_bounds(index, blocks):
+    """Integer row slices [lo, hi) of each block's [test_from, test_to) window."""
+    starts = pd.DatetimeIndex([pd.Timestamp(b["test_from"]) for b in blocks])
+    ends = pd.DatetimeIndex([pd.Timestamp(b["test_to"]) for b in blocks])
+    return index.searchsorted(starts, "left"), index.searchsorted(ends, "left")
+
+
+def slice_metrics(label, nan_cum, n_cols, lo, hi):
+    """
+    Block metrics of rows lo..hi-1.
+
+    label: label values (NaNs are skipped like pandas reductions)
+    nan_cum: prefix sums of per-row NaN counts over all columns
+    """
+    n = int(hi - lo)
     if n == 0:
         return None
-    nan_ratio = block.isna().sum().sum() / (n * len(block.columns))
-    label = block[label_col]
-    trigger_rate = np.mean(label > 0)
-    mean_R = np.mean(label)
-    hit_rate = np.mean(label > 0)
-    cum_label = label.cumsum()
-    dd_min = float((cum_label.cummax() - cum_label).min())
+    block = label[lo:hi]
+    nan = np.isnan(block)
+    valid = block[~nan]
+    positive = float(np.mean(block > 0))
+    # Series.mean: NaNs summed as zero, divided by the non-NaN count (label dtype)
+    count = block.dtype.type(valid.shape[0])
+    mean_R = np.where(nan, 0, block).sum() / count if valid.shape[0] else np.nan
+    cum_label = np.cumsum(valid)
+    dd = np.maximum.accumulate(cum_label) - cum_label
     return {
         "n": n,
-        "nan_ratio": float(nan_ratio),
-        "trigger_rate": float(trigger_rate),
+        "nan_ratio": float(int(nan_cum[hi] - nan_cum[lo]) / (n * n_cols)),
+        "trigger_rate": positive,
         "mean_R": float(mean_R),
-        "hit_rate": float(hit_rate),
-        "dd_min": dd_min,
+        "hit_rate": positive,
+        "dd_min": float(dd.min()) if dd.shape[0] else float("nan"),
+    }
+
+
+def evaluate_blocks(df, label_col, blocks, workers=1):
+    """Metrics of every block (None for empty ones), in block order."""
+    if not blocks:
+        return []
+    label = df[label_col].to_numpy()
+    nan_cum = np.concatenate(([0], np.cumsum(df.isna().to_numpy().sum(axis=1))))
+    n_cols = len(df.columns)
+    lo, hi = block_bounds(df.index, blocks)
+
+    def run(ids):
+        return [slice_metrics(label, nan_cum, n_cols, lo[i], hi[i]) for i in ids]
+
+    chunks = np.array_split(np.arange(len(blocks)), min(len(blocks), workers * 4))
+    if workers <= 1 or len(chunks) <= 1:
+        return run(range(len(blocks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [m for part in pool.map(run, chunks) for m in part]
+
+
+def block_metrics(df, label_col, test_from, test_to):
+    blocks = [{"test_from": test_from, "test_to": test_to}]
+    return evaluate_blocks(df, label_col, blocks)[0]
+
+
+def train_bounds(index, blocks, purge_bars=0):
+    """Integer row slices [lo, hi) of each block's [train_from, train_to] window."""
+    starts = pd.DatetimeIndex([pd.Timestamp(b["train_from"]) for b in blocks])
+    ends = pd.DatetimeIndex([pd.Timestamp(b["train_to"]) for b in blocks])
+    lo = index.searchsorted(starts, "left")
+    hi = np.maximum(index.searchsorted(ends, "right") - purge_bars, lo)
+    return lo, hi
+
+
+def prefix_normal_equations(X, y, cuts, workers=1):
+    """
+    X^T X, X^T y, column sums of X and y and row counts of rows [0, c) for
+    every sorted cut c.
+
+    Rows with a non-finite feature or label are left out. The Gram matrix of
+    each segment between consecutive cuts is computed once (in a thread pool)
+    and accumulated, so window sums are differences of prefix entries.
+    """
+    ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    edges = np.concatenate(([0], cuts))
+
+    def segment(k):
+        rows = slice(edges[k], edges[k + 1])
+        Xs, ys = X[rows][ok[rows]], y[rows][ok[rows]]
+        return Xs.T @ Xs, Xs.T @ ys, Xs.sum(axis=0), ys.sum(), Xs.shape[0]
+
+    ids = range(len(cuts))
+    if workers <= 1:
+        parts = [segment(k) for k in ids]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(segment, ids))
+    xtx = np.cumsum([p[0] for p in parts], axis=0)
+    xty = np.cumsum([p[1] for p in parts], axis=0)
+    sx = np.cumsum([p[2] for p in parts], axis=0)
+    sy = np.cumsum([p[3] for p in parts])
+    count = np.cumsum([p[4] for p in parts])
+    return xtx, xty, sx, sy, count
+
+
+def trade_metrics(label, signals):
+    """
+    Hit rate and drawdown of the entries, scored by their forward return label.
+
+    A long entry earns +label, a short entry -label at its entry bar; hit_rate
+    is the share of entries with a positive outcome, pnl their sum and max_dd
+    the largest drop of the cumulative outcome from its running peak.
+    """
+    longs = np.flatnonzero(np.asarray(signals["enter_long"]) != 0)
+    shorts = np.flatnonzero(np.asarray(signals["enter_short"]) != 0)
+    entries = np.concatenate((longs, shorts))
+    outcome = np.concatenate((label[longs], -label[shorts]))[np.argsort(entries)]
+    outcome = np.nan_to_num(outcome.astype(np.float64))
+    cum = np.concatenate(([0.0], np.cumsum(outcome)))
+    return {
+        "hit_rate": float(np.mean(outcome > 0)) if outcome.shape[0] else 0.0,
+        "pnl": float(cum[-1]),
+        "max_dd": float((np.maximum.accumulate(cum) - cum).max()),
+    }
+
+
+def refit_blocks(
+    df,
+    features,
+    label_col,
+    blocks,
+    lmbd=0.0,
+    mapper=None,
+    purge_bars=0,
+    workers=1,
+    fit_intercept=False,
+):
+    """
+    Walk-forward refit: per block fit on the train window, score the test window.
+
+    Args:
+        df: dataset covering the train and test windows (sorted UTC index)
+        features: feature columns; label_col: regression target
+        blocks: build_blocks() output
+        lmbd: Tikhonov regularization of the OLS fit (ridge alpha with
+            fit_intercept)
+        mapper: map_predictions_to_signals parameters (up, dn, hysteresis,
+            cooldown_bars)
+        purge_bars, workers: see parse_args
+        fit_intercept: center each train window (unpenalized intercept, as
+            sklearn Ridge); otherwise the fit has no intercept
+
+    Returns:
+        per block a metrics dict (None when the train or test window is empty):
+        n_train, n, coef, intercept, mse/r2 of the test predictions, signal metrics
+        (trigger_rate, churn_rate, n_entries) and trade_metrics.
+    """
+    if not blocks:
+        return []
+    mapper = mapper or {"up": 0.1, "dn": -0.1, "hysteresis": 0.02, "cooldown_bars": 3}
+    X = df[features].to_numpy(dtype=np.float64)
+    y = df[label_col].to_numpy(dtype=np.float64)
+    train_lo, train_hi = train_bounds(df.index, blocks, purge_bars)
+    test_lo, test_hi = block_bounds(df.index, blocks)
+    cuts = np.unique(np.concatenate((train_lo, train_hi)))
+    xtx, xty, sx, sy, count = prefix_normal_equations(X, y, cuts, workers)
+    k_lo, k_hi = np.searchsorted(cuts, train_lo), np.searchsorted(cuts, train_hi)
+
+    def run(i):
+        n_train = int(count[k_hi[i]] - count[k_lo[i]])
+        lo, hi = test_lo[i], test_hi[i]
+        if n_train == 0 or hi == lo:
+            return None
+        a, b = k_lo[i], k_hi[i]
+        gram, moment = xtx[b] - xtx[a], xty[b] - xty[a]
+        intercept = 0.0
+        if fit_intercept:
+            # Centered window sums: X^T X - n mx mx^T, X^T y - n mx my
+            mx, my = (sx[b] - sx[a]) / n_train, (sy[b] - sy[a]) / n_train
+            gram = gram - n_train * np.outer(mx, mx)
+            moment = moment - n_train * mx * my
+        coef = solve_normal_equations(gram, moment, lmbd)
+        if fit_intercept:
+            intercept = float(my - mx @ coef)
+        pred = X[lo:hi] @ coef + intercept
+        label = y[lo:hi]
+        ok = np.isfinite(pred) & np.isfinite(label)
+        fit = compute_metrics(label[ok], pred[ok]) if ok.any() else {}
+        signals = map_predictions_to_signals(pred, engine="numpy", **mapper)
+        sig = signal_metrics(signals, mapper["cooldown_bars"])
+        return {
+            "n_train": n_train,
+            "n": int(hi - lo),
+            "coef": [float(c) for c in coef],
+            "intercept": intercept,
+            "mse": fit.get("mse", float("nan")),
+            "r2": fit.get("r2", float("nan")),
+            "trigger_rate": sig["trigger_rate"],
+            "churn_rate": sig["churn_rate"],
+            "n_entries": sig["n_entries"],
+            **trade_metrics(label, signals),
+        }
+
+    if workers <= 1:
+        return [run(i) for i in range(len(blocks))]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, range(len(blocks))))
+
+
+def label_horizon(label_col):
+    # H of a "label_R_H<H>_<transform>" column, else None
+    m = re.fullmatch(r"label_R_H(\d+)_\w+", label_col)
+    return int(m.group(1)) if m else None
+
+
+def run_refit(args, path, label_col, blocks_plan):
+    if args.purge_bars is None:
+        # Labels look H bars ahead: purge them so no train label sees the test block
+        args.purge_bars = label_horizon(label_col)
+        if args.purge_bars is None:
+            print(
+                f"Cannot infer H from label {label_col}; pass --purge-bars.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    features = [f.strip() for f in args.features.split(",") if f.strip()]
+    features = [
+        f for f in select_features(dataset_columns(path), features) if f != label_col
+    ]
+    if not features:
+        print("No feature columns selected.", file=sys.stderr)
+        sys.exit(1)
+    mapper = {
+        "up": args.up,
+        "dn": args.dn,
+        "hysteresis": args.hysteresis,
+        "cooldown_bars": args.cooldown,
+    }
+    # Train windows start at the first row: read up to the last test block
+    df = load_dataset(
+        path,
+        features + [label_col],
+        end=blocks_plan[-1]["test_to"] if blocks_plan else None,
+    )
+    # Same model as train_baseline: ridge with intercept when sklearn is present
+    if SKLEARN_AVAILABLE:
+        model = {"type": "ridge", "alpha": args.alpha}
+    else:
+        model = {"type": "ols", "lmbd": args.lmbd}
+    metrics = refit_blocks(
+        df,
+        features,
+        label_col,
+        blocks_plan,
+        args.alpha if SKLEARN_AVAILABLE else args.lmbd,
+        mapper,
+        purge_bars=args.purge_bars,
+        workers=args.workers,
+        fit_intercept=SKLEARN_AVAILABLE,
+    )
+    results = []
+    for b, m in zip(blocks_plan, metrics):
+        if m is None:
+            continue
+        b.update(m)
+        results.append(b)
+    if not results:
+        print("No valid blocks found.", file=sys.stderr)
+        sys.exit(1)
+    out_json = Path(args.out_json)
+    out_md = Path(args.out_md)
+    summary = {
+        "run_tag": args.run_tag,
+        "label": label_col,
+        "timeframe": "5m",
+        "mode": "refit",
+        "features": features,
+        "model": model,
+        "params": {
+            "block_days": args.block_days,
+            "gap_days": args.gap_days,
+            "from": args.from_date,
+            "to": args.to_date,
+            "purge_bars": args.purge_bars,
+            **mapper,
+        },
+        "blocks": results,
+        "created_at": datetime.utcnow().isoformat() + "Z",
     }
+    with open(out_json, "w") as f:
+        json.dump(summary, f, indent=2)
+    md = [
+        "| train_from | train_to | test_from | test_to | n_train | n | mse | r2 | trigger_rate | churn_rate | hit_rate | pnl | max_dd |",
+        "|------------|----------|-----------|---------|---------|---|-----|----|--------------|------------|----------|-----|--------|",
+    ]
+    for b in results:
+        md.append(
+            f"| {b['train_from']} | {b['train_to']} | {b['test_from']} | {b['test_to']} | {b['n_train']} | {b['n']} | {b['mse']:.6g} | {b['r2']:.4f} | {b['trigger_rate']:.4f} | {b['churn_rate']:.4f} | {b['hit_rate']:.4f} | {b['pnl']:.6f} | {b['max_dd']:.6f} |"
+        )
+    md.append("\n**Provenance:**")
+    md.append(
+        f"run_tag: {args.run_tag}, label: {label_col}, features: {','.join(features)}, params: {json.dumps(summary['params'])}"
+    )
+    with open(out_md, "w") as f:
+        f.write("\n".join(md))
+    print(f"WFO refit evaluation complete: {out_json} {out_md}")
+    sys.exit(0)
 
 
 def main():
     args = parse_args()
-    df = load_dataset(args.dataset)
+    path = dataset_path(args.dataset)
     label_col = args.label_name
-    if label_col not in df.columns:
+    if label_col not in dataset_columns(path):
         print(f"Label column {label_col} not found.", file=sys.stderr)
         sys.exit(1)
+    first_ts, _ = dataset_time_range(path)
+    if first_ts is not None and first_ts.tz is None:
+        first_ts = first_ts.tz_localize("UTC")
     blocks_plan = build_blocks(
-        df, args.from_date, args.to_date, args.block_days, args.gap_days
+        first_ts, args.from_date, args.to_date, args.block_days, args.gap_days
+    )
+    if args.refit:
+        return run_refit(args, path, label_col, blocks_plan)
+    # Only the evaluated test range is read from the dataset
+    df = load_dataset(
+        path,
+        start=blocks_plan[0]["test_from"] if blocks_plan else None,
+        end=blocks_plan[-1]["test_to"] if blocks_plan else None,
     )
     results = []
-    for b in blocks_plan:
-        m = block_metrics(df, label_col, b["test_from"], b["test_to"])
+    for b, m in zip(
+        blocks_plan, evaluate_blocks(df, label_col, blocks_plan, args.workers)
+    ):
         if m is None:
             continue
         b.update(m)
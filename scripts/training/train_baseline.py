@@ -8,7 +8,6 @@ import sys
 import json
 import datetime
 import numpy as np
-import pandas as pd
 
 try:
     from sklearn.linear_model import Ridge
@@ -17,26 +16,29 @@ try:
 except ImportError:
     SKLEARN_AVAILABLE = False
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+from src.matrix.feature.engineering import FeaturePipeline  # noqa: E402
+from src.matrix.infra.dataset_io import dataset_columns, read_dataset  # noqa: E402
+
 
 # --- Helpers ---
-def load_dataset(path):
+def load_dataset(path, columns=None, start=None, end=None):
+    # Reads only `columns` and the row groups overlapping [start, end]
     path = pathlib.Path(path)
-    if path.suffix == ".parquet":
-        df = pd.read_parquet(path)
-    elif path.suffix == ".pkl":
-        df = pd.read_pickle(path)
-    else:
+    if path.suffix not in (".parquet", ".pkl"):
         raise ValueError(f"Unsupported dataset format: {path.suffix}")
+    df = read_dataset(path, columns, start, end)
     if not df.index.is_monotonic_increasing:
         raise ValueError("Dataset index must be monotonic increasing (UTC)")
     return df
 
 
-def select_features(df, features):
+def select_features(columns, features):
     if features:
-        return [f for f in features if f in df.columns]
+        return [f for f in features if f in columns]
     # Default: all columns starting with 'f_'
-    return [c for c in df.columns if c.startswith("f_")]
+    return [c for c in columns if c.startswith("f_")]
 
 
 def right_align_train(df, train_from, train_to):
@@ -45,6 +47,18 @@ def right_align_train(df, train_from, train_to):
     return df.loc[mask]
 
 
+def resolve_dtype(df, columns, dtype):
+    # "auto" keeps the stored dtype: float32 only if every column is float32
+    if dtype != "auto":
+        return np.dtype(dtype)
+    stored = {df[c].dtype for c in columns}
+    return (
+        np.dtype(np.float32)
+        if stored == {np.dtype(np.float32)}
+        else np.dtype(np.float64)
+    )
+
+
 def train_ridge(X, y, alpha):
     model = Ridge(alpha=alpha)
     model.fit(X, y)
@@ -52,27 +66,199 @@ def train_ridge(X, y, alpha):
     return model, y_pred
 
 
+def solve_normal_equations(xtx, xty, lmbd=0.0):
+    # Tikhonov-regularized normal equations (X^T X + lmbd*I) coef = X^T y via
+    # Cholesky (A = L L^T: solve L z = X^T y, then L^T coef = z). Windows whose
+    # A is not positive definite (fewer rows than features, lmbd=0) fall back
+    # to the minimum-norm least-squares solution.
+    A = xtx + lmbd * np.eye(xtx.shape[0], dtype=xtx.dtype)
+    try:
+        L = np.linalg.cholesky(A)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(A, xty, rcond=None)[0]
+    return np.linalg.solve(L.T, np.linalg.solve(L, xty))
+
+
+class NormalEquations:
+    """
+    Running X^T X and X^T y of a training window.
+
+    add_rows appends the newest rows, remove_rows drops the oldest rows still
+    in the window (FIFO), so a sliding or expanding retrain costs
+    O(changed rows x features^2) instead of O(window x features^2).
+    With decay < 1 every row is weighted decay**age (age 0 = newest row),
+    i.e. exponentially weighted least squares.
+
+    Args:
+        n_features: number of feature columns
+        decay: per-row forgetting factor in (0, 1]
+        dtype: accumulation dtype (float32 datasets train in float32)
+        n_targets: number of target columns solved together (y of shape
+            (n, n_targets), X^T Y of shape (d, n_targets)); None for a vector y
+    """
+
+    def __init__(self, n_features, decay=1.0, dtype=np.float64, n_targets=None):
+        if not 0.0 < decay <= 1.0:
+            raise ValueError(f"decay must be in (0, 1], got {decay}")
+        self.decay = decay
+        self.dtype = np.dtype(dtype)
+        self.n_targets = n_targets
+        self.xtx = np.zeros((n_features, n_features), dtype=self.dtype)
+        shape = n_features if n_targets is None else (n_features, n_targets)
+        self.xty = np.zeros(shape, dtype=self.dtype)
+        self.added = 0
+        self.removed = 0
+
+    @property
+    def n(self):
+        """Rows currently in the window."""
+        return self.added - self.removed
+
+    def _rows(self, X, y):
+        X = np.asarray(X, dtype=self.dtype).reshape(-1, self.xtx.shape[0])
+        shape = -1 if self.n_targets is None else (-1, self.n_targets)
+        return X, np.asarray(y, dtype=self.dtype).reshape(shape)
+
+    def add_rows(self, X, y):
+        X, y = self._rows(X, y)
+        m = X.shape[0]
+        if self.decay == 1.0:
+            self.xtx += X.T @ X
+            self.xty += X.T @ y
+        else:
+            self.xtx *= self.decay**m
+            self.xty *= self.decay**m
+            w = (self.decay ** np.arange(m - 1, -1, -1)).astype(self.dtype)
+            self.xtx += (X * w[:, None]).T @ X
+            self.xty += (X * w[:, None]).T @ y
+        self.added += m
+        return self
+
+    def remove_rows(self, X, y):
+        X, y = self._rows(X, y)
+        m = X.shape[0]
+        if m > self.n:
+            raise ValueError(f"Cannot remove {m} rows from a window of {self.n}")
+        if self.decay == 1.0:
+            self.xtx -= X.T @ X
+            self.xty -= X.T @ y
+        else:
+            age = self.added - 1 - (self.removed + np.arange(m))
+            w = (self.decay**age).astype(self.dtype)
+            self.xtx -= (X * w[:, None]).T @ X
+            self.xty -= (X * w[:, None]).T @ y
+        self.removed += m
+        return self
+
+    def solve(self, lmbd=0.0):
+        return solve_normal_equations(self.xtx, self.xty, lmbd)
+
+
+class LinearModel:
+    def __init__(self, coef):
+        self.coef_ = coef
+
+    def predict(self, X):
+        return np.asarray(X) @ self.coef_
+
+
 def train_ols_tikhonov(X, y, lmbd):
     # OLS with Tikhonov regularization: (X^T X + lmbd*I)^-1 X^T y
+    # Solved in the dtype of X (float32 datasets train in float32)
     X_ = np.asarray(X)
-    y_ = np.asarray(y)
-    n_features = X_.shape[1]
-    A = X_.T @ X_ + lmbd * np.eye(n_features)
-    b = X_.T @ y_
-    coef = np.linalg.solve(A, b)
+    acc = NormalEquations(X_.shape[1], dtype=X_.dtype).add_rows(X_, y)
+    coef = acc.solve(lmbd)
     y_pred = X_ @ coef
+    return LinearModel(coef), y_pred
 
-    class Model:
-        def __init__(self, coef):
-            self.coef_ = coef
-
-        def predict(self, X):
-            return np.asarray(X) @ self.coef_
 
-    return Model(coef), y_pred
+def parse_reg_grid(spec):
+    # "a,b,c" or "log:lo:hi:num" (num values, log10-spaced from 10**lo to 10**hi)
+    message = f"Regularization grid needs values >= 0: {spec}"
+    if spec.startswith("log:"):
+        fields = spec[4:].split(":")
+        try:
+            lo, hi, num = float(fields[0]), float(fields[1]), int(fields[2])
+        except (IndexError, ValueError):
+            raise ValueError(message) from None
+        if len(fields) != 3 or num < 1:
+            raise ValueError(message)
+        return [float(v) for v in np.logspace(lo, hi, num)]
+    grid = [float(v) for v in spec.split(",") if v.strip()]
+    if not grid or min(grid) < 0:
+        raise ValueError(message)
+    return grid
+
+
+def regularization_path(X, y, lmbds, fit_intercept=False):
+    """
+    Closed-form ridge/Tikhonov fits for a whole grid of regularization values.
+
+    One eigendecomposition X^T X = V diag(s) V^T (of centered X with
+    fit_intercept, as sklearn Ridge) gives every fit: coef(l) =
+    V diag(1 / (s + l)) V^T X^T y, RSS(l) = y^T y - sum c^2 (s + 2l) / (s + l)^2
+    with c = V^T X^T y, and effective degrees of freedom df(l) = sum s / (s + l).
+    Cost: O(n d^2) for X^T X once, then O(d^3 + grid x d^2).
+
+    Args:
+        X, y: training features and target
+        lmbds: regularization values (>= 0; zero eigenvalues of an unregularized
+            fit are skipped, i.e. the minimum-norm solution)
+        fit_intercept: center X and y (unpenalized intercept)
+
+    Returns:
+        (coefs (k, d), intercepts (k,), rows) where rows are dicts with lmbd,
+        df, gcv (generalized cross-validation n * RSS / (n - df)^2, lower is
+        better), mse, r2, resid_mean and resid_std of the training fit.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = X.shape[0]
+    acc = NormalEquations(X.shape[1]).add_rows(X, y)
+    xtx, xty, yy = acc.xtx, acc.xty, float(y @ y)
+    x_sum = X.sum(axis=0)
+    x_mean, y_mean = x_sum / n, float(y.mean())
+    if fit_intercept:
+        xtx = xtx - n * np.outer(x_mean, x_mean)
+        xty = xty - n * x_mean * y_mean
+        yy = yy - n * y_mean**2
+    s, V = np.linalg.eigh(xtx)
+    s = np.maximum(s, 0.0)
+    c = V.T @ xty
+    lam = np.asarray(lmbds, dtype=np.float64)[:, None]
+    denom = s[None, :] + lam
+    tol = s.max(initial=0.0) * s.shape[0] * np.finfo(np.float64).eps
+    live = denom > tol
+    inv = np.where(live, 1.0 / np.where(live, denom, 1.0), 0.0)
+    coefs = (inv * c[None, :]) @ V.T
+    intercepts = y_mean - coefs @ x_mean if fit_intercept else np.zeros(len(lam))
+    rss = yy - np.sum(c[None, :] ** 2 * (2 * inv - s[None, :] * inv**2), axis=1)
+    rss = np.maximum(rss, 0.0)
+    dof = np.sum(s[None, :] * inv, axis=1) + (1 if fit_intercept else 0)
+    tss = float(np.sum((y - y_mean) ** 2))
+    resid_mean = np.zeros(len(lam)) if fit_intercept else (y.sum() - coefs @ x_sum) / n
+    mse = rss / n
+    rows = []
+    for k, lmbd in enumerate(lam[:, 0]):
+        gcv = n * rss[k] / (n - dof[k]) ** 2 if n > dof[k] else float("inf")
+        rows.append(
+            {
+                "lmbd": float(lmbd),
+                "df": float(dof[k]),
+                "gcv": float(gcv),
+                "mse": float(mse[k]),
+                "r2": float(1 - rss[k] / tss) if n > 1 and tss > 0 else float("nan"),
+                "resid_mean": float(resid_mean[k]),
+                "resid_std": float(np.sqrt(max(mse[k] - resid_mean[k] ** 2, 0.0))),
+            }
+        )
+    return coefs, intercepts, rows
 
 
 def compute_metrics(y_true, y_pred):
+    # Metrics are always reduced in float64
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
     resid = y_true - y_pred
     mae = float(np.mean(np.abs(resid)))
     mse = float(np.mean(resid**2))
@@ -119,6 +305,99 @@ def update_metadata(meta_path, new_meta):
         json.dump(meta, f, indent=2)
 
 
+def train_summary(
+    run_tag,
+    label,
+    features,
+    train_from,
+    train_to,
+    n,
+    model_type,
+    dtype,
+    pipeline,
+    metrics,
+    created_at,
+):
+    # Train summary JSON (schema: TRAINING_PROTOCOL.md)
+    return {
+        "run_tag": run_tag,
+        "label": label,
+        "features": features,
+        "train": {"from": train_from, "to": train_to, "n": int(n)},
+        "model": model_type,
+        "dtype": np.dtype(dtype).name,
+        "pipeline": (
+            None
+            if pipeline is None
+            else dict(
+                pipeline.to_dict()["params"], output_columns=pipeline.output_columns
+            )
+        ),
+        "metrics": metrics,
+        "created_at": created_at,
+    }
+
+
+def save_artifacts(model_tag, model, pipeline, save_model=None):
+    # Optional model pickle plus the fitted feature pipeline next to the model
+    # (inference applies it as is); returns (pickle_path, pipeline_path)
+    pickle_path = None
+    if save_model:
+        pathlib.Path(save_model).parent.mkdir(parents=True, exist_ok=True)
+        save_pickle(model, save_model)
+        pickle_path = str(save_model)
+    meta_dir = pathlib.Path(f"models/{model_tag}")
+    meta_dir.mkdir(parents=True, exist_ok=True)
+    pipeline_path = None
+    if pipeline is not None:
+        pipeline_path = (
+            pathlib.Path(save_model).with_suffix(".pipeline.json")
+            if save_model
+            else meta_dir / "pipeline.json"
+        )
+        pipeline_path = str(pipeline.save(pipeline_path))
+    return pickle_path, pipeline_path
+
+
+def registry_metadata(
+    model_tag,
+    created_at,
+    label,
+    features,
+    dataset,
+    train_from,
+    train_to,
+    rows,
+    algo,
+    dtype,
+    pickle_path,
+    pipeline_path,
+    commit,
+    generator="scripts/training/train_baseline.py",
+):
+    # Registry entry for models/<tag>/metadata.json (schema: MODEL_REGISTRY.md)
+    # Try to infer timeframe from dataset name (simple heuristic)
+    tf = None
+    if "5m" in str(dataset):
+        tf = "5m"
+    return {
+        "model_tag": model_tag,
+        "created_at": created_at,
+        "label": label,
+        "features": features,
+        "timeframe": tf,
+        "train_window": {"from": train_from, "to": train_to, "rows": int(rows)},
+        "algo": algo,
+        "dtype": np.dtype(dtype).name,
+        "artifacts": {"pickle_path": pickle_path, "pipeline_path": pipeline_path},
+        "provenance": {
+            "dataset_path": str(dataset),
+            "commit": commit,
+            "generator": generator,
+        },
+    }
+
+
 # --- Main CLI ---
 def main():
     parser = argparse.ArgumentParser(description="Offline baseline model trainer")
@@ -136,25 +415,84 @@ def main():
     parser.add_argument(
         "--lmbd", type=float, default=0.0, help="OLS regularization (if no sklearn)"
     )
+    parser.add_argument(
+        "--robust-scale",
+        action="store_true",
+        help="Fit median/IQR scaling on the train window (FeaturePipeline)",
+    )
+    parser.add_argument(
+        "--clip-iqr",
+        type=float,
+        default=None,
+        help="Clip features to [q25 - k*IQR, q75 + k*IQR] (implies --robust-scale)",
+    )
+    parser.add_argument(
+        "--pca-variance",
+        type=float,
+        default=None,
+        help="Keep PCA components explaining this variance share (implies --robust-scale)",
+    )
+    parser.add_argument(
+        "--reg-grid",
+        default=None,
+        help="Regularization path: 'a,b,c' or 'log:lo:hi:num' values of --alpha "
+        "(ridge) / --lmbd (OLS); the GCV-best value is fitted and recorded",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["auto", "float32", "float64"],
+        default="auto",
+        help="Training dtype; auto keeps the dataset's stored dtype",
+    )
     args = parser.parse_args()
 
-    df = load_dataset(args.dataset)
+    path = pathlib.Path(args.dataset)
+    if path.suffix not in (".parquet", ".pkl"):
+        raise ValueError(f"Unsupported dataset format: {path.suffix}")
+    columns = dataset_columns(path)
     features = (
         [f.strip() for f in args.features.split(",") if f.strip()]
         if args.features
         else []
     )
-    features = select_features(df, features)
-    if args.label_name not in df.columns:
+    features = select_features(columns, features)
+    if args.label_name not in columns:
         print(f"Label column {args.label_name} not found in dataset.", file=sys.stderr)
         sys.exit(1)
+    df = load_dataset(
+        path, features + [args.label_name], args.train_from, args.train_to
+    )
     df_train = right_align_train(df, args.train_from, args.train_to)
-    X = df_train[features].values
-    y = df_train[args.label_name].values
+    dtype = resolve_dtype(df_train, features + [args.label_name], args.dtype)
+    X = df_train[features].to_numpy(dtype=dtype)
+    y = df_train[args.label_name].to_numpy(dtype=dtype)
     if len(X) == 0 or len(y) == 0:
         print("No training data in selected window.", file=sys.stderr)
         sys.exit(1)
 
+    pipeline = None
+    if args.robust_scale or args.clip_iqr is not None or args.pca_variance is not None:
+        pipeline = FeaturePipeline(args.clip_iqr, args.pca_variance)
+        X = pipeline.fit_transform(X, features)
+
+    # Regularization path: pick the GCV-best value, then fit it as usual
+    reg_path = None
+    if args.reg_grid:
+        _, _, rows = regularization_path(
+            X, y, parse_reg_grid(args.reg_grid), fit_intercept=SKLEARN_AVAILABLE
+        )
+        best = min(rows, key=lambda r: r["gcv"])["lmbd"]
+        if SKLEARN_AVAILABLE:
+            args.alpha = best
+        else:
+            args.lmbd = best
+        reg_path = {
+            "param": "alpha" if SKLEARN_AVAILABLE else "lmbd",
+            "criterion": "gcv",
+            "best": best,
+            "table": rows,
+        }
+
     # Train model
     if SKLEARN_AVAILABLE:
         model, y_pred = train_ridge(X, y, args.alpha)
@@ -168,55 +506,53 @@ def main():
     created_at = datetime.datetime.utcnow().isoformat()
 
     # Save summary JSON
-    summary = {
-        "run_tag": args.model_tag,
-        "label": args.label_name,
-        "features": features,
-        "train": {
-            "from": args.train_from,
-            "to": args.train_to,
-            "n": int(len(df_train)),
-        },
-        "model": model_type,
-        "metrics": metrics,
-        "created_at": created_at,
-    }
+    summary = train_summary(
+        args.model_tag,
+        args.label_name,
+        features,
+        args.train_from,
+        args.train_to,
+        len(df_train),
+        model_type,
+        dtype,
+        pipeline,
+        metrics,
+        created_at,
+    )
+    if reg_path is not None:
+        summary["regularization_path"] = reg_path
     save_json(summary, args.out_json)
 
-    # Save model pickle (optional)
-    pickle_path = None
-    if args.save_model:
-        save_pickle(model, args.save_model)
-        pickle_path = str(args.save_model)
+    # Model pickle (optional) and fitted pipeline
+    pickle_path, pipeline_path = save_artifacts(
+        args.model_tag, model, pipeline, args.save_model
+    )
 
     # Write registry metadata
-    meta_dir = pathlib.Path(f"models/{args.model_tag}")
-    meta_dir.mkdir(parents=True, exist_ok=True)
-    meta_path = meta_dir / "metadata.json"
-    # Try to infer timeframe from dataset name (simple heuristic)
-    tf = None
-    if "5m" in str(args.dataset):
-        tf = "5m"
-    meta = {
-        "model_tag": args.model_tag,
-        "created_at": created_at,
-        "label": args.label_name,
-        "features": features,
-        "timeframe": tf,
-        "train_window": {
-            "from": args.train_from,
-            "to": args.train_to,
-            "rows": int(len(df_train)),
-        },
-        "algo": algo,
-        "artifacts": {"pickle_path": pickle_path},
-        "provenance": {
-            "dataset_path": str(args.dataset),
-            "commit": get_git_sha1(),
-            "generator": "scripts/training/train_baseline.py",
-        },
-    }
-    update_metadata(meta_path, meta)
+    meta = registry_metadata(
+        args.model_tag,
+        created_at,
+        args.label_name,
+        features,
+        args.dataset,
+        args.train_from,
+        args.train_to,
+        len(df_train),
+        algo,
+        dtype,
+        pickle_path,
+        pipeline_path,
+        get_git_sha1(),
+    )
+    if reg_path is not None:
+        meta["regularization_path"] = {
+            "param": reg_path["param"],
+            "criterion": reg_path["criterion"],
+            "best": reg_path["best"],
+            "grid": [r["lmbd"] for r in reg_path["table"]],
+            "summary_path": str(args.out_json),
+        }
+    update_metadata(pathlib.Path(f"models/{args.model_tag}") / "metadata.json", meta)
 
 
 # --- Git SHA1 helper ---
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Batch trainer for MATRIX baseline models (offline, pandas/numpy only).
+
+Trains every (dataset, label, train window) job of a JSON manifest with the
+train_baseline model and writes the same artifacts as one train_baseline.py
+run per job: a train summary JSON and models/<tag>/metadata.json (plus the
+optional model pickle and fitted feature pipeline).
+
+Jobs that share a feature matrix (same dataset, features, train window,
+dtype and feature pipeline) form one group: the matrix is read and scaled
+once and all labels of the group are solved together as one multi-column
+least-squares problem (one X^T X, X^T Y with a column per label; ridge fits
+multi-output). Groups run across a process pool; summaries and registry
+metadata are written by the parent process once every group has finished.
+
+Usage:
+  python scripts/training/train_batch.py \
+    --manifest configs/train.manifest.json \
+    --out-dir docs/summaries/batch --workers 8
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+from src.matrix.feature.engineering import FeaturePipeline  # noqa: E402
+from src.matrix.infra.dataset_io import dataset_columns  # noqa: E402
+from scripts.training.train_baseline import (  # noqa: E402
+    SKLEARN_AVAILABLE,
+    LinearModel,
+    NormalEquations,
+    compute_metrics,
+    get_git_sha1,
+    load_dataset,
+    registry_metadata,
+    resolve_dtype,
+    right_align_train,
+    save_artifacts,
+    save_json,
+    select_features,
+    train_summary,
+    update_metadata,
+)
+
+if SKLEARN_AVAILABLE:
+    from sklearn.linear_model import Ridge
+
+
+def _format(template, job):
+    return template.format(**{k: v for k, v in job.items() if k != "features"})
+
+
+def plan_jobs(manifest: dict, out_dir: pathlib.Path) -> list:
+    """
+    Expand a training manifest into one resolved dict per job.
+
+    Manifest layout (JSON):
+        {"dataset_template": "data/datasets/pair={pair}/timeframe=5m/H3-6-12_pct.parquet",
+         "model_tag_template": "NIGHTLY_{pair}_{label}",
+         "train_from": "2025-01-01", "train_to": "2025-03-31",
+         "jobs": [{"pair": "BTC_USDT", "label": "label_R_H3_pct"}, ...]}
+    Every top-level key is the default of the job key of the same name; a job
+    may set "dataset", "model_tag", "train_from", "train_to", "features"
+    (list or comma-separated; default: all f_* columns), "alpha" (ridge),
+    "lmbd" (OLS), "dtype", "robust_scale", "clip_iqr", "pca_variance",
+    "out_json" (default <out_dir>/<model_tag>.json) and "save_model".
+    Templates are formatted with the job's fields.
+    """
+    defaults = {k: v for k, v in manifest.items() if k != "jobs"}
+    planned = []
+    for raw in manifest["jobs"]:
+        job = dict(defaults, **raw)
+        if "dataset" not in job:
+            if "dataset_template" not in job:
+                raise ValueError(f"Job {raw} has no 'dataset' and no template")
+            job["dataset"] = _format(job["dataset_template"], job)
+        if "model_tag" not in job:
+            if "model_tag_template" not in job:
+                raise ValueError(f"Job {raw} has no 'model_tag' and no template")
+            job["model_tag"] = _format(job["model_tag_template"], job)
+        features = job.get("features") or []
+        if isinstance(features, str):
+            features = [f.strip() for f in features.split(",") if f.strip()]
+        save_model = job.get("save_model")
+        if save_model is True:
+            save_model = f"models/{job['model_tag']}/model.pkl"
+        planned.append(
+            {
+                "model_tag": job["model_tag"],
+                "dataset": str(job["dataset"]),
+                "label": job["label"],
+                "train_from": str(job["train_from"]),
+                "train_to": str(job["train_to"]),
+                "features": list(features),
+                "alpha": float(job.get("alpha", 0.1)),
+                "lmbd": float(job.get("lmbd", 0.0)),
+                "dtype": job.get("dtype", "auto"),
+                "robust_scale": bool(job.get("robust_scale", False)),
+                "clip_iqr": job.get("clip_iqr"),
+                "pca_variance": job.get("pca_variance"),
+                "out_json": str(
+                    job.get("out_json") or out_dir / f"{job['model_tag']}.json"
+                ),
+                "save_model": save_model or None,
+            }
+        )
+    return planned
+
+
+def group_jobs(jobs: list) -> list:
+    """Split jobs into groups that share one feature matrix (first-seen order)."""
+    groups = {}
+    for i, job in enumerate(jobs):
+        key = (
+            job["dataset"],
+            tuple(job["features"]),
+            job["train_from"],
+            job["train_to"],
+            job["dtype"],
+            job["robust_scale"],
+            job["clip_iqr"],
+            job["pca_variance"],
+        )
+        groups.setdefault(key, []).append((i, job))
+    return list(groups.values())
+
+
+def _solve(X, Y, params):
+    # One multi-column fit per distinct regularization value; returns
+    # (one model per column, predictions (n, k))
+    models = [None] * Y.shape[1]
+    pred = np.empty_like(Y)
+    for value in sorted(set(params)):
+        cols = [j for j, p in enumerate(params) if p == value]
+        if SKLEARN_AVAILABLE:
+            fitted = Ridge(alpha=value).fit(X, Y[:, cols])
+            pred[:, cols] = fitted.predict(X)
+            for c, j in enumerate(cols):
+                # Single-target view of the multi-output fit
+                model = copy.deepcopy(fitted)
+                model.coef_ = fitted.coef_[c]
+                model.intercept_ = fitted.intercept_[c]
+                models[j] = model
+        else:
+            acc = NormalEquations(X.shape[1], dtype=X.dtype, n_targets=len(cols))
+            coef = acc.add_rows(X, Y[:, cols]).solve(value)
+            pred[:, cols] = X @ coef
+            for c, j in enumerate(cols):
+                models[j] = LinearModel(coef[:, c])
+    return models, pred
+
+
+def train_group(group: list) -> list:
+    """
+    Fit every job of one group; returns (job index, result) pairs.
+
+    A result holds the fitted model, pipeline, features, dtype, row count and
+    metrics, or an 'error' for the whole group.
+    """
+    first = group[0][1]
+    try:
+        features = select_features(dataset_columns(first["dataset"]), first["features"])
+        labels = list(dict.fromkeys(job["label"] for _, job in group))
+        missing = [c for c in labels if c not in dataset_columns(first["dataset"])]
+        if missing:
+            raise KeyError(f"Label columns not in dataset: {missing}")
+        df = load_dataset(
+            first["dataset"], features + labels, first["train_from"], first["train_to"]
+        )
+        df_train = right_align_train(df, first["train_from"], first["train_to"])
+        if len(df_train) == 0:
+            raise ValueError("No training data in selected window.")
+        dtype = resolve_dtype(df_train, features + labels, first["dtype"])
+        X = df_train[features].to_numpy(dtype=dtype)
+        pipeline = None
+        if (
+            first["robust_scale"]
+            or first["clip_iqr"] is not None
+            or first["pca_variance"] is not None
+        ):
+            pipeline = FeaturePipeline(first["clip_iqr"], first["pca_variance"])
+            X = pipeline.fit_transform(X, features)
+        Y = df_train[[job["label"] for _, job in group]].to_numpy(dtype=dtype)
+        param = "alpha" if SKLEARN_AVAILABLE else "lmbd"
+        models, pred = _solve(X, Y, [job[param] for _, job in group])
+    except Exception as exc:
+        return [(i, {"error": f"{type(exc).__name__}: {exc}"}) for i, _ in group]
+    return [
+        (
+            i,
+            {
+                "model": models[j],
+                "pipeline": pipeline,
+                "features": features,
+                "dtype": dtype.name,
+                "rows": int(len(df_train)),
+                "metrics": compute_metrics(Y[:, j], pred[:, j]),
+            },
+        )
+        for j, (i, _) in enumerate(group)
+    ]
+
+
+def write_outputs(job: dict, result: dict, created_at: str, commit) -> None:
+    """Write the train summary JSON, artifacts and registry metadata of one job."""
+    if SKLEARN_AVAILABLE:
+        model_type = {"type": "ridge", "alpha": job["alpha"]}
+        algo = {"name": "ridge", "params": {"alpha": job["alpha"]}}
+    else:
+        model_type = {"type": "ols", "lmbd": job["lmbd"]}
+        algo = {"name": "ols", "params": {"lmbd": job["lmbd"]}}
+    pathlib.Path(job["out_json"]).parent.mkdir(parents=True, exist_ok=True)
+    save_json(
+        train_summary(
+            job["model_tag"],
+            job["label"],
+            result["features"],
+            job["train_from"],
+            job["train_to"],
+            result["rows"],
+            model_type,
+            result["dtype"],
+            result["pipeline"],
+            result["metrics"],
+            created_at,
+        ),
+        job["out_json"],
+    )
+    pickle_path, pipeline_path = save_artifacts(
+        job["model_tag"], result["model"], result["pipeline"], job["save_model"]
+    )
+    meta = registry_metadata(
+        job["model_tag"],
+        created_at,
+        job["label"],
+        result["features"],
+        job["dataset"],
+        job["train_from"],
+        job["train_to"],
+        result["rows"],
+        algo,
+        result["dtype"],
+        pickle_path,
+        pipeline_path,
+        commit,
+        generator="scripts/training/train_batch.py",
+    )
+    update_metadata(pathlib.Path(f"models/{job['model_tag']}") / "metadata.json", meta)
+
+
+def train_batch(manifest: dict, out_dir: pathlib.Path, workers: int) -> dict:
+    """
+    Train every manifest job and write all outputs plus <out_dir>/_batch.json.
+
+    Failed groups are recorded with an 'error' per job instead of aborting.
+    """
+    jobs = plan_jobs(manifest, out_dir)
+    groups = group_jobs(jobs)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.datetime.utcnow().isoformat() + "Z"
+    if workers <= 1 or len(groups) <= 1:
+        parts = [train_group(group) for group in groups]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(train_group, groups))
+    results = dict(pair for part in parts for pair in part)
+
+    created_at = datetime.datetime.utcnow().isoformat()
+    commit = get_git_sha1()
+    entries = []
+    for i, job in enumerate(jobs):
+        result = results[i]
+        entry = {k: job[k] for k in ("model_tag", "dataset", "label", "out_json")}
+        if "error" in result:
+            entry["error"] = result["error"]
+        else:
+            write_outputs(job, result, created_at, commit)
+            entry.update(rows=result["rows"], metrics=result["metrics"])
+        entries.append(entry)
+    batch = {
+        "started_at": started_at,
+        "finished_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "n_jobs": len(jobs),
+        "n_groups": len(groups),
+        "n_failed": sum(1 for e in entries if "error" in e),
+        "jobs": entries,
+    }
+    save_json(batch, out_dir / "_batch.json")
+    return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch trainer for baseline models")
+    parser.add_argument("--manifest", required=True, help="JSON manifest of jobs")
+    parser.add_argument("--out-dir", default="docs/summaries/batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    manifest = json.loads(pathlib.Path(args.manifest).read_text(encoding="utf-8"))
+    batch = train_batch(manifest, pathlib.Path(args.out_dir), args.workers)
+    print(
+        f"Trained {batch['n_jobs'] - batch['n_failed']}/{batch['n_jobs']} models"
+        f" in {batch['n_groups']} groups; summary {args.out_dir}/_batch.json"
+    )
+    sys.exit(1 if batch["n_failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,31 +3,278 @@ Feature engineering module.
 
 Generates time-aligned features and labels without temporal leakage.
 Contract: make_features(df) -> (features_df, labels_series) with aligned indices.
+
+FeaturePipeline implements the guardrails below as a fit/transform object:
+IQR outlier clipping, robust scaling (median/IQR) and optional variance-based
+PCA are fitted on the training window only, stored as JSON next to the model
+(save/load) and applied at inference as one fused transform
+
+    Z = clip(X, lo, hi) @ W + b
+
+where W and b fold scaling, centering and the PCA projection together
+(without PCA, W is diagonal and applied elementwise). float32 inputs are
+transformed in float32; the fitted state is kept in float64.
 """
 
-from typing import Tuple, Any
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
 import pandas as pd  # type: ignore
 
+from ..freqai.hooks import (
+    FEATURE_WINDOWS,
+    VOL_WINDOW,
+    generate_features,
+    generate_labels,
+)
+
+PIPELINE_VERSION = 1
+
+
+class FeaturePipeline:
+    """
+    Robust scaling + IQR clipping + optional PCA, fitted once and reused.
+
+    Args:
+        clip_iqr: clip each raw feature to [q25 - k*IQR, q75 + k*IQR] with
+            k = clip_iqr (None disables clipping)
+        pca_variance: keep the leading principal components explaining at
+            least this share of the scaled training variance (None: no PCA)
+        pca_components: keep exactly this many components (overrides
+            pca_variance)
+
+    Fitted state (set by fit): columns_, lo_, hi_, median_, iqr_, mean_,
+    components_, explained_variance_ratio_ and the fused weights_/offset_
+    (scale_/offset_ without PCA).
+    """
+
+    def __init__(
+        self,
+        clip_iqr: Optional[float] = 3.0,
+        pca_variance: Optional[float] = None,
+        pca_components: Optional[int] = None,
+    ) -> None:
+        if pca_variance is not None and not 0.0 < pca_variance <= 1.0:
+            raise ValueError(f"pca_variance must be in (0, 1], got {pca_variance}")
+        self.clip_iqr = clip_iqr
+        self.pca_variance = pca_variance
+        self.pca_components = pca_components
+        self.columns_: Optional[list] = None
+        self.lo_: Optional[np.ndarray] = None
+        self.hi_: Optional[np.ndarray] = None
+        self.median_: Optional[np.ndarray] = None
+        self.iqr_: Optional[np.ndarray] = None
+        self.mean_: Optional[np.ndarray] = None
+        self.components_: Optional[np.ndarray] = None
+        self.explained_variance_ratio_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+        self.weights_: Optional[np.ndarray] = None
+        self.offset_: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.offset_ is not None
+
+    @property
+    def use_pca(self) -> bool:
+        return self.pca_variance is not None or self.pca_components is not None
+
+    @property
+    def output_columns(self) -> list:
+        """Output names: input names, or f_pc_<i> with PCA."""
+        if not self.fitted:
+            raise ValueError("FeaturePipeline is not fitted")
+        if self.components_ is None:
+            return list(self.columns_)
+        return [f"f_pc_{i}" for i in range(self.components_.shape[1])]
+
+    def fit(
+        self, X: Union[np.ndarray, pd.DataFrame], columns: Optional[Sequence] = None
+    ) -> "FeaturePipeline":
+        """
+        Fit clipping bounds, median/IQR and PCA on training rows only.
+
+        Args:
+            X: (n, d) training features (DataFrame or array); NaNs are ignored
+                by the quantiles and must not reach PCA
+            columns: feature names for arrays (DataFrame columns otherwise)
+        """
+        if isinstance(X, pd.DataFrame):
+            columns = list(X.columns)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[0] == 0:
+            raise ValueError(f"Expected non-empty 2D features, got shape {X.shape}")
+        d = X.shape[1]
+        self.columns_ = (
+            [str(c) for c in columns] if columns else [f"x{j}" for j in range(d)]
+        )
+        q25, median, q75 = np.nanpercentile(X, [25, 50, 75], axis=0)
+        iqr = q75 - q25
+        if self.clip_iqr is not None:
+            self.lo_ = q25 - self.clip_iqr * iqr
+            self.hi_ = q75 + self.clip_iqr * iqr
+        iqr = np.where((iqr > 0) & np.isfinite(iqr), iqr, 1.0)
+        self.median_, self.iqr_ = median, iqr
+        self.scale_ = 1.0 / iqr
+        if not self.use_pca:
+            self.offset_ = -median * self.scale_
+            return self
+
+        scaled = (self._clip(X) - median) * self.scale_
+        if np.isnan(scaled).any():
+            raise ValueError("PCA needs NaN-free training features")
+        self.mean_ = scaled.mean(axis=0)
+        _, s, vt = np.linalg.svd(scaled - self.mean_, full_matrices=False)
+        var = s**2
+        ratio = var / var.sum() if var.sum() > 0 else np.full_like(var, 1.0 / d)
+        if self.pca_components is not None:
+            k = int(min(max(self.pca_components, 1), vt.shape[0]))
+        else:
+            cum = np.cumsum(ratio)
+            k = int(min(np.searchsorted(cum, self.pca_variance - 1e-12) + 1, d))
+        # Deterministic signs: largest loading of each component is positive.
+        vt = vt[:k]
+        vt *= np.sign(vt[np.arange(k), np.abs(vt).argmax(axis=1)])[:, None]
+        self.components_ = np.ascontiguousarray(vt.T)
+        self.explained_variance_ratio_ = ratio[:k]
+        self.weights_ = self.components_ * self.scale_[:, None]
+        self.offset_ = -(median * self.scale_ + self.mean_) @ self.components_
+        return self
+
+    def _clip(self, X: np.ndarray) -> np.ndarray:
+        if self.lo_ is None:
+            return np.array(X)
+        lo, hi = self.lo_.astype(X.dtype), self.hi_.astype(X.dtype)
+        return np.clip(X, lo, hi)
+
+    def transform(self, X: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """Apply the fitted pipeline: one clip pass plus one affine map."""
+        if not self.fitted:
+            raise ValueError("FeaturePipeline is not fitted")
+        if isinstance(X, pd.DataFrame):
+            X = X[self.columns_]
+        X = np.asarray(X)
+        dtype = np.float32 if X.dtype == np.float32 else np.float64
+        out = self._clip(X.astype(dtype, copy=False))
+        if self.weights_ is None:
+            out *= self.scale_.astype(dtype)
+        else:
+            out = out @ self.weights_.astype(dtype)
+        out += self.offset_.astype(dtype)
+        return out
+
+    def fit_transform(
+        self, X: Union[np.ndarray, pd.DataFrame], columns: Optional[Sequence] = None
+    ) -> np.ndarray:
+        return self.fit(X, columns).transform(X)
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """transform() for a feature DataFrame; keeps the index."""
+        return pd.DataFrame(
+            self.transform(df), index=df.index, columns=self.output_columns
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable fitted state."""
+        if not self.fitted:
+            raise ValueError("FeaturePipeline is not fitted")
+
+        def arr(a):
+            return None if a is None else np.asarray(a).tolist()
+
+        return {
+            "version": PIPELINE_VERSION,
+            "params": {
+                "clip_iqr": self.clip_iqr,
+                "pca_variance": self.pca_variance,
+                "pca_components": self.pca_components,
+            },
+            "columns": self.columns_,
+            "lo": arr(self.lo_),
+            "hi": arr(self.hi_),
+            "median": arr(self.median_),
+            "iqr": arr(self.iqr_),
+            "mean": arr(self.mean_),
+            "components": arr(self.components_),
+            "explained_variance_ratio": arr(self.explained_variance_ratio_),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "FeaturePipeline":
+        """Rebuild a fitted pipeline from to_dict(); raises ValueError on unknown versions."""
+        if state.get("version") != PIPELINE_VERSION:
+            raise ValueError(
+                f"Unsupported FeaturePipeline state version: {state.get('version')!r}"
+            )
+
+        def arr(key):
+            value = state.get(key)
+            return None if value is None else np.asarray(value, dtype=np.float64)
+
+        obj = cls(**state["params"])
+        obj.columns_ = list(state["columns"])
+        obj.lo_, obj.hi_ = arr("lo"), arr("hi")
+        obj.median_, obj.iqr_ = arr("median"), arr("iqr")
+        obj.scale_ = 1.0 / obj.iqr_
+        obj.mean_ = arr("mean")
+        obj.components_ = arr("components")
+        obj.explained_variance_ratio_ = arr("explained_variance_ratio")
+        if obj.components_ is None:
+            obj.offset_ = -obj.median_ * obj.scale_
+        else:
+            obj.weights_ = obj.components_ * obj.scale_[:, None]
+            obj.offset_ = -(obj.median_ * obj.scale_ + obj.mean_) @ obj.components_
+        return obj
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FeaturePipeline":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
 
-def make_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+def make_features(
+    df: pd.DataFrame,
+    H: int = 12,
+    transform: str = "pct",
+    windows: Sequence[int] = FEATURE_WINDOWS,
+    vol_window: Optional[int] = VOL_WINDOW,
+    pipeline: Optional[FeaturePipeline] = None,
+) -> Tuple[pd.DataFrame, pd.Series]:
     """
     Generate features and labels from OHLCV data.
 
     Args:
         df: OHLCV DataFrame with datetime index
+        H: label horizon in bars
+        transform: 'pct' or 'log' returns (features and label)
+        windows: return windows in bars
+        vol_window: f_vol_z rolling window in bars
+        pipeline: fitted FeaturePipeline applied to the features (fit it on
+            the training window first; it is never fitted here)
 
     Returns:
         Tuple (features_df, labels_series) with aligned time indices.
-        Features = technical indicators, rolling stats, etc.
-        Labels = prediction target (with look-ahead, but aligned correctly).
+        Features = hooks.generate_features columns (or the pipeline outputs),
+        warm-up rows with NaN features dropped.
+        Labels = prediction target (with look-ahead, but aligned correctly);
+        the last H rows are NaN (no future close yet).
 
     Guardrails:
         - No temporal leakage (no future info in current features)
         - Robust scaling (median/IQR)
         - Optional PCA (variance-based)
-        - Outlier handling (IQR/IF)
+        - Outlier handling (IQR clipping)
     """
-    # TODO: Implement robust scaling (median/IQR)
-    # TODO: Optional PCA (variance-based)
-    # TODO: Outlier detection and handling (IQR/Isolation Forest)
-    pass
+    features = generate_features(df, windows, transform, vol_window)
+    features = features[features.notna().all(axis=1)]
+    labels = generate_labels(df, H=H, transform=transform).loc[features.index]
+    if pipeline is not None:
+        features = pipeline.transform_frame(features)
+    return features, labels
@@ -0,0 +1,214 @@
+"""
+Rolling robust statistics.
+
+Right-aligned rolling median/IQR z-score of a series, in two equivalent forms:
+- rolling_robust_zscore(values, window): batch, vectorized (pandas rolling,
+  O(n log w));
+- RollingRobustZScore(window).update(value): streaming, O(log w) per value,
+  backed by an indexable skiplist. Feeding a series through update() yields
+  exactly the batch values.
+
+Definition (window w, min_periods=1, NaN values are skipped):
+    z_t = (x_t - median(W_t)) / (q75(W_t) - q25(W_t)),  W_t = x[t-w+1 .. t]
+    z_t = 0 when the IQR is 0; NaN when x_t is NaN or W_t has no values.
+Quantiles use linear interpolation between order statistics, as pandas'
+Rolling.quantile and numpy.percentile.
+"""
+
+import math
+import random
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+
+
+class IndexableSkiplist:
+    """
+    Sorted multiset with O(log n) insert, remove and k-th smallest lookup.
+
+    Each node keeps, per level, the number of bottom-level elements its link
+    skips, so rank queries walk O(log n) links.
+    """
+
+    _MAX_LEVELS = 32
+
+    def __init__(self, expected_size: int = 1024, seed: Optional[int] = None) -> None:
+        self._levels = max(1, int(math.log2(max(expected_size, 2))) + 1)
+        self._levels = min(self._levels, self._MAX_LEVELS)
+        self._rng = random.Random(seed)
+        self._size = 0
+        # Node: [value, next_links, widths]
+        self._head = [None, [None] * self._levels, [1] * self._levels]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self._levels and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def __getitem__(self, k: int) -> float:
+        if not 0 <= k < self._size:
+            raise IndexError("skiplist index out of range")
+        node = self._head
+        k += 1
+        for level in reversed(range(self._levels)):
+            while node[1][level] is not None and node[2][level] <= k:
+                k -= node[2][level]
+                node = node[1][level]
+        return node[0]
+
+    def insert(self, value: float) -> None:
+        chain = [None] * self._levels
+        steps = [0] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node[1][level] is not None and node[1][level][0] <= value:
+                steps[level] += node[2][level]
+                node = node[1][level]
+            chain[level] = node
+        height = self._random_level()
+        new = [value, [None] * height, [0] * height]
+        skipped = 0
+        for level in range(height):
+            prev = chain[level]
+            new[1][level] = prev[1][level]
+            prev[1][level] = new
+            new[2][level] = prev[2][level] - skipped
+            prev[2][level] = skipped + 1
+            skipped += steps[level]
+        for level in range(height, self._levels):
+            chain[level][2][level] += 1
+        self._size += 1
+
+    def remove(self, value: float) -> None:
+        chain = [None] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node[1][level] is not None and node[1][level][0] < value:
+                node = node[1][level]
+            chain[level] = node
+        target = chain[0][1][0]
+        if target is None or target[0] != value:
+            raise KeyError(value)
+        for level in range(len(target[1])):
+            prev = chain[level]
+            prev[2][level] += target[2][level] - 1
+            prev[1][level] = target[1][level]
+        for level in range(len(target[1]), self._levels):
+            chain[level][2][level] -= 1
+        self._size -= 1
+
+
+def _quantile(sl: IndexableSkiplist, q: float) -> float:
+    # Same arithmetic as pandas' rolling quantile (linear interpolation).
+    nobs = len(sl)
+    if nobs == 1:
+        return sl[0]
+    pos = q * (nobs - 1)
+    idx = int(pos)
+    vlow = sl[idx]
+    if pos == idx:
+        return vlow
+    vhigh = sl[idx + 1]
+    return vlow + (vhigh - vlow) * (pos - idx)
+
+
+def _median(sl: IndexableSkiplist) -> float:
+    # Same arithmetic as pandas' rolling median.
+    nobs = len(sl)
+    mid = nobs // 2
+    if nobs % 2:
+        return sl[mid]
+    return (sl[mid] + sl[mid - 1]) / 2
+
+
+class RollingRobustZScore:
+    """
+    Streaming right-aligned rolling robust z-score (see module docstring).
+
+    Args:
+        window: number of most recent values (including the current one)
+    """
+
+    def __init__(self, window: int, seed: Optional[int] = 0) -> None:
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        self.window = window
+        self._values: deque = deque()
+        self._sorted = IndexableSkiplist(window, seed)
+
+    def update(self, value: float) -> float:
+        """Add one value, evict the oldest beyond the window, return its z-score."""
+        value = float(value)
+        self._values.append(value)
+        if not math.isnan(value):
+            self._sorted.insert(value)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if not math.isnan(old):
+                self._sorted.remove(old)
+        if math.isnan(value) or not len(self._sorted):
+            return math.nan
+        iqr = _quantile(self._sorted, 0.75) - _quantile(self._sorted, 0.25)
+        if iqr == 0:
+            return 0.0
+        return (value - _median(self._sorted)) / iqr
+
+    def update_many(self, values) -> np.ndarray:
+        """Consume a batch of values; returns their z-scores."""
+        return np.array([self.update(v) for v in values], dtype=np.float64)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state (window contents) for resuming later."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "window": self.window,
+            "values": [None if math.isnan(v) else v for v in self._values],
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> "RollingRobustZScore":
+        """Rebuild from snapshot(); raises ValueError on unknown versions."""
+        version = snapshot.get("version")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported RollingRobustZScore snapshot: {version!r}")
+        obj = cls(snapshot["window"])
+        for v in snapshot["values"]:
+            value = math.nan if v is None else float(v)
+            obj._values.append(value)
+            if not math.isnan(value):
+                obj._sorted.insert(value)
+        return obj
+
+    @classmethod
+    def from_history(cls, values, window: int) -> "RollingRobustZScore":
+        """Prime the window with the last `window` historical values."""
+        obj = cls(window)
+        tail: List[float] = list(np.asarray(values, dtype=np.float64)[-window:])
+        for value in tail:
+            obj._values.append(value)
+            if not math.isnan(value):
+                obj._sorted.insert(value)
+        return obj
+
+
+def rolling_robust_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """Batch right-aligned rolling robust z-score (see module docstring)."""
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    values = np.asarray(values, dtype=np.float64)
+    roll = pd.Series(values).rolling(window, min_periods=1)
+    med = roll.median().to_numpy()
+    iqr = roll.quantile(0.75).to_numpy() - roll.quantile(0.25).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (values - med) / iqr
+    z[iqr == 0] = 0.0
+    z[np.isnan(values)] = np.nan
+    return z
@@ -0,0 +1,206 @@
+"""
+Feature store: content-addressed cache of computed feature matrices.
+
+Feature matrices (matrix.freqai.hooks.feature_matrix) are stored on disk keyed
+by the OHLCV content hash, feature names, windows, transform, vol_window and
+the feature code version, so repeated builds over the same candles load the
+matrix (memory-mapped) instead of recomputing it.
+
+Contract:
+    store = FeatureStore(root, max_bytes=DEFAULT_MAX_BYTES)
+    store.features(df_ohlcv, windows, transform, vol_window) -> DataFrame
+        same values/index/columns as hooks.generate_features
+    feature_key(df_ohlcv, windows, transform, vol_window) -> str
+    store.get(key) -> DataFrame or None; store.put(key, frame)
+
+Layout: <root>/<key>/{values.npy, index.npy, meta.json}. values.npy is the
+Fortran-ordered float64 matrix (np.load(mmap_mode="r") wraps it without a
+copy); meta.json's mtime is the last access time used for LRU eviction once
+the store exceeds max_bytes. Entries are written to a temporary directory and
+renamed into place, so concurrent builders never see partial entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..freqai import hooks
+from . import rolling
+
+STORE_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024**3
+_OHLCV = ("open", "high", "low", "close", "volume")
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Hash of the feature kernel sources; edits to them invalidate the store."""
+    h = hashlib.sha1()
+    for module in (hooks, rolling):
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def ohlcv_digest(df_ohlcv: pd.DataFrame) -> str:
+    """SHA-1 of the OHLCV values (as float64) and the index."""
+    h = hashlib.sha1()
+    index = df_ohlcv.index
+    index = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    h.update(np.ascontiguousarray(index).view(np.uint8))
+    for col in _OHLCV:
+        values = df_ohlcv[col].to_numpy(dtype=np.float64)
+        h.update(np.ascontiguousarray(values).view(np.uint8))
+    return h.hexdigest()
+
+
+def feature_key(
+    df_ohlcv: pd.DataFrame,
+    windows: Sequence[int] = hooks.FEATURE_WINDOWS,
+    transform: str = "pct",
+    vol_window: Optional[int] = hooks.VOL_WINDOW,
+) -> str:
+    """Store key of the feature matrix of df_ohlcv for these parameters."""
+    spec = {
+        "store": STORE_VERSION,
+        "ohlcv": ohlcv_digest(df_ohlcv),
+        "features": hooks.feature_names(windows),
+        "windows": [int(w) for w in windows],
+        "transform": transform,
+        "vol_window": vol_window,
+        "code": code_version(),
+    }
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def _touch(path: Path) -> None:
+    # Explicit ns stamp: file-system clocks tick too coarsely to order accesses.
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def _entry_bytes(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir())
+
+
+class FeatureStore:
+    """
+    On-disk LRU cache of feature matrices (see module docstring).
+
+    Args:
+        root: store directory (created on first write)
+        max_bytes: total size above which least recently used entries are
+            evicted after each put
+    """
+
+    def __init__(
+        self, root: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Load an entry (values memory-mapped, read-only) or return None."""
+        entry = self.root / key
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+            if meta.get("version") != STORE_VERSION:
+                return None
+            values = np.load(entry / "values.npy", mmap_mode="r")
+            index = np.load(entry / "index.npy")
+        except (OSError, ValueError):
+            return None
+        _touch(entry / "meta.json")
+        if meta["index"] == "datetime":
+            index = pd.DatetimeIndex(index, name=meta["index_name"])
+            if meta["tz"] is not None:
+                index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        else:
+            index = pd.Index(index, name=meta["index_name"])
+        return pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
+
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        """Store a float64 feature frame under key and evict down to max_bytes."""
+        index = frame.index
+        if isinstance(index, pd.DatetimeIndex):
+            tz = None if index.tz is None else str(index.tz)
+            index_values = index.tz_convert("UTC").tz_localize(None) if tz else index
+            index_values = index_values.to_numpy(dtype="datetime64[ns]")
+            kind = "datetime"
+        else:
+            tz, kind = None, "values"
+            index_values = index.to_numpy()
+            if index_values.dtype == object:
+                raise ValueError("FeatureStore needs a datetime or numeric index")
+        meta = {
+            "version": STORE_VERSION,
+            "columns": [str(c) for c in frame.columns],
+            "index": kind,
+            "index_name": index.name,
+            "tz": tz,
+            "shape": list(frame.shape),
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".tmp-{key}-", dir=self.root))
+        try:
+            values = np.asfortranarray(frame.to_numpy(dtype=np.float64))
+            np.save(tmp / "values.npy", values)
+            np.save(tmp / "index.npy", index_values)
+            (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            _touch(tmp / "meta.json")
+            os.rename(tmp, self.root / key)
+        except OSError:
+            # Another process stored the same key first (or the write failed).
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self) -> list:
+        """(last access time, bytes, path) of every entry, oldest first."""
+        out = []
+        if not self.root.exists():
+            return out
+        for entry in self.root.iterdir():
+            meta = entry / "meta.json"
+            if entry.name.startswith(".") or not meta.exists():
+                continue
+            out.append((meta.stat().st_mtime_ns, _entry_bytes(entry), entry))
+        return sorted(out)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used entries until the store fits; returns count."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def features(
+        self,
+        df_ohlcv: pd.DataFrame,
+        windows: Sequence[int] = hooks.FEATURE_WINDOWS,
+        transform: str = "pct",
+        vol_window: Optional[int] = hooks.VOL_WINDOW,
+    ) -> pd.DataFrame:
+        """hooks.generate_features, loaded from the store when already computed."""
+        key = feature_key(df_ohlcv, windows, transform, vol_window)
+        cached = self.get(key)
+        if cached is not None and cached.index.equals(df_ohlcv.index):
+            return cached
+        frame = hooks.generate_features(df_ohlcv, windows, transform, vol_window)
+        self.put(key, frame)
+        return frame
@@ -15,16 +15,110 @@ See docs/CONTRACTS.md for detailed I/O specifications.
 See docs/LABELS.md for label generation semantics.
 """
 
-import pandas as pd
+from typing import Optional, Sequence, Union
 
+import numpy as np
+import pandas as pd
 
-def generate_features(df_ohlcv: pd.DataFrame) -> pd.DataFrame:
+from ..feature.rolling import rolling_robust_zscore
+
+FEATURE_WINDOWS = (1, 3, 12)
+# Default f_vol_z window: one day of 5m candles.
+VOL_WINDOW = 288
+
+
+def robust_zscore(vol: np.ndarray) -> np.ndarray:
+    """Whole-series (vol - median) / IQR (zeros if IQR == 0); legacy f_vol_z."""
+    med = np.median(vol)
+    q75, q25 = np.percentile(vol, [75, 25])
+    iqr = q75 - q25
+    if iqr == 0:
+        return np.zeros_like(vol)
+    return (vol - med) / iqr
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    idx = np.where(mask, 0, np.arange(values.shape[0]))
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[idx]
+    filled[mask & (np.cumsum(~mask) == 0)] = np.nan
+    return filled
+
+
+def feature_matrix(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    windows: Sequence[int] = FEATURE_WINDOWS,
+    transform: str = "pct",
+    vol_window: Optional[int] = VOL_WINDOW,
+) -> np.ndarray:
+    """
+    Compute all features into one preallocated (n, len(windows) + 3) float64 array.
+
+    Column order: f_ret_<w> for each window, f_hl_range, f_oc_range, f_vol_z
+    (see feature_names). The array is Fortran-ordered so every column is
+    contiguous and wraps into a single-block DataFrame without a copy.
+    f_vol_z is the right-aligned rolling robust z-score over vol_window bars
+    (matrix.feature.rolling); vol_window=None uses whole-series median/IQR.
+    Values match the pandas formulation bit for bit (pct returns forward-fill
+    missing closes like Series.pct_change).
+    """
+    if transform not in ("pct", "log"):
+        raise ValueError(f"Unknown transform {transform!r}; expected 'pct' or 'log'")
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    out = np.empty((n, len(windows) + 3), dtype=np.float64, order="F")
+    base = _ffill(close) if transform == "pct" else close
+    for j, w in enumerate(windows):
+        col = out[:, j]
+        w = min(w, n)
+        col[:w] = np.nan
+        np.divide(base[w:], base[: n - w], out=col[w:])
+        if transform == "pct":
+            col[w:] -= 1.0
+        else:
+            np.log(col[w:], out=col[w:])
+    k = len(windows)
+    np.subtract(high, low, out=out[:, k])
+    out[:, k] /= close
+    open_ = np.asarray(open_, dtype=np.float64)
+    np.subtract(close, open_, out=out[:, k + 1])
+    out[:, k + 1] /= open_
+    volume = np.asarray(volume, dtype=np.float64)
+    if vol_window is None:
+        out[:, k + 2] = robust_zscore(volume)
+    else:
+        out[:, k + 2] = rolling_robust_zscore(volume, vol_window)
+    return out
+
+
+def feature_names(windows: Sequence[int] = FEATURE_WINDOWS) -> list[str]:
+    """Column names produced by feature_matrix for the given windows."""
+    return [f"f_ret_{w}" for w in windows] + ["f_hl_range", "f_oc_range", "f_vol_z"]
+
+
+def generate_features(
+    df_ohlcv: pd.DataFrame,
+    windows: Sequence[int] = FEATURE_WINDOWS,
+    transform: str = "pct",
+    vol_window: Optional[int] = VOL_WINDOW,
+) -> pd.DataFrame:
     """
     Generate minimal model-ready features from OHLCV data for FreqAI training/inference.
 
     Args:
         df_ohlcv: DataFrame with OHLCV data, datetime index required.
             Columns: ['open', 'high', 'low', 'close', 'volume']
+        windows: return windows in bars (default 1, 3, 12)
+        transform: 'pct' or 'log' returns
+        vol_window: f_vol_z rolling window in bars (default VOL_WINDOW);
+            None uses whole-series median/IQR
 
     Returns:
         DataFrame with generated features, same index as input.
@@ -32,45 +126,113 @@ def generate_features(df_ohlcv: pd.DataFrame) -> pd.DataFrame:
             - f_ret_1, f_ret_3, f_ret_12: percent/log returns over 1, 3, 12 bars (right-aligned)
             - f_hl_range: high-low range
             - f_oc_range: open-close range
-            - f_vol_z: volume z-score (robust scaling: median/IQR)
+            - f_vol_z: volume z-score (robust scaling: rolling median/IQR)
 
     Contract:
         - MUST preserve df_ohlcv.index exactly
         - MUST NOT use future information (no forward-looking calculations)
         - All rolling/statistics are right-aligned (window ends at t)
-        - Drop warmup rows (first max(window) rows)
-        - NaN-safe: drop rows with NaN after feature generation
+        - Warmup rows (first max(window) rows) are NaN; callers drop them
+          together with any other NaN rows (build_dataset, freqai_bridge)
         - Columns prefixed 'f_'
-    TODO: Implement with pandas; for now, stub only.
+        - Computed by one NumPy kernel (feature_matrix) shared by training
+          and inference
     """
-    pass
-
+    values = feature_matrix(
+        df_ohlcv["open"].to_numpy(dtype=np.float64),
+        df_ohlcv["high"].to_numpy(dtype=np.float64),
+        df_ohlcv["low"].to_numpy(dtype=np.float64),
+        df_ohlcv["close"].to_numpy(dtype=np.float64),
+        df_ohlcv["volume"].to_numpy(dtype=np.float64),
+        windows,
+        transform,
+        vol_window,
+    )
+    return pd.DataFrame(
+        values, index=df_ohlcv.index, columns=feature_names(windows), copy=False
+    )
+
+
+def label_names(horizons: Sequence[int], transform: str = "pct") -> list[str]:
+    """Label column names for the given horizons: label_R_H<H>_<transform>."""
+    return [f"label_R_H{int(h)}_{transform}" for h in horizons]
+
+
+def label_matrix(
+    close: np.ndarray, horizons: Sequence[int], transform: str = "pct"
+) -> np.ndarray:
+    """
+    Forward returns for every horizon from one close array.
 
-def generate_labels(df_ohlcv: pd.DataFrame, mode: str = "R", **kwargs) -> pd.Series:
+    Returns a Fortran-ordered (n, len(horizons)) float64 array; column j is
+    close[t + H_j] / close[t] (minus 1 for pct, log for log), written from
+    shifted views of close into its column without temporaries. Rows without
+    a t + H_j close are NaN.
+    """
+    if transform not in ("pct", "log"):
+        raise ValueError(f"Unknown transform {transform!r}; expected 'pct' or 'log'")
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    out = np.full((n, len(horizons)), np.nan, order="F")
+    for j, h in enumerate(horizons):
+        h = int(h)
+        if h < 0:
+            raise ValueError(f"Horizon must be >= 0, got {h}")
+        col = out[:, j]
+        if h == 0:
+            col[:] = 1.0
+        elif h < n:
+            np.divide(close[h:], close[: n - h], out=col[: n - h])
+        if transform == "pct":
+            col -= 1.0
+        else:
+            np.log(col, out=col)
+    return out
+
+
+def generate_labels(
+    df_ohlcv: pd.DataFrame,
+    mode: str = "R",
+    H: Union[int, Sequence[int]] = 12,
+    transform: str = "pct",
+    **kwargs,
+) -> Union[pd.Series, pd.DataFrame]:
     """
     Generate labels for supervised learning: forward return over H bars.
 
     Args:
         df_ohlcv: DataFrame with OHLCV data, datetime index required.
         mode: 'R' for return
-        H: Lookahead horizon (bars)
+        H: Lookahead horizon (bars), or a list of horizons computed in one
+            pass over the close array
         transform: 'log' or 'pct' for log-return or percent-return
 
     Returns:
-        Series with labels, same index as input (last H rows become NaN)
+        Series named label_R_H<H>_<transform> for a single H, or a DataFrame
+        with one such column per horizon; same index as input (last H rows
+        of each label become NaN)
 
     Formula:
         - If transform='pct': label_t = (close_{t+H} / close_t) - 1
         - If transform='log': label_t = log(close_{t+H} / close_t)
     Alignment:
         - Label for t uses close at t and t+H (lookahead)
-        - Last H rows become NaN and are dropped downstream
+        - Last H rows become NaN and are dropped downstream (max(H) rows
+          for multi-horizon datasets)
     Contract:
         - Strict lookahead: no leakage
         - Index aligned to t
-    TODO: Implement with pandas; for now, stub only.
     """
-    pass
+    if mode != "R":
+        raise ValueError(f"Unsupported label mode {mode!r}; only 'R' is implemented")
+    horizons = [H] if np.isscalar(H) else list(H)
+    values = label_matrix(
+        df_ohlcv["close"].to_numpy(dtype=np.float64), horizons, transform
+    )
+    names = label_names(horizons, transform)
+    if np.isscalar(H):
+        return pd.Series(values[:, 0], index=df_ohlcv.index, name=names[0])
+    return pd.DataFrame(values, index=df_ohlcv.index, columns=names, copy=False)
 
 
 def feature_columns() -> list[str]:
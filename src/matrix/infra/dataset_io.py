@@ -0,0 +1,250 @@
+"""
+Dataset I/O module.
+
+Parquet datasets with time-sorted row groups and per-row-group statistics, so
+readers can project columns and skip row groups outside a time range instead
+of loading whole files.
+
+Contract:
+- write_dataset(df, path) -> (path written, "parquet" | "pickle")
+- read_dataset(path, columns=None, start=None, end=None) -> DataFrame
+  with only the requested columns and the rows start <= index <= end
+- dataset_columns(path) -> list[str] (non-index columns, no data read)
+- dataset_time_range(path) -> (first, last) index timestamps from statistics
+
+Engines: pyarrow when installed (files are memory-mapped), fastparquet
+otherwise; both read only the column chunks of the selected row groups.
+Pickle (.pkl) datasets from environments without a Parquet engine are read
+whole and filtered in memory.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# One week of 5m candles: a WFO block reads a handful of row groups.
+ROW_GROUP_ROWS = 2016
+
+TimeBound = Optional[Union[str, pd.Timestamp]]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None, None
+    return pa, pq
+
+
+def _fastparquet():
+    try:
+        import fastparquet
+    except ImportError:
+        return None
+    return fastparquet
+
+
+def write_dataset(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    row_group_rows: int = ROW_GROUP_ROWS,
+    engine: str = "auto",
+) -> Tuple[Path, str]:
+    """
+    Write df as Parquet with index-sorted row groups of row_group_rows rows.
+
+    Column statistics (min/max) are written for every row group. Without any
+    Parquet engine the frame is pickled next to path (.pkl) instead.
+
+    Returns:
+        (path written, "parquet" or "pickle")
+    """
+    path = Path(path)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    pa, pq = _pyarrow()
+    fastparquet = _fastparquet()
+    if engine in ("auto", "pyarrow") and pq is not None:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        pq.write_table(
+            table, path, row_group_size=row_group_rows, write_statistics=True
+        )
+        return path, "parquet"
+    if engine in ("auto", "fastparquet") and fastparquet is not None:
+        fastparquet.write(str(path), df, row_group_offsets=row_group_rows, stats=True)
+        return path, "parquet"
+    if engine != "auto":
+        raise ImportError(f"Parquet engine {engine!r} is not installed")
+    path = path.with_suffix(".pkl")
+    df.to_pickle(path)
+    return path, "pickle"
+
+
+class _Layout:
+    """Parquet file handle, index column, data columns and row-group bounds."""
+
+    def __init__(self, path: Path) -> None:
+        pa, pq = _pyarrow()
+        if pq is not None:
+            self.engine = "pyarrow"
+            self.file = pq.ParquetFile(path, memory_map=True)
+            meta = self.file.schema_arrow.pandas_metadata or {}
+            names = list(self.file.schema_arrow.names)
+        else:
+            fastparquet = _fastparquet()
+            if fastparquet is None:
+                raise ImportError("Reading Parquet needs pyarrow or fastparquet")
+            self.engine = "fastparquet"
+            self.file = fastparquet.ParquetFile(str(path))
+            meta = self.file.pandas_metadata or {}
+            names = list(self.file.columns)
+        self.index_cols = [
+            c for c in meta.get("index_columns", []) if isinstance(c, str)
+        ]
+        self.columns = [c for c in names if c not in self.index_cols]
+        self.tz = None
+        for col in meta.get("columns", []):
+            if self.index_cols and col.get("name") == self.index_cols[0]:
+                self.tz = (col.get("metadata") or {}).get("timezone")
+        self.bounds = self._bounds(names)
+
+    def _bounds(self, names: List[str]) -> Optional[List[Tuple[int, int]]]:
+        """Per row group (min, max) of the index as UTC/naive ns, or None."""
+        if not self.index_cols:
+            return None
+        name = self.index_cols[0]
+        out = []
+        if self.engine == "pyarrow":
+            meta = self.file.metadata
+            pos = names.index(name)
+            for i in range(meta.num_row_groups):
+                stats = meta.row_group(i).column(pos).statistics
+                if stats is None or not stats.has_min_max:
+                    return None
+                out.append((_ns(stats.min), _ns(stats.max)))
+        else:
+            stats = self.file.statistics
+            lows, highs = stats["min"].get(name), stats["max"].get(name)
+            if lows is None or any(v is None for v in list(lows) + list(highs)):
+                return None
+            out = [(_ns(lo), _ns(hi)) for lo, hi in zip(lows, highs)]
+        return out
+
+    @property
+    def n_row_groups(self) -> int:
+        if self.engine == "pyarrow":
+            return self.file.metadata.num_row_groups
+        return len(self.file.row_groups)
+
+    def read(self, first: int, stop: int, columns: List[str]) -> pd.DataFrame:
+        """Read row groups first..stop-1 with the given data columns."""
+        if self.engine == "pyarrow":
+            table = self.file.read_row_groups(
+                range(first, stop),
+                columns=columns + self.index_cols,
+                use_pandas_metadata=True,
+            )
+            return table.to_pandas()
+        return self.file[first:stop].to_pandas(columns=columns)
+
+
+def _ns(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value)
+
+
+def _bound(value: TimeBound, tz: Optional[str]) -> Optional[pd.Timestamp]:
+    """Time bound in the index's timezone (naive bounds are taken as index-local)."""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if tz is not None:
+        return ts.tz_localize(tz) if ts.tz is None else ts.tz_convert(tz)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tz is not None else ts
+
+
+def _slice_time(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    if start is None and end is None:
+        return df
+    tz = getattr(df.index, "tz", None)
+    lo = 0 if start is None else df.index.searchsorted(_bound(start, tz), "left")
+    hi = len(df) if end is None else df.index.searchsorted(_bound(end, tz), "right")
+    return df.iloc[lo:hi]
+
+
+def read_dataset(
+    path: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    start: TimeBound = None,
+    end: TimeBound = None,
+) -> pd.DataFrame:
+    """
+    Read a dataset, projecting columns and pruning row groups by time.
+
+    Args:
+        path: .parquet (or .pkl) dataset with a sorted datetime index
+        columns: data columns to read (None: all; [] reads the index only)
+        start, end: inclusive index bounds; naive values are interpreted in
+            the index timezone (UTC for datasets from build_dataset)
+
+    Returns:
+        DataFrame with the requested columns and rows start <= index <= end.
+        Only row groups whose index statistics overlap [start, end] are read.
+    """
+    path = Path(path)
+    if path.suffix == ".pkl":
+        df = pd.read_pickle(path)
+        if columns is not None:
+            df = df[list(columns)]
+        return _slice_time(df, start, end)
+    layout = _Layout(path)
+    cols = layout.columns if columns is None else list(columns)
+    missing = [c for c in cols if c not in layout.columns]
+    if missing:
+        raise KeyError(f"Columns not in dataset {path}: {missing}")
+    first, stop = 0, layout.n_row_groups
+    if layout.bounds is not None and (start is not None or end is not None):
+        lows = np.array([lo for lo, _ in layout.bounds], dtype=np.int64)
+        highs = np.array([hi for _, hi in layout.bounds], dtype=np.int64)
+        if start is not None:
+            first = int(np.searchsorted(highs, _ns(_bound(start, layout.tz)), "left"))
+        if end is not None:
+            stop = int(np.searchsorted(lows, _ns(_bound(end, layout.tz)), "right"))
+    if stop <= first:
+        return layout.read(0, min(1, layout.n_row_groups), cols).iloc[:0]
+    return _slice_time(layout.read(first, stop, cols), start, end)
+
+
+def dataset_columns(path: Union[str, Path]) -> List[str]:
+    """Non-index column names of a dataset (Parquet: from the footer only)."""
+    path = Path(path)
+    if path.suffix == ".pkl":
+        return list(pd.read_pickle(path).columns)
+    return list(_Layout(path).columns)
+
+
+def dataset_time_range(
+    path: Union[str, Path],
+) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """First and last index timestamps (Parquet: from row-group statistics)."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        layout = _Layout(path)
+        if layout.bounds is not None:
+            if not layout.bounds:
+                return None, None
+            first = pd.Timestamp(layout.bounds[0][0])
+            last = pd.Timestamp(layout.bounds[-1][1])
+            if layout.tz is not None:
+                first = first.tz_localize("UTC").tz_convert(layout.tz)
+                last = last.tz_localize("UTC").tz_convert(layout.tz)
+            return first, last
+    index = read_dataset(path, columns=[]).index
+    if not len(index):
+        return None, None
+    return index[0], index[-1]
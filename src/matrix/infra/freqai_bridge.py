@@ -13,13 +13,22 @@ Contract:
 
 See docs/CONTRACTS.md for detailed I/O specifications.
 See docs/LABELS.md for label generation semantics.
+"""
+
+from typing import Any, Dict, Tuple
+
+import pandas as pd
 
 # Import MATRIX hooks for feature/label generation
-from matrix.freqai.hooks import (
+from ..freqai.hooks import (
     generate_features,
-"""
     generate_labels,
+)
+
 
+def prepare_training_data(df_ohlcv: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Prepare features and labels for FreqAI model training.
 
     This function orchestrates the feature engineering and label generation
     process for training data preparation. Ensures temporal alignment and
@@ -75,12 +84,11 @@ def prepare_inference_data(df_ohlcv_tail: pd.DataFrame) -> pd.DataFrame:
         - Features MUST match training feature columns
 
     TODO:
-        - Implement optimized feature generation for inference
         - Add latency monitoring and telemetry
         - Implement feature validation against training schema
         - Add caching for performance optimization
     """
-    # SKELETON: Conceptual hook call - no actual execution
+    # Same NumPy kernel as build_dataset; warmup rows stay NaN.
     features = generate_features(df_ohlcv_tail)
 
     # TODO: Add latency telemetry logging
@@ -3,11 +3,26 @@ OHLCV sensor module.
 
 Provides an interface for fetching OHLCV data with a datetime index.
 Contract: get_ohlcv(pair, timeframe) -> DataFrame [date, open, high, low, close, volume] with datetime index.
+
+Also provides the shared typed OHLCV CSV reader used by the dataset builder
+and the CSV validator:
+    read_ohlcv_csv(path, dtype="float64", engine="auto", cache_dir=None)
+        -> DataFrame [open, high, low, close, volume, ...] with a UTC DatetimeIndex
 """
 
-from typing import Optional
+import glob
+import hashlib
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+TIME_COLUMNS = ("date", "datetime", "timestamp")
+ENGINES = ("auto", "pandas", "pyarrow")
+CACHE_KEYS = ("mtime", "hash")
+
 
 def get_ohlcv(
     pair: str, timeframe: str, since: Optional[str] = None, limit: Optional[int] = None
@@ -26,3 +41,206 @@ def get_ohlcv(
         Columns should be numeric types; avoid NaN when possible.
     """
     pass
+
+
+def _pyarrow_csv():
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return None, None
+    return pa, pacsv
+
+
+def _header(path: Path) -> list:
+    with open(path, newline="") as f:
+        return [c.strip() for c in f.readline().rstrip("\r\n").split(",")]
+
+
+def parse_timestamps(
+    values: pd.Series, time_format: Optional[str] = None
+) -> pd.DatetimeIndex:
+    """
+    Parse epoch numbers or ISO-8601 strings into a UTC DatetimeIndex.
+
+    Epoch units (s/ms/us/ns) are inferred from the magnitude; strings use the
+    vectorized ISO-8601 parser. With time_format every value must be a string
+    in exactly that strftime format. The index always has nanosecond
+    resolution (asi8 is ns whatever the CSV engine). Raises ValueError naming
+    the first bad value.
+    """
+    if time_format is not None:
+        values = values.astype(str)
+        idx = pd.DatetimeIndex(
+            pd.to_datetime(values, utc=True, format=time_format, errors="coerce")
+        )
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        idx = pd.DatetimeIndex(values)
+        idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+        # pyarrow yields datetime64[s]; callers read asi8 as nanoseconds
+        return idx.as_unit("ns")
+    elif pd.api.types.is_numeric_dtype(values):
+        arr = np.asarray(values, dtype=np.float64)
+        finite = arr[np.isfinite(arr)]
+        top = float(np.abs(finite).max()) if finite.shape[0] else 0.0
+        unit = (
+            "s" if top < 1e11 else "ms" if top < 1e14 else "us" if top < 1e17 else "ns"
+        )
+        idx = pd.DatetimeIndex(pd.to_datetime(values, unit=unit, utc=True))
+    else:
+        values = values.astype(str) if values.dtype != object else values
+        if len(values):
+            # A uniform explicit UTC suffix costs the ISO parser ~5x; strip it.
+            first = str(values.iloc[0])
+            for suffix in ("+00:00", "Z", "+0000"):
+                if first.endswith(suffix) and values.str.endswith(suffix).all():
+                    values = values.str.slice(0, -len(suffix))
+                    break
+        try:
+            idx = pd.DatetimeIndex(
+                pd.to_datetime(values, utc=True, format="ISO8601", errors="coerce")
+            )
+        except (TypeError, ValueError):
+            idx = pd.DatetimeIndex(pd.to_datetime(values, utc=True, errors="coerce"))
+    bad = np.flatnonzero(idx.isna())
+    if bad.shape[0]:
+        raise ValueError(f"Bad timestamp: {values.iloc[int(bad[0])]}")
+    return idx.as_unit("ns")
+
+
+def _cache_key(path: Path, key: str, extra: str) -> str:
+    h = hashlib.sha1()
+    if key == "hash":
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    else:
+        st = path.stat()
+        h.update(f"{path.resolve()}:{st.st_size}:{st.st_mtime_ns}".encode())
+    h.update(extra.encode())
+    return h.hexdigest()[:16]
+
+
+def _read_csv(
+    path: Path,
+    time_col: str,
+    dtype: str,
+    engine: str,
+    skip_rows: int,
+    usecols: Optional[Sequence[str]],
+    time_format: Optional[str] = None,
+) -> pd.DataFrame:
+    pa, pacsv = _pyarrow_csv()
+    if engine == "pyarrow" and pa is None:
+        raise ImportError("engine='pyarrow' requires pyarrow")
+    if engine in ("auto", "pyarrow") and pa is not None:
+        float_type = pa.float32() if dtype == "float32" else pa.float64()
+        column_types = {c: float_type for c in OHLCV_COLUMNS}
+        if time_format is not None:
+            # Keep the raw text so the format is checked, not pyarrow's inference
+            column_types[time_col] = pa.string()
+        table = pacsv.read_csv(
+            path,
+            read_options=pacsv.ReadOptions(skip_rows_after_names=skip_rows),
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types,
+                include_columns=list(usecols) if usecols else None,
+            ),
+        )
+        return table.to_pandas()
+    dtypes = {c: dtype for c in OHLCV_COLUMNS}
+    if time_format is not None:
+        dtypes[time_col] = str
+    return pd.read_csv(
+        path,
+        dtype=dtypes,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+        usecols=list(usecols) if usecols else None,
+        engine="c",
+    )
+
+
+def read_ohlcv_csv(
+    path: Union[str, Path],
+    *,
+    dtype: str = "float64",
+    engine: str = "auto",
+    time_col: Optional[str] = None,
+    usecols: Optional[Sequence[str]] = None,
+    skip_rows: int = 0,
+    cache_dir: Optional[Union[str, Path]] = None,
+    cache_key: str = "mtime",
+    time_format: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Read an OHLCV CSV with explicit dtypes and a parsed UTC timestamp index.
+
+    Args:
+        path: CSV file with a header row
+        dtype: "float64" or "float32" for open/high/low/close/volume
+        engine: "pyarrow" (pyarrow.csv), "pandas" (C parser) or "auto"
+            (pyarrow when installed)
+        time_col: timestamp column; default: first of date/datetime/timestamp
+            present. Epoch s/ms/us/ns numbers and ISO-8601 strings are accepted.
+        time_format: if set, timestamps must be strings in exactly this
+            strftime format (e.g. "%Y-%m-%d %H:%M:%S")
+        usecols: optional subset of columns to read (time_col is added)
+        skip_rows: skip that many data rows after the header (not cached)
+        cache_dir: if set, keep a Parquet copy of the parsed frame there,
+            keyed by file path/size/mtime ("mtime") or content SHA-1 ("hash")
+            and the read options; stale copies of the same file read with the
+            same options are removed
+        cache_key: "mtime" or "hash"
+
+    Returns:
+        DataFrame indexed by a UTC DatetimeIndex named after time_col, in file
+        order (not sorted or de-duplicated).
+
+    Raises:
+        ValueError: no timestamp column, bad timestamps or unknown options.
+    """
+    path = Path(path)
+    if dtype not in ("float32", "float64"):
+        raise ValueError(f"Unsupported dtype {dtype!r}; expected float32 or float64")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    if cache_key not in CACHE_KEYS:
+        raise ValueError(f"Unknown cache_key {cache_key!r}; expected {CACHE_KEYS}")
+    if time_col is None:
+        header = _header(path)
+        time_col = next((c for c in TIME_COLUMNS if c in header), None)
+        if time_col is None:
+            raise ValueError("CSV must have 'date' or 'datetime' column.")
+    if usecols is not None and time_col not in usecols:
+        usecols = [time_col] + list(usecols)
+
+    cache_path = None
+    if cache_dir is not None and not skip_rows:
+        extra = f"{dtype}:{time_col}:{','.join(usecols or [])}:{time_format}"
+        key = _cache_key(path, cache_key, extra)
+        # Prefix per source file and read options: only its own stale copies
+        # are evicted, not those of same-named CSVs in other directories.
+        source = hashlib.sha1(f"{path.resolve()}:{extra}".encode()).hexdigest()[:8]
+        prefix = f"{path.stem}.{source}"
+        cache_dir = Path(cache_dir)
+        cache_path = cache_dir / f"{prefix}.{key}.parquet"
+        if cache_path.exists():
+            return pd.read_parquet(cache_path)
+
+    df = _read_csv(path, time_col, dtype, engine, skip_rows, usecols, time_format)
+    if time_col not in df.columns:
+        raise ValueError(f"CSV has no {time_col!r} column.")
+    idx = parse_timestamps(df[time_col], time_format)
+    df = df.drop(columns=[time_col])
+    df.index = idx.rename(time_col)
+
+    if cache_path is not None:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in cache_dir.glob(f"{glob.escape(prefix)}.*.parquet"):
+                stale.unlink()
+            df.to_parquet(cache_path)
+        except Exception:
+            # Caching is best effort (e.g. no Parquet engine installed).
+            pass
+    return df
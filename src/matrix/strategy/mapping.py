@@ -1,7 +1,8 @@
 """
 map_predictions_to_signals
 
-Pure Python reference mapping function for MATRIX signal generation.
+Pure Python reference mapping function for MATRIX signal generation, plus an
+equivalent NumPy engine for long series (engine="numpy").
 
 Args:
     preds: list/tuple/Iterable of float predictions
@@ -9,9 +10,10 @@ Args:
     dn: float (short entry threshold)
     hysteresis: float (buffer to prevent immediate flip)
     cooldown_bars: int (bars to suppress new entries after exit)
+    engine: "python" (reference loop, default) or "numpy" (event-driven)
 
 Returns:
-    dict with four parallel lists of 0/1:
+    dict with four parallel lists of 0/1 (engine="numpy": four uint8 arrays):
         - enter_long
         - enter_short
         - exit_long
@@ -22,22 +24,52 @@ Behavior:
     - Hysteresis: after long, require pred < (up - hysteresis) to allow exit; analogously for short.
     - Cooldown: after exit, suppress new entries for N bars.
 
+NumPy engine:
+    The state machine only changes state at entries and exits, so the engine
+    precomputes "next bar at or after i where condition holds" arrays for the
+    four threshold crossings and then jumps from event to event. Python-level
+    work is proportional to the number of trades, not the number of bars.
+    Output is identical to the reference loop (NaN predictions never trigger).
+
+Grid sweeps:
+    map_predictions_grid(preds, grid) evaluates many (up, dn, hysteresis,
+    cooldown_bars) combinations over one prediction series. Threshold-crossing
+    arrays are computed once per distinct threshold value and shared by every
+    combination; results are (combination x bar) uint8 matrices or, with
+    stats_only=True, one row of signal_metrics per combination.
+
 Examples:
     >>> map_predictions_to_signals([0.2, 0.15, 0.05, -0.1, 0.12], up=0.1, dn=-0.1, hysteresis=0.02, cooldown_bars=2)
     {'enter_long': [1, 0, 0, 0, 0], 'enter_short': [0, 0, 0, 1, 0], 'exit_long': [0, 0, 1, 0, 0], 'exit_short': [0, 0, 0, 0, 0]}
 """
 
-from typing import Iterable, List, Dict, Union
+import itertools
+from typing import Any, Iterable, List, Dict, Mapping, Sequence, Union
+
+import numpy as np
+
+from .signal_metrics import COUNT_KEYS, METRIC_KEYS, event_metrics
+
+ENGINES = ("python", "numpy")
+SIGNAL_KEYS = ("enter_long", "enter_short", "exit_long", "exit_short")
+GRID_COLUMNS = ("up", "dn", "hysteresis", "cooldown_bars")
 
 
 def map_predictions_to_signals(
-    preds: Union[List[float], tuple[float, ...], Iterable[float]],
+    preds: Union[List[float], tuple[float, ...], Iterable[float], np.ndarray],
     *,
     up: float,
     dn: float,
     hysteresis: float,
     cooldown_bars: int,
-) -> Dict[str, List[int]]:
+    engine: str = "python",
+) -> Dict[str, Union[List[int], np.ndarray]]:
+    if engine == "numpy":
+        return _map_numpy(
+            preds, up=up, dn=dn, hysteresis=hysteresis, cooldown_bars=cooldown_bars
+        )
+    if engine != "python":
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
     enter_long: List[int] = []
     enter_short: List[int] = []
     exit_long: List[int] = []
@@ -93,3 +125,215 @@ def map_predictions_to_signals(
         "exit_long": exit_long,
         "exit_short": exit_short,
     }
+
+
+def _as_float_array(preds) -> np.ndarray:
+    if isinstance(preds, np.ndarray):
+        return np.asarray(preds, dtype=np.float64).ravel()
+    if not isinstance(preds, (list, tuple)):
+        preds = list(preds)
+    return np.asarray(preds, dtype=np.float64)
+
+
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """
+    For each bar i return the first index j >= i where mask[j] is True.
+
+    The result has len(mask) + 1 entries; missing events (and the trailing
+    sentinel) are len(mask), so callers may look up index i + 1 safely.
+    """
+    n = mask.shape[0]
+    idx = np.full(n + 1, n, dtype=np.int64)
+    idx[:n][mask] = np.flatnonzero(mask)
+    # Contiguous copy so _trade_events can index it through a memoryview.
+    return np.ascontiguousarray(np.minimum.accumulate(idx[::-1])[::-1])
+
+
+def _trade_events(
+    next_up: np.ndarray,
+    next_dn: np.ndarray,
+    next_exit_long: np.ndarray,
+    next_exit_short: np.ndarray,
+    cooldown_bars: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Walk the state machine from event to event.
+
+    Returns (entry_idx, entry_is_long, exit_idx). exit_idx has one entry per
+    closed trade; it is one shorter than entry_idx when the last trade is
+    still open at the end of the series.
+    """
+    n = next_up.shape[0] - 1
+    cooldown = max(int(cooldown_bars), 0)
+    # memoryview indexing returns plain ints and is much cheaper than numpy
+    # scalar access inside this per-trade loop.
+    next_up, next_dn = memoryview(next_up), memoryview(next_dn)
+    next_exit_long = memoryview(next_exit_long)
+    next_exit_short = memoryview(next_exit_short)
+    entries: List[int] = []
+    sides: List[bool] = []
+    exits: List[int] = []
+    t = 0
+    while t < n:
+        j_long = next_up[t]
+        j_short = next_dn[t]
+        # pred >= up is checked before pred <= dn in the reference loop
+        if j_long <= j_short:
+            if j_long >= n:
+                break
+            j = j_long
+            k = next_exit_long[j + 1]
+            sides.append(True)
+        else:
+            j = j_short
+            k = next_exit_short[j + 1]
+            sides.append(False)
+        entries.append(j)
+        if k >= n:
+            break
+        exits.append(k)
+        # The exit bar itself consumes the first cooldown bar, so the next
+        # entry is possible at k + cooldown (same bar when cooldown == 0).
+        t = k + cooldown
+    return (
+        np.asarray(entries, dtype=np.int64),
+        np.asarray(sides, dtype=bool),
+        np.asarray(exits, dtype=np.int64),
+    )
+
+
+def _fill_signals(
+    out: Dict[str, np.ndarray],
+    entry_idx: np.ndarray,
+    entry_is_long: np.ndarray,
+    exit_idx: np.ndarray,
+) -> None:
+    closed_is_long = entry_is_long[: exit_idx.shape[0]]
+    out["enter_long"][entry_idx[entry_is_long]] = 1
+    out["enter_short"][entry_idx[~entry_is_long]] = 1
+    out["exit_long"][exit_idx[closed_is_long]] = 1
+    out["exit_short"][exit_idx[~closed_is_long]] = 1
+
+
+def _map_numpy(
+    preds, *, up: float, dn: float, hysteresis: float, cooldown_bars: int
+) -> Dict[str, np.ndarray]:
+    p = _as_float_array(preds)
+    # Same threshold arithmetic as the reference loop (bit-identical floats).
+    exit_long_threshold = up - (hysteresis / 2.0)
+    exit_short_threshold = dn + (hysteresis / 2.0)
+    entry_idx, entry_is_long, exit_idx = _trade_events(
+        _next_true(p >= up),
+        _next_true(p <= dn),
+        _next_true(p <= exit_long_threshold),
+        _next_true(p >= exit_short_threshold),
+        cooldown_bars,
+    )
+    out = {k: np.zeros(p.shape[0], dtype=np.uint8) for k in SIGNAL_KEYS}
+    _fill_signals(out, entry_idx, entry_is_long, exit_idx)
+    return out
+
+
+def threshold_grid(
+    *,
+    up: Sequence[float],
+    dn: Sequence[float],
+    hysteresis: Sequence[float],
+    cooldown_bars: Sequence[int],
+) -> np.ndarray:
+    """
+    Build the cartesian product of threshold values as an (m, 4) float64 array.
+
+    Column order follows GRID_COLUMNS: up, dn, hysteresis, cooldown_bars.
+    """
+    rows = list(itertools.product(up, dn, hysteresis, cooldown_bars))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, len(GRID_COLUMNS))
+
+
+def _grid_array(grid: Union[np.ndarray, Iterable[Any]]) -> np.ndarray:
+    if isinstance(grid, np.ndarray):
+        return np.asarray(grid, dtype=np.float64).reshape(-1, len(GRID_COLUMNS))
+    rows = []
+    for g in grid:
+        if isinstance(g, Mapping):
+            rows.append([g[c] for c in GRID_COLUMNS])
+        else:
+            rows.append(list(g))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, len(GRID_COLUMNS))
+
+
+def map_predictions_grid(
+    preds: Union[List[float], tuple[float, ...], Iterable[float], np.ndarray],
+    grid: Union[np.ndarray, Iterable[Any]],
+    *,
+    stats_only: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Map one prediction series with every threshold combination in grid.
+
+    Args:
+        preds: prediction series (converted once to float64)
+        grid: (m, 4) array in GRID_COLUMNS order, or an iterable of mappings
+            with keys up/dn/hysteresis/cooldown_bars (or 4-tuples)
+        stats_only: return per-combination proxy metrics instead of signals
+
+    Returns:
+        dict with "params" ((m, 4) float64) plus either
+            - enter_long/enter_short/exit_long/exit_short: (m, n) uint8, row i
+              identical to map_predictions_to_signals with grid row i, or
+            - signal_metrics.METRIC_KEYS (float64) and COUNT_KEYS (int64),
+              each of shape (m,).
+
+    Notes:
+        Crossing arrays are cached per distinct threshold value, so a grid
+        sharing UP/DOWN levels across hysteresis/cooldown variants only scans
+        the data once per level. stats_only avoids the O(m * n) signal
+        matrices for large sweeps.
+    """
+    p = _as_float_array(preds)
+    params = _grid_array(grid)
+    n = p.shape[0]
+    m = params.shape[0]
+    cache: Dict[tuple[str, float], np.ndarray] = {}
+
+    def crossing(kind: str, threshold: float) -> np.ndarray:
+        key = (kind, threshold)
+        if key not in cache:
+            mask = p >= threshold if kind == "ge" else p <= threshold
+            cache[key] = _next_true(mask)
+        return cache[key]
+
+    if stats_only:
+        out: Dict[str, np.ndarray] = {
+            k: np.zeros(m, dtype=np.float64) for k in METRIC_KEYS
+        }
+        out.update({k: np.zeros(m, dtype=np.int64) for k in COUNT_KEYS})
+    else:
+        out = {k: np.zeros((m, n), dtype=np.uint8) for k in SIGNAL_KEYS}
+
+    for i in range(m):
+        up, dn, hysteresis, cooldown = (float(v) for v in params[i])
+        cooldown_bars = int(cooldown)
+        entry_idx, entry_is_long, exit_idx = _trade_events(
+            crossing("ge", up),
+            crossing("le", dn),
+            crossing("le", up - (hysteresis / 2.0)),
+            crossing("ge", dn + (hysteresis / 2.0)),
+            cooldown_bars,
+        )
+        if stats_only:
+            stats = event_metrics(
+                n,
+                entry_idx,
+                int(np.count_nonzero(entry_is_long)),
+                exit_idx,
+                cooldown_bars,
+            )
+            for k, v in stats.items():
+                out[k][i] = v
+        else:
+            _fill_signals(
+                {k: out[k][i] for k in SIGNAL_KEYS}, entry_idx, entry_is_long, exit_idx
+            )
+    out["params"] = params
+    return out
@@ -0,0 +1,144 @@
+"""
+SignalMapper
+
+Stateful, incremental counterpart of mapping.map_predictions_to_signals for
+live/dry-run inference: feed one prediction per new candle instead of
+re-mapping the whole dataframe.
+
+Contract:
+    - update(pred) is O(1) and returns (enter_long, enter_short, exit_long, exit_short)
+    - Feeding a sequence through update() yields exactly the same 0/1 values as
+      map_predictions_to_signals() over that sequence with the same parameters
+    - snapshot() returns a JSON-serializable dict; SignalMapper.restore(snapshot)
+      resumes at the same position state and remaining cooldown
+
+Examples:
+    >>> m = SignalMapper(up=0.1, dn=-0.1, hysteresis=0.02, cooldown_bars=2)
+    >>> m.update(0.2)
+    Signals(enter_long=1, enter_short=0, exit_long=0, exit_short=0)
+    >>> m2 = SignalMapper.restore(m.snapshot())
+    >>> m2.update(0.05)
+    Signals(enter_long=0, enter_short=0, exit_long=1, exit_short=0)
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+SNAPSHOT_VERSION = 1
+
+
+class Signals(NamedTuple):
+    """Signal flags emitted for one bar (0/1 each)."""
+
+    enter_long: int
+    enter_short: int
+    exit_long: int
+    exit_short: int
+
+
+class SignalMapper:
+    """
+    Incremental threshold/hysteresis/cooldown state machine.
+
+    Args:
+        up: long entry threshold
+        dn: short entry threshold
+        hysteresis: buffer to prevent immediate flip
+        cooldown_bars: bars to suppress new entries after exit
+        state: current position (None, "long" or "short")
+        cooldown: remaining cooldown bars
+        bars_seen: number of predictions consumed so far (informational)
+    """
+
+    def __init__(
+        self,
+        *,
+        up: float,
+        dn: float,
+        hysteresis: float,
+        cooldown_bars: int,
+        state: Optional[str] = None,
+        cooldown: int = 0,
+        bars_seen: int = 0,
+    ) -> None:
+        if state not in (None, "long", "short"):
+            raise ValueError(
+                f"Invalid state {state!r}; expected None, 'long' or 'short'"
+            )
+        self.up = up
+        self.dn = dn
+        self.hysteresis = hysteresis
+        self.cooldown_bars = cooldown_bars
+        self.state = state
+        self.cooldown = cooldown
+        self.bars_seen = bars_seen
+        # Same threshold arithmetic as map_predictions_to_signals.
+        self._exit_long_threshold = up - (hysteresis / 2.0)
+        self._exit_short_threshold = dn + (hysteresis / 2.0)
+
+    def update(self, pred: float) -> Signals:
+        """Consume one prediction and return the signals for that bar."""
+        el = es = xl = xs = 0
+        if self.state == "long":
+            if pred <= self._exit_long_threshold:
+                xl = 1
+                self.state = None
+                self.cooldown = self.cooldown_bars
+        elif self.state == "short":
+            if pred >= self._exit_short_threshold:
+                xs = 1
+                self.state = None
+                self.cooldown = self.cooldown_bars
+
+        if self.state is None:
+            if self.cooldown > 0:
+                self.cooldown -= 1
+            elif pred >= self.up:
+                el = 1
+                self.state = "long"
+            elif pred <= self.dn:
+                es = 1
+                self.state = "short"
+
+        self.bars_seen += 1
+        return Signals(el, es, xl, xs)
+
+    def update_many(self, preds: Iterable[float]) -> Dict[str, List[int]]:
+        """
+        Consume a small batch of predictions.
+
+        Returns the same dict-of-lists layout as map_predictions_to_signals.
+        """
+        out: Dict[str, List[int]] = {k: [] for k in Signals._fields}
+        for pred in preds:
+            for k, v in zip(Signals._fields, self.update(pred)):
+                out[k].append(v)
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of parameters and state."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "up": self.up,
+            "dn": self.dn,
+            "hysteresis": self.hysteresis,
+            "cooldown_bars": self.cooldown_bars,
+            "state": self.state,
+            "cooldown": self.cooldown,
+            "bars_seen": self.bars_seen,
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> "SignalMapper":
+        """Rebuild a mapper from snapshot(); raises ValueError on unknown versions."""
+        version = snapshot.get("version")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported SignalMapper snapshot version: {version!r}")
+        return cls(
+            up=snapshot["up"],
+            dn=snapshot["dn"],
+            hysteresis=snapshot["hysteresis"],
+            cooldown_bars=snapshot["cooldown_bars"],
+            state=snapshot["state"],
+            cooldown=snapshot["cooldown"],
+            bars_seen=snapshot.get("bars_seen", 0),
+        )
@@ -0,0 +1,131 @@
+"""
+Signal behavior metrics kernel.
+
+Vectorized proxy metrics for mapped signals, shared by the threshold simulator
+(scripts/sim/simulate_thresholds.py), the batched grid mapper and telemetry
+(log_signal_behavior_metrics).
+
+Contract:
+    signal_metrics(signals, cooldown_bars) -> dict of floats/ints
+    event_metrics(n, entry_idx, n_long, exit_idx, cooldown_bars) -> same dict
+
+Definitions (unrounded; match simulate_thresholds.compute_metrics):
+    - trigger_rate: entries / bars
+    - long_rate / short_rate: share of entries that are long / short
+    - churn_rate: exits closing a trade held fewer than cooldown_bars bars, per entry
+    - avg_hold / hold_median / hold_p90: bars between an entry and its exit. Each
+      exit is paired with the latest entry at or before it, unless that entry
+      was already consumed by the previous exit.
+    - long_trigger_rate / short_trigger_rate: long / short entries per bar
+    - neutral_time_pct: share of bars that end without an open position
+"""
+
+from typing import Dict, Mapping, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[Sequence[int], np.ndarray]
+
+METRIC_KEYS = (
+    "trigger_rate",
+    "long_rate",
+    "short_rate",
+    "churn_rate",
+    "avg_hold",
+    "hold_median",
+    "hold_p90",
+    "long_trigger_rate",
+    "short_trigger_rate",
+    "neutral_time_pct",
+)
+COUNT_KEYS = ("n_entries", "n_exits", "n_holds", "n_churn")
+
+
+def event_metrics(
+    n: int,
+    entry_idx: np.ndarray,
+    n_long: int,
+    exit_idx: np.ndarray,
+    cooldown_bars: int,
+) -> Dict[str, float]:
+    """
+    Compute signal metrics from sorted entry/exit bar indices.
+
+    Args:
+        n: number of bars
+        entry_idx: sorted bar indices with an entry (long or short)
+        n_long: number of long entries
+        exit_idx: sorted bar indices with an exit (long or short)
+        cooldown_bars: churn horizon in bars
+
+    Returns:
+        dict with METRIC_KEYS (float) and COUNT_KEYS (int).
+    """
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    exit_idx = np.asarray(exit_idx, dtype=np.int64)
+    n_entries = int(entry_idx.shape[0])
+    n_short = n_entries - int(n_long)
+
+    pos = np.searchsorted(entry_idx, exit_idx, side="right") - 1
+    paired = entry_idx[np.maximum(pos, 0)] if n_entries else np.full_like(exit_idx, -1)
+    prev_exit = np.concatenate(([-1], exit_idx[:-1]))
+    valid = (pos >= 0) & (paired > prev_exit)
+    holds = (exit_idx - paired)[valid]
+    n_churn = int(np.count_nonzero(holds < cooldown_bars))
+
+    # Position level only changes at events: sum segment lengths where it is > 0.
+    times = np.concatenate((entry_idx, exit_idx))
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    level = np.cumsum(
+        np.concatenate((np.ones(n_entries), -np.ones(exit_idx.shape[0])))[order]
+    )
+    seg = np.diff(np.append(times, n))
+    in_position = int(seg[level > 0].sum())
+
+    return {
+        "trigger_rate": n_entries / n if n else 0.0,
+        "long_rate": n_long / n_entries if n_entries else 0.0,
+        "short_rate": n_short / n_entries if n_entries else 0.0,
+        "churn_rate": n_churn / n_entries if n_entries else 0.0,
+        "avg_hold": float(holds.mean()) if holds.shape[0] else 0.0,
+        "hold_median": float(np.median(holds)) if holds.shape[0] else 0.0,
+        "hold_p90": float(np.percentile(holds, 90)) if holds.shape[0] else 0.0,
+        "long_trigger_rate": n_long / n if n else 0.0,
+        "short_trigger_rate": n_short / n if n else 0.0,
+        "neutral_time_pct": (n - in_position) / n if n else 0.0,
+        "n_entries": n_entries,
+        "n_exits": int(exit_idx.shape[0]),
+        "n_holds": int(holds.shape[0]),
+        "n_churn": n_churn,
+    }
+
+
+def signal_metrics(
+    signals: Mapping[str, ArrayLike], cooldown_bars: int
+) -> Dict[str, float]:
+    """
+    Compute signal metrics from the four 0/1 signal columns.
+
+    Args:
+        signals: dict with enter_long/enter_short/exit_long/exit_short
+            (lists or arrays of equal length, as produced by the mappers;
+            at most one entry flag per bar)
+        cooldown_bars: churn horizon in bars
+
+    Returns:
+        dict with METRIC_KEYS (float) and COUNT_KEYS (int); see module docstring.
+    """
+    el = np.asarray(signals["enter_long"]) != 0
+    es = np.asarray(signals["enter_short"]) != 0
+    exits = (np.asarray(signals["exit_long"]) != 0) | (
+        np.asarray(signals["exit_short"]) != 0
+    )
+    entry_idx = np.flatnonzero(el | es)
+    return event_metrics(
+        el.shape[0],
+        entry_idx,
+        int(np.count_nonzero(el)),
+        np.flatnonzero(exits),
+        cooldown_bars,
+    )
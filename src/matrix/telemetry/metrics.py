@@ -8,7 +8,9 @@ Contract: log_*(stage, value) for various metrics across pipeline stages.
 Integration: Implements buckets from docs/METRICS_CHECKLIST.md for sandbox reporting.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from ..strategy.signal_metrics import signal_metrics
 
 
 def log_latency_ms(stage: str, value: float) -> None:
@@ -137,6 +139,36 @@ def log_signal_behavior_metrics(
     pass
 
 
+def log_signal_behavior_from_signals(
+    signals: Mapping[str, Sequence[int]], cooldown_bars: int
+) -> Dict[str, float]:
+    """
+    Compute signal behavior metrics from mapped signals and log them.
+
+    Args:
+        signals: dict with enter_long/enter_short/exit_long/exit_short (0/1)
+        cooldown_bars: churn horizon used for signal_oscillations
+
+    Returns:
+        The full metrics dict from matrix.strategy.signal_metrics.signal_metrics
+        (same kernel as the threshold sweep).
+
+    Notes:
+        - threshold_effectiveness needs trade outcomes and is logged as NaN
+        - Rates are logged as percentages, matching log_signal_behavior_metrics
+    """
+    m = signal_metrics(signals, cooldown_bars)
+    log_signal_behavior_metrics(
+        long_trigger_rate=100.0 * m["long_trigger_rate"],
+        short_trigger_rate=100.0 * m["short_trigger_rate"],
+        avg_holding_period=m["avg_hold"],
+        signal_oscillations=m["n_churn"],
+        threshold_effectiveness=float("nan"),
+        neutral_time_pct=100.0 * m["neutral_time_pct"],
+    )
+    return m
+
+
 def log_performance_metrics(
     total_return: float,
     benchmark_return: float,
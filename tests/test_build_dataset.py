@@ -37,6 +37,8 @@ def main():
         "pct",
         "--windows",
         "1,3",
+        "--vol-window",
+        "3",
         "--out",
         str(out_parquet),
     ]
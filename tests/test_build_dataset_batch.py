@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.training.build_dataset import build_batch, build_one
+
+
+def _write_csv(path, n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.002, n))
+    pd.DataFrame(
+        {
+            "date": pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.001,
+            "low": np.minimum(open_, close) * 0.999,
+            "close": close,
+            "volume": rng.random(n) * 1000,
+        }
+    ).to_csv(path, index=False)
+
+
+def test_batch_matches_single_builds(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    _write_csv(raw / "BTC_USDT_5m.csv", 200, 0)
+    _write_csv(raw / "ETH_USDT_5m.csv", 150, 1)
+    manifest = {
+        "ohlcv_template": str(raw / "{pair}_{timeframe}.csv"),
+        "windows": [1, 3, 12],
+        "vol_window": 40,
+        "jobs": [
+            {"pair": "BTC/USDT", "timeframe": "5m", "H": 3, "transform": "pct"},
+            {"pair": "ETH/USDT", "timeframe": "5m", "H": 6, "transform": "log"},
+            {"pair": "XRP/USDT", "timeframe": "5m", "H": 3, "transform": "pct"},
+        ],
+    }
+    out = tmp_path / "datasets"
+    batch = build_batch(manifest, out, workers=2)
+
+    assert batch["n_jobs"] == 3 and batch["n_failed"] == 1
+    assert json.loads((out / "_manifest.json").read_text()) == batch
+    failed = batch["jobs"][2]
+    assert failed["pair"] == "XRP/USDT" and "error" in failed
+    assert not (out / "pair=XRP_USDT").exists()
+
+    for job, (csv, H, transform) in zip(
+        batch["jobs"][:2],
+        [("BTC_USDT_5m.csv", 3, "pct"), ("ETH_USDT_5m.csv", 6, "log")],
+    ):
+        ref = build_one(
+            raw / csv,
+            "5m",
+            H,
+            transform,
+            [1, 3, 12],
+            tmp_path / "ref.parquet",
+            vol_window=40,
+        )
+        assert ref["n_rows"] > 0
+        assert job["path"].startswith(f"pair={csv[:8]}/timeframe=5m/")
+        assert job["n_rows"] == ref["n_rows"]
+        got = pd.read_parquet(out / job["path"])
+        pd.testing.assert_frame_equal(got, pd.read_parquet(ref["path"]))
+
+
+def test_append_matches_full_rebuild(tmp_path):
+    from scripts.training.build_dataset import append_one
+
+    full_csv = tmp_path / "full.csv"
+    _write_csv(full_csv, 400, 2)
+    csv = tmp_path / "BTC_USDT_5m.csv"
+    lines = full_csv.read_text().splitlines(keepends=True)
+    csv.write_text("".join(lines[:301]))
+    out = tmp_path / "ds.parquet"
+    sidecar = tmp_path / "ds.json"
+    build_one(csv, "5m", 6, "log", [1, 3, 12], out, sidecar, vol_window=40)
+
+    for end in (351, 401, 401):  # second append at 401 is a no-op
+        csv.write_text("".join(lines[:end]))
+        res = append_one(csv, out, sidecar)
+        fresh = build_one(
+            csv, "5m", 6, "log", [1, 3, 12], tmp_path / "fresh.parquet", vol_window=40
+        )
+        ref = pd.read_parquet(fresh["path"])
+        got = pd.read_parquet(out)
+        pd.testing.assert_frame_equal(got, ref, check_freq=False)
+        assert res["n_rows"] == len(ref)
+        assert json.loads(sidecar.read_text())["last_ts"] == str(ref.index[-1])
+    assert res["appended_rows"] == 0
+
+
+def test_multi_horizon_build(tmp_path):
+    csv = tmp_path / "BTC_USDT_5m.csv"
+    _write_csv(csv, 200, 3)
+    multi = build_one(
+        csv, "5m", [3, 12, 6], "log", [1, 3, 12], tmp_path / "m.parquet", vol_window=40
+    )
+    got = pd.read_parquet(multi["path"])
+    assert multi["label_H"] == [3, 12, 6]
+    assert multi["label_names"] == [f"label_R_H{h}_log" for h in (3, 12, 6)]
+    # Warmup covers the full f_vol_z window (vol_window - 1 rows)
+    assert multi["dropped_warmup"] == 39
+    assert len(got) == 200 - 39 - 12
+    for h in (3, 6, 12):
+        single = build_one(
+            csv, "5m", h, "log", [1, 3, 12], tmp_path / f"{h}.parquet", vol_window=40
+        )
+        ref = pd.read_parquet(single["path"]).reindex(got.index)
+        pd.testing.assert_frame_equal(got[list(ref.columns)], ref, check_freq=False)
+
+
+def test_empty_build_fails(tmp_path):
+    sample = "docs/REPORTS/RAW/OHLCV_SAMPLE.csv"
+    out = tmp_path / "sample.parquet"
+    with pytest.raises(ValueError, match="No rows left"):
+        build_one(sample, "5m", 3, "pct", [1, 3], out)
+    assert not out.exists()
+    summary = build_one(sample, "5m", 3, "pct", [1, 3], out, vol_window=3)
+    assert summary["n_rows"] == 2 and summary["dropped_warmup"] == 3
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.matrix.infra import dataset_io
+from src.matrix.infra.dataset_io import (
+    dataset_columns,
+    dataset_time_range,
+    read_dataset,
+    write_dataset,
+)
+
+
+def _frame(n, tz="UTC"):
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz=tz, name="date")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "f_ret_1": rng.normal(size=n),
+            "f_vol_z": rng.normal(size=n),
+            "label_R_H3_pct": rng.normal(size=n),
+        },
+        index=idx,
+    )
+
+
+def test_projection_and_row_group_pruning(tmp_path, monkeypatch):
+    df = _frame(20 * 288)  # 20 days
+    path, fmt = write_dataset(df.sample(frac=1, random_state=0), tmp_path / "d.parquet")
+    assert fmt == "parquet"
+    assert dataset_columns(path) == list(df.columns)
+    first, last = dataset_time_range(path)
+    assert first == df.index[0] and last == df.index[-1]
+
+    reads = []
+    original = dataset_io._Layout.read
+
+    def spy(self, first, stop, columns):
+        reads.append((first, stop, list(columns)))
+        return original(self, first, stop, columns)
+
+    monkeypatch.setattr(dataset_io._Layout, "read", spy)
+    got = read_dataset(path, ["label_R_H3_pct"], "2025-01-09", "2025-01-10 12:00")
+    ref = df.loc["2025-01-09":"2025-01-10 12:00", ["label_R_H3_pct"]]
+    pd.testing.assert_frame_equal(got, ref, check_freq=False)
+    # 2016-row groups: days 8-14 live in group 1 only.
+    assert reads == [(1, 2, ["label_R_H3_pct"])]
+    assert read_dataset(path, [], start="2026-01-01").empty
+    with pytest.raises(KeyError):
+        read_dataset(path, ["f_missing"])
+
+
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_time_bounds_match_pandas_slicing(tmp_path, tz):
+    df = _frame(3000, tz)
+    path, _ = write_dataset(df, tmp_path / "d.parquet", row_group_rows=500)
+    for start, end in [
+        (None, "2025-01-03"),
+        ("2025-01-02 03:00", None),
+        (pd.Timestamp("2025-01-05 01:00", tz="UTC"), "2025-01-07"),
+    ]:
+        got = read_dataset(path, start=start, end=end)
+        lo = pd.Timestamp(start) if start is not None else df.index[0]
+        hi = pd.Timestamp(end) if end is not None else df.index[-1]
+        if tz is None:
+            lo, hi = (t.tz_localize(None) if t.tz else t for t in (lo, hi))
+        elif lo.tz is None or hi.tz is None:
+            lo, hi = (t if t.tz else t.tz_localize(tz) for t in (lo, hi))
+        ref = df[(df.index >= lo) & (df.index <= hi)]
+        pd.testing.assert_frame_equal(got, ref, check_freq=False)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from scripts.training.evaluate_wfo import block_metrics, build_blocks, evaluate_blocks
+
+
+def reference_metrics(df, label_col, test_from, test_to):
+    # Boolean-mask implementation the slice-based evaluation replaces.
+    block = df.loc[(df.index >= test_from) & (df.index < test_to)]
+    n = len(block)
+    if n == 0:
+        return None
+    label = block[label_col]
+    cum_label = label.cumsum()
+    return {
+        "n": n,
+        "nan_ratio": float(block.isna().sum().sum() / (n * len(block.columns))),
+        "trigger_rate": float(np.mean(label > 0)),
+        "mean_R": float(np.mean(label)),
+        "hit_rate": float(np.mean(label > 0)),
+        "dd_min": float((cum_label.cummax() - cum_label).min()),
+    }
+
+
+def make_frame(n=20000, dtype=np.float64, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "f_ret_1": rng.normal(size=n),
+            "f_vol_z": rng.normal(size=n),
+            "label_R_H3_pct": rng.normal(0, 0.01, size=n),
+        },
+        index=idx,
+    ).astype(dtype)
+    df.iloc[rng.choice(n, 300, replace=False), 0] = np.nan
+    df.iloc[rng.choice(n, 300, replace=False), 2] = np.nan
+    # One fully missing stretch of labels inside a block.
+    df.iloc[5000:5400, 2] = np.nan
+    return df
+
+
+def assert_same(got, want):
+    if want is None:
+        assert got is None
+        return
+    assert got.keys() == want.keys()
+    for key, value in want.items():
+        assert (np.isnan(value) and np.isnan(got[key])) or got[key] == value, key
+
+
+def test_blocks_match_mask_reference():
+    for dtype in (np.float64, np.float32):
+        df = make_frame(dtype=dtype)
+        blocks = build_blocks(
+            df.index[0], "2025-01-01", "2025-03-15", block_days=1, gap_days=0
+        )
+        # Includes blocks past the end of the data (empty -> None).
+        assert len(blocks) > 70
+        for workers in (1, 3):
+            metrics = evaluate_blocks(df, "label_R_H3_pct", blocks, workers)
+            assert len(metrics) == len(blocks)
+            for b, m in zip(blocks, metrics):
+                want = reference_metrics(
+                    df, "label_R_H3_pct", b["test_from"], b["test_to"]
+                )
+                assert_same(m, want)
+
+
+def test_single_block_and_all_nan_label():
+    df = make_frame(n=2000)
+    df.iloc[:600, 2] = np.nan
+    for test_from, test_to in [
+        ("2025-01-01 00:00:00+00:00", "2025-01-01 12:00:00+00:00"),
+        ("2025-01-01 06:00:00+00:00", "2025-01-02 06:00:00+00:00"),
+        ("2025-02-01 00:00:00+00:00", "2025-02-02 00:00:00+00:00"),
+    ]:
+        assert_same(
+            block_metrics(df, "label_R_H3_pct", test_from, test_to),
+            reference_metrics(df, "label_R_H3_pct", test_from, test_to),
+        )
@@ -0,0 +1,186 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from scripts.training.evaluate_wfo import (
+    build_blocks,
+    label_horizon,
+    refit_blocks,
+    train_bounds,
+)
+from scripts.training.train_baseline import (
+    SKLEARN_AVAILABLE,
+    regularization_path,
+    train_ols_tikhonov,
+)
+from src.matrix.strategy.mapping import map_predictions_to_signals
+from src.matrix.strategy.signal_metrics import signal_metrics
+
+FEATURES = ["f_a", "f_b", "f_c"]
+MAPPER = {"up": 0.002, "dn": -0.002, "hysteresis": 0.001, "cooldown_bars": 3}
+
+
+def make_frame(n=12000, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    X = rng.normal(size=(n, 3))
+    y = X @ np.array([0.002, -0.001, 0.0005]) + rng.normal(0, 0.002, size=n)
+    df = pd.DataFrame(X, index=idx, columns=FEATURES)
+    df["label_R_H3_pct"] = y
+    df.iloc[100:140, 0] = np.nan
+    df.iloc[rng.choice(n, 50, replace=False), 3] = np.nan
+    return df
+
+
+def test_refit_matches_per_block_fit():
+    df = make_frame()
+    blocks = build_blocks(df.index[0], "2025-01-10", "2025-02-15", 2, 0)
+    for workers in (1, 3):
+        metrics = refit_blocks(
+            df,
+            FEATURES,
+            "label_R_H3_pct",
+            blocks,
+            lmbd=0.5,
+            mapper=MAPPER,
+            purge_bars=3,
+            workers=workers,
+        )
+        assert len(metrics) == len(blocks)
+        checked = 0
+        for b, m in zip(blocks, metrics):
+            test = df.loc[(df.index >= b["test_from"]) & (df.index < b["test_to"])]
+            if test.empty:
+                assert m is None
+                continue
+            train = df.loc[(df.index >= b["train_from"]) & (df.index <= b["train_to"])]
+            train = train.iloc[: len(train) - 3].dropna()
+            model, _ = train_ols_tikhonov(
+                train[FEATURES].to_numpy(), train["label_R_H3_pct"].to_numpy(), 0.5
+            )
+            assert m["n_train"] == len(train)
+            np.testing.assert_allclose(m["coef"], model.coef_, rtol=1e-8, atol=1e-12)
+            pred = model.predict(test[FEATURES].to_numpy())
+            signals = map_predictions_to_signals(pred, **MAPPER)
+            sig = signal_metrics(signals, MAPPER["cooldown_bars"])
+            assert m["n"] == len(test)
+            assert m["n_entries"] == sig["n_entries"]
+            assert m["churn_rate"] == sig["churn_rate"]
+            assert m["n_entries"] > 0
+            label = test["label_R_H3_pct"].to_numpy()
+            side = np.asarray(signals["enter_long"]) - np.asarray(
+                signals["enter_short"]
+            )
+            outcome = np.nan_to_num((side * label)[side != 0])
+            assert m["hit_rate"] == np.mean(outcome > 0)
+            np.testing.assert_allclose(m["pnl"], outcome.sum(), atol=1e-12)
+            cum = np.concatenate(([0.0], np.cumsum(outcome)))
+            dd = (np.maximum.accumulate(cum) - cum).max()
+            np.testing.assert_allclose(m["max_dd"], dd, atol=1e-12)
+            checked += 1
+        assert checked >= 15
+
+
+def test_refit_with_intercept_matches_ridge():
+    df = make_frame(n=6000, seed=1)
+    df["label_R_H3_pct"] += 0.003
+    blocks = build_blocks(df.index[0], "2025-01-08", "2025-01-20", 2, 0)
+    metrics = refit_blocks(
+        df,
+        FEATURES,
+        "label_R_H3_pct",
+        blocks,
+        0.5,
+        MAPPER,
+        purge_bars=3,
+        workers=2,
+        fit_intercept=True,
+    )
+    checked = 0
+    for b, m in zip(blocks, metrics):
+        if m is None:
+            continue
+        train = df.loc[(df.index >= b["train_from"]) & (df.index <= b["train_to"])]
+        train = train.iloc[: len(train) - 3].dropna()
+        # Closed-form path with fit_intercept reproduces sklearn Ridge
+        coefs, intercepts, _ = regularization_path(
+            train[FEATURES].to_numpy(),
+            train["label_R_H3_pct"].to_numpy(),
+            [0.5],
+            fit_intercept=True,
+        )
+        assert m["n_train"] == len(train)
+        np.testing.assert_allclose(m["coef"], coefs[0], rtol=1e-7, atol=1e-12)
+        np.testing.assert_allclose(m["intercept"], intercepts[0], rtol=1e-7)
+        assert abs(m["intercept"] - 0.003) < 5e-4
+        checked += 1
+    assert checked >= 5
+
+
+def test_label_horizon():
+    assert label_horizon("label_R_H3_pct") == 3
+    assert label_horizon("label_R_H12_log") == 12
+    assert label_horizon("target") is None
+
+
+def test_train_bounds_expanding_and_purged():
+    df = make_frame(n=3000)
+    blocks = build_blocks(df.index[0], "2025-01-03", "2025-01-10", 1, 0)
+    lo, hi = train_bounds(df.index, blocks, purge_bars=12)
+    assert (lo == 0).all()
+    # train_to is the bar before test_from; 12 bars are purged before it
+    for b, h in zip(blocks, hi):
+        assert h == df.index.searchsorted(pd.Timestamp(b["test_from"])) - 12
+    assert (np.diff(hi) > 0).all()
+
+
+def test_refit_cli_smoke(tmp_path):
+    df = make_frame(n=6000)
+    dataset = tmp_path / "dataset.pkl"
+    df.to_pickle(dataset)
+    out_json = tmp_path / "wfo.json"
+    out_md = tmp_path / "wfo.md"
+    cmd = [
+        sys.executable,
+        "scripts/training/evaluate_wfo.py",
+        "--dataset",
+        str(dataset),
+        "--label-name",
+        "label_R_H3_pct",
+        "--from",
+        "2025-01-05",
+        "--to",
+        "2025-01-20",
+        "--block-days",
+        "2",
+        "--out-json",
+        str(out_json),
+        "--out-md",
+        str(out_md),
+        "--run-tag",
+        "REFIT",
+        "--refit",
+        "--up",
+        "0.002",
+        "--dn",
+        "-0.002",
+        "--hysteresis",
+        "0.001",
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    data = json.loads(out_json.read_text())
+    assert data["mode"] == "refit"
+    assert data["model"]["type"] == ("ridge" if SKLEARN_AVAILABLE else "ols")
+    # --purge-bars defaults to H of the label name
+    assert data["params"]["purge_bars"] == 3
+    assert data["features"] == FEATURES
+    assert len(data["blocks"]) == 8
+    for b in data["blocks"]:
+        for k in ["n_train", "n", "coef", "r2", "hit_rate", "max_dd", "churn_rate"]:
+            assert k in b
+    assert data["blocks"][0]["n_train"] < data["blocks"][-1]["n_train"]
+    assert "| n_train |" in out_md.read_text()
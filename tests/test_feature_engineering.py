@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.matrix.feature.engineering import FeaturePipeline, make_features
+from src.matrix.freqai.hooks import generate_features, generate_labels
+
+
+def _features(n, seed):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n, 4)) @ rng.normal(size=(4, 4))
+    base[::50, 1] *= 40  # outliers
+    base[:, 3] = base[:, 0] * 2 + rng.normal(0, 0.01, n)
+    return pd.DataFrame(base, columns=["f_a", "f_b", "f_c", "f_d"])
+
+
+def _reference(train, X, k, n_comp):
+    q25, med, q75 = np.percentile(train, [25, 50, 75], axis=0)
+    iqr = q75 - q25
+
+    def scale(A):
+        return (np.clip(A, q25 - k * iqr, q75 + k * iqr) - med) / iqr
+
+    S = scale(train)
+    if n_comp is None:
+        return scale(X)
+    mean = S.mean(axis=0)
+    _, _, vt = np.linalg.svd(S - mean, full_matrices=False)
+    return (scale(X) - mean) @ vt[:n_comp].T
+
+
+@pytest.mark.parametrize("pca", [None, 2])
+def test_fused_transform_matches_stepwise(pca):
+    train, test = _features(400, 0), _features(100, 1)
+    pipe = FeaturePipeline(clip_iqr=1.5, pca_components=pca).fit(train)
+    got = pipe.transform(test)
+    ref = _reference(train.to_numpy(), test.to_numpy(), 1.5, pca)
+    if pca is not None:
+        ref *= np.sign(ref[:1] * got[:1])  # components are defined up to sign
+    np.testing.assert_allclose(got, ref, atol=1e-10)
+    assert pipe.output_columns == (
+        list(train.columns) if pca is None else ["f_pc_0", "f_pc_1"]
+    )
+
+
+def test_variance_selection_and_roundtrip(tmp_path):
+    train = _features(400, 2)
+    pipe = FeaturePipeline(clip_iqr=None, pca_variance=0.9).fit(train)
+    k = len(pipe.output_columns)
+    assert pipe.explained_variance_ratio_.sum() >= 0.9
+    assert k < 4 and pipe.explained_variance_ratio_[: k - 1].sum() < 0.9
+    loaded = FeaturePipeline.load(pipe.save(tmp_path / "model.pipeline.json"))
+    test = _features(50, 3)
+    np.testing.assert_array_equal(loaded.transform(test), pipe.transform(test))
+    with pytest.raises(ValueError):
+        FeaturePipeline().transform(test)
+
+
+def test_make_features_alignment_and_pipeline():
+    rng = np.random.default_rng(4)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, 300))
+    df = pd.DataFrame(
+        {
+            "open": close * 1.001,
+            "high": close * 1.002,
+            "low": close * 0.998,
+            "close": close,
+            "volume": rng.random(300) * 1000,
+        },
+        index=pd.date_range("2025-01-01", periods=300, freq="5min", tz="UTC"),
+    )
+    features, labels = make_features(df, H=3, vol_window=50)
+    ref = generate_features(df, vol_window=50).iloc[12:]
+    pd.testing.assert_frame_equal(features, ref)
+    pd.testing.assert_series_equal(labels, generate_labels(df, H=3).iloc[12:])
+    pipe = FeaturePipeline().fit(features.iloc[:200])
+    scaled, _ = make_features(df, H=3, vol_window=50, pipeline=pipe)
+    np.testing.assert_array_equal(scaled.to_numpy(), pipe.transform(features))
+    assert scaled.index.equals(features.index)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from scripts.training.build_dataset import build_one
+from src.matrix.feature.store import FeatureStore, feature_key
+from src.matrix.freqai.hooks import generate_features
+
+
+def _ohlcv(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.002, n))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.001,
+            "low": np.minimum(open_, close) * 0.999,
+            "close": close,
+            "volume": rng.random(n) * 1000,
+        },
+        index=pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC"),
+    )
+
+
+def test_store_roundtrip_and_keys(tmp_path):
+    df = _ohlcv(300, 0)
+    store = FeatureStore(tmp_path / "store")
+    first = store.features(df, transform="log", vol_window=50)
+    again = store.features(df, transform="log", vol_window=50)
+    ref = generate_features(df, transform="log", vol_window=50)
+    pd.testing.assert_frame_equal(first, ref)
+    pd.testing.assert_frame_equal(again, ref, check_freq=False)
+    col = again["f_vol_z"].to_numpy()
+    assert not col.flags.writeable  # memory-mapped, read-only
+    assert len(store.entries()) == 1
+
+    key = feature_key(df, transform="log", vol_window=50)
+    assert key != feature_key(df, transform="pct", vol_window=50)
+    assert key != feature_key(df, transform="log", vol_window=20)
+    changed = df.copy()
+    changed.iloc[-1, 3] += 1e-9
+    assert key != feature_key(changed, transform="log", vol_window=50)
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    frames = [_ohlcv(200, seed) for seed in range(3)]
+    probe = FeatureStore(tmp_path / "probe")
+    probe.features(frames[0])
+    entry_bytes = probe.entries()[0][1]
+    store = FeatureStore(tmp_path / "store", max_bytes=2 * entry_bytes)
+    keys = [feature_key(df) for df in frames]
+    store.features(frames[0])
+    store.features(frames[1])
+    assert store.get(keys[0]) is not None  # touch: frames[1] is now the LRU entry
+    store.features(frames[2])
+    assert store.get(keys[0]) is not None
+    assert store.get(keys[1]) is None
+    assert store.get(keys[2]) is not None
+
+
+def test_build_one_with_feature_store(tmp_path):
+    df = _ohlcv(400, 3)
+    csv = tmp_path / "BTC_USDT_5m.csv"
+    df.rename_axis("date").reset_index().to_csv(csv, index=False)
+    store = tmp_path / "features"
+    plain = build_one(csv, "5m", 3, "pct", [1, 3, 12], tmp_path / "plain.parquet")
+    for H, transform in [(3, "pct"), (6, "pct")]:
+        out = tmp_path / f"H{H}.parquet"
+        res = build_one(csv, "5m", H, transform, [1, 3, 12], out, feature_store=store)
+        ref = build_one(csv, "5m", H, transform, [1, 3, 12], tmp_path / "ref.parquet")
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(res["path"]), pd.read_parquet(ref["path"])
+        )
+    assert len(FeatureStore(store).entries()) == 1
+    assert plain["n_rows"] == res["n_rows"] + 3
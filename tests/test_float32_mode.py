@@ -0,0 +1,93 @@
+import json
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from scripts.training.build_dataset import build_one
+from scripts.training.train_baseline import train_ols_tikhonov
+from src.matrix.feature.engineering import FeaturePipeline
+
+
+def _write_csv(path, n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.002, n))
+    pd.DataFrame(
+        {
+            "date": pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.001,
+            "low": np.minimum(open_, close) * 0.999,
+            "close": close,
+            "volume": rng.random(n) * 1000,
+        }
+    ).to_csv(path, index=False)
+
+
+def _train(path, out_json, tag):
+    cmd = [
+        sys.executable,
+        "scripts/training/train_baseline.py",
+        "--dataset",
+        str(path),
+        "--label-name",
+        "label_R_H6_pct",
+        "--train-from",
+        "2025-01-01",
+        "--train-to",
+        "2025-01-31",
+        "--model-tag",
+        tag,
+        "--out-json",
+        str(out_json),
+        # Same near-zero regularization for ridge (sklearn) and OLS
+        "--alpha",
+        "1e-6",
+        "--lmbd",
+        "1e-6",
+        "--robust-scale",
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return json.loads(out_json.read_text())
+
+
+def test_float32_matches_float64_baseline(tmp_path):
+    csv = tmp_path / "BTC_USDT_5m.csv"
+    _write_csv(csv, 3000, 0)
+    runs = {}
+    for dtype in ("float64", "float32"):
+        out = tmp_path / f"{dtype}.parquet"
+        build_one(csv, "5m", 6, "pct", [1, 3, 12], out, dtype=dtype)
+        runs[dtype] = pd.read_parquet(out)
+    f64, f32 = runs["float64"], runs["float32"]
+    assert set(f32.dtypes) == {np.dtype(np.float32)}
+    assert f32.index.equals(f64.index)
+    np.testing.assert_array_equal(f32.to_numpy(), f64.to_numpy().astype(np.float32))
+
+    X64 = f64.drop(columns="label_R_H6_pct").to_numpy()
+    y64 = f64["label_R_H6_pct"].to_numpy()
+    pipe = FeaturePipeline(pca_components=3).fit(X64)
+    Z64, Z32 = pipe.transform(X64), pipe.transform(X64.astype(np.float32))
+    assert Z32.dtype == np.float32
+    np.testing.assert_allclose(Z32, Z64, rtol=1e-4, atol=1e-4)
+    m64, p64 = train_ols_tikhonov(Z64, y64, 1e-6)
+    m32, p32 = train_ols_tikhonov(Z32, y64.astype(np.float32), 1e-6)
+    assert m32.coef_.dtype == np.float32
+    np.testing.assert_allclose(m32.coef_, m64.coef_, rtol=1e-3, atol=1e-7)
+    np.testing.assert_allclose(p32, p64, rtol=1e-3, atol=1e-6)
+
+    try:
+        s64 = _train(tmp_path / "float64.parquet", tmp_path / "s64.json", "TMP_F64")
+        s32 = _train(tmp_path / "float32.parquet", tmp_path / "s32.json", "TMP_F32")
+    finally:
+        for tag in ("TMP_F64", "TMP_F32"):
+            shutil.rmtree(f"models/{tag}", ignore_errors=True)
+    assert (s64["dtype"], s32["dtype"]) == ("float64", "float32")
+    assert s32["train"]["n"] == s64["train"]["n"]
+    for key in ("mae", "mse", "r2"):
+        np.testing.assert_allclose(
+            s32["metrics"][key], s64["metrics"][key], rtol=1e-3, atol=1e-9
+        )
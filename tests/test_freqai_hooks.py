@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.matrix.feature.rolling import rolling_robust_zscore
+from src.matrix.freqai.hooks import (
+    feature_columns,
+    generate_features,
+    generate_labels,
+)
+from src.matrix.infra.freqai_bridge import prepare_inference_data
+
+
+def _ohlcv(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.002, n))
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.001,
+            "low": np.minimum(open_, close) * 0.999,
+            "close": close,
+            "volume": rng.random(n) * 1000,
+        },
+        index=idx,
+    )
+
+
+def _pandas_reference(df, transform):
+    out = pd.DataFrame(index=df.index)
+    for w in (1, 3, 12):
+        if transform == "pct":
+            out[f"f_ret_{w}"] = df["close"].pct_change(w, fill_method="pad")
+        else:
+            out[f"f_ret_{w}"] = np.log(df["close"] / df["close"].shift(w))
+    out["f_hl_range"] = (df["high"] - df["low"]) / df["close"]
+    out["f_oc_range"] = (df["close"] - df["open"]) / df["open"]
+    vol = df["volume"].to_numpy()
+    q75, q25 = np.percentile(vol, [75, 25])
+    out["f_vol_z"] = (vol - np.median(vol)) / (q75 - q25)
+    return out
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+@pytest.mark.parametrize("transform", ["pct", "log"])
+def test_kernel_matches_pandas(transform):
+    df = _ohlcv(300, 1)
+    df.iloc[[0, 50, 51, 200], df.columns.get_loc("close")] = np.nan
+    got = generate_features(df, transform=transform, vol_window=None)
+    pd.testing.assert_frame_equal(got, _pandas_reference(df, transform))
+    assert list(got.columns) == feature_columns()
+    assert got.index.equals(df.index)
+    rolling = generate_features(df, transform=transform, vol_window=50)
+    pd.testing.assert_frame_equal(
+        rolling.drop(columns="f_vol_z"), got.drop(columns="f_vol_z")
+    )
+    np.testing.assert_array_equal(
+        rolling["f_vol_z"].to_numpy(),
+        rolling_robust_zscore(df["volume"].to_numpy(), 50),
+    )
+
+
+def test_short_input_and_inference_path():
+    df = _ohlcv(5, 2)
+    got = generate_features(df)
+    assert got.shape == (5, 6)
+    assert got["f_ret_12"].isna().all()
+    pd.testing.assert_frame_equal(prepare_inference_data(df), got)
+    with pytest.raises(ValueError):
+        generate_features(df, transform="sqrt")
+
+
+@pytest.mark.parametrize("transform", ["pct", "log"])
+def test_multi_horizon_labels_match_single(transform):
+    df = _ohlcv(60, 4)
+    multi = generate_labels(df, H=[1, 3, 12, 0], transform=transform)
+    assert list(multi.columns) == [f"label_R_H{h}_{transform}" for h in (1, 3, 12, 0)]
+    for h in (1, 3, 12, 0):
+        single = generate_labels(df, H=h, transform=transform)
+        ratio = df["close"].shift(-h) / df["close"]
+        ref = ratio - 1 if transform == "pct" else np.log(ratio)
+        pd.testing.assert_series_equal(single, ref.rename(single.name))
+        pd.testing.assert_series_equal(multi[single.name], single)
+    with pytest.raises(ValueError):
+        generate_labels(df, mode="C")
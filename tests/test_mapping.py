@@ -3,7 +3,15 @@ Offline smoke tests for map_predictions_to_signals (no external runner required)
 TODO: Convert to pytest later.
 """
 
-from src.matrix.strategy.mapping import map_predictions_to_signals
+import random
+
+import numpy as np
+
+from src.matrix.strategy.mapping import (
+    map_predictions_grid,
+    map_predictions_to_signals,
+    threshold_grid,
+)
 
 
 def test_cooldown():
@@ -36,8 +44,80 @@ def test_output_shape():
         assert all(x in (0, 1) for x in out[k])
 
 
+def test_numpy_engine_matches_reference():
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randint(0, 60)
+        preds = [
+            rng.choice([rng.uniform(-0.3, 0.3), 0.1, -0.1, 0.09]) for _ in range(n)
+        ]
+        if n and rng.random() < 0.2:
+            preds[rng.randrange(n)] = float("nan")
+        params = dict(
+            up=rng.choice([0.1, 0.05]),
+            dn=rng.choice([-0.1, -0.05]),
+            hysteresis=rng.choice([0.0, 0.02, 0.1, 0.3]),
+            cooldown_bars=rng.choice([0, 1, 2, 5]),
+        )
+        ref = map_predictions_to_signals(preds, **params)
+        fast = map_predictions_to_signals(np.array(preds), engine="numpy", **params)
+        for k in ref:
+            assert fast[k].dtype == np.uint8
+            assert fast[k].tolist() == ref[k], (preds, params, k)
+
+
+def test_unknown_engine_rejected():
+    try:
+        map_predictions_to_signals(
+            [0.2], up=0.1, dn=-0.1, hysteresis=0.0, cooldown_bars=0, engine="gpu"
+        )
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for unknown engine")
+
+
+def test_grid_rows_match_single_calls():
+    rng = np.random.default_rng(3)
+    preds = np.sin(np.arange(300) / 7.0) * 0.2 + rng.uniform(-0.05, 0.05, 300)
+    grid = threshold_grid(
+        up=[0.05, 0.1], dn=[-0.1], hysteresis=[0.0, 0.04], cooldown_bars=[0, 3]
+    )
+    out = map_predictions_grid(preds, grid)
+    assert out["enter_long"].shape == (len(grid), len(preds))
+    for i, (up, dn, hyst, cd) in enumerate(grid):
+        ref = map_predictions_to_signals(
+            preds.tolist(), up=up, dn=dn, hysteresis=hyst, cooldown_bars=int(cd)
+        )
+        for k in ref:
+            assert out[k][i].tolist() == ref[k]
+
+
+def test_grid_stats_match_simulator_metrics():
+    from scripts.sim.simulate_thresholds import compute_metrics
+
+    rng = np.random.default_rng(11)
+    preds = (np.sin(np.arange(500) / 5.0) + rng.uniform(-0.4, 0.4, 500)).tolist()
+    grid = [
+        {"up": 0.1, "dn": -0.1, "hysteresis": 0.02, "cooldown_bars": 3},
+        {"up": 0.3, "dn": -0.2, "hysteresis": 0.5, "cooldown_bars": 0},
+        {"up": 0.0, "dn": -0.5, "hysteresis": 0.0, "cooldown_bars": 1},
+    ]
+    stats = map_predictions_grid(preds, grid, stats_only=True)
+    for i, g in enumerate(grid):
+        ref = compute_metrics(
+            map_predictions_to_signals(preds, **g), preds, g["cooldown_bars"]
+        )
+        assert round(stats["trigger_rate"][i], 4) == ref["trigger_rate"]
+        assert round(stats["long_rate"][i], 4) == ref["long_rate"]
+        assert round(stats["short_rate"][i], 4) == ref["short_rate"]
+        assert round(stats["churn_rate"][i], 4) == ref["churn_rate"]
+        assert round(stats["avg_hold"][i], 2) == ref["avg_hold"]
+
+
 if __name__ == "__main__":
     test_cooldown()
     test_hysteresis()
     test_output_shape()
+    test_numpy_engine_matches_reference()
+    test_grid_rows_match_single_calls()
     print("Mapping smoke tests passed.")
@@ -0,0 +1,74 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from scripts.training.train_baseline import NormalEquations, train_ols_tikhonov
+
+
+def make_xy(n=500, d=5, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, d))
+    y = X @ rng.normal(size=d) + rng.normal(0, 0.1, size=n)
+    return X, y
+
+
+def reference_coef(X, y, lmbd, w=None):
+    w = np.ones(len(y)) if w is None else w
+    A = (X * w[:, None]).T @ X + lmbd * np.eye(X.shape[1])
+    return np.linalg.solve(A, (X * w[:, None]).T @ y)
+
+
+def test_train_ols_tikhonov_matches_direct_solve():
+    X, y = make_xy()
+    for lmbd in (0.0, 0.1, 10.0):
+        model, y_pred = train_ols_tikhonov(X, y, lmbd)
+        np.testing.assert_allclose(model.coef_, reference_coef(X, y, lmbd), rtol=1e-10)
+        np.testing.assert_allclose(y_pred, X @ model.coef_)
+    model, _ = train_ols_tikhonov(X.astype(np.float32), y, 0.1)
+    assert model.coef_.dtype == np.float32
+    np.testing.assert_allclose(model.coef_, reference_coef(X, y, 0.1), rtol=1e-3)
+    # Module-level model class: pickles for --save-model
+    assert pickle.loads(pickle.dumps(model)).coef_.tolist() == model.coef_.tolist()
+
+
+def test_sliding_window_matches_refit():
+    X, y = make_xy()
+    acc = NormalEquations(X.shape[1])
+    acc.add_rows(X[:200], y[:200])
+    for start in range(0, 300, 50):
+        acc.add_rows(X[200 + start : 250 + start], y[200 + start : 250 + start])
+        acc.remove_rows(X[start : start + 50], y[start : start + 50])
+        window = slice(start + 50, start + 250)
+        assert acc.n == 200
+        np.testing.assert_allclose(
+            acc.solve(0.5), reference_coef(X[window], y[window], 0.5), rtol=1e-9
+        )
+
+
+def test_exponential_decay_weights_rows_by_age():
+    X, y = make_xy(n=300)
+    decay = 0.99
+    acc = NormalEquations(X.shape[1], decay=decay)
+    for lo in range(0, 300, 70):
+        acc.add_rows(X[lo : lo + 70], y[lo : lo + 70])
+    acc.remove_rows(X[:40], y[:40])
+    age = np.arange(299, -1, -1)[40:]
+    np.testing.assert_allclose(
+        acc.solve(0.1),
+        reference_coef(X[40:], y[40:], 0.1, decay**age),
+        rtol=1e-9,
+    )
+
+
+def test_rank_deficient_window_and_errors():
+    X, y = make_xy(n=3)
+    coef = NormalEquations(X.shape[1]).add_rows(X, y).solve(0.0)
+    np.testing.assert_allclose(X @ coef, y, atol=1e-9)
+    np.testing.assert_allclose(coef, np.linalg.pinv(X) @ y, atol=1e-9)
+    with pytest.raises(ValueError):
+        NormalEquations(X.shape[1]).add_rows(X, y).remove_rows(
+            np.vstack([X, X]), np.concatenate([y, y])
+        )
+    with pytest.raises(ValueError):
+        NormalEquations(2, decay=0.0)
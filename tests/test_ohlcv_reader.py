@@ -0,0 +1,102 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.matrix.sensor.ohlcv import parse_timestamps, read_ohlcv_csv
+
+SAMPLE = "docs/REPORTS/RAW/OHLCV_SAMPLE.csv"
+ENGINES = [
+    "pandas",
+    pytest.param(
+        "pyarrow",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("pyarrow") is None, reason="pyarrow not installed"
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_matches_read_csv_and_to_datetime(engine):
+    ref = pd.read_csv(SAMPLE)
+    ref["datetime"] = pd.to_datetime(ref["datetime"], utc=True)
+    ref = ref.set_index("datetime")
+    df = read_ohlcv_csv(SAMPLE, engine=engine)
+    pd.testing.assert_frame_equal(df, ref)
+    # Nanosecond index whatever the engine (pyarrow parses to seconds)
+    assert df.index.asi8[0] == ref.index[0].value == 1758268800 * 10**9
+    df32 = read_ohlcv_csv(SAMPLE, dtype="float32", engine=engine)
+    assert (df32.dtypes == np.float32).all()
+
+
+def test_parse_timestamps_epoch_and_iso():
+    ts = pd.Timestamp("2025-01-01 00:05:00", tz="UTC")
+    for values in (
+        [ts.value // 10**9],
+        [ts.value // 10**6],
+        [ts.value // 10**3],
+        [ts.value],
+        ["2025-01-01T00:05:00Z"],
+        ["2025-01-01 00:05:00+00:00"],
+        ["2025-01-01 02:05:00+02:00"],
+    ):
+        assert parse_timestamps(pd.Series(values))[0] == ts
+    with pytest.raises(ValueError, match="Bad timestamp: nope"):
+        parse_timestamps(pd.Series(["2025-01-01 00:00:00", "nope"]))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_skip_rows_usecols_and_missing_time_column(tmp_path, engine):
+    df = read_ohlcv_csv(SAMPLE, skip_rows=5, usecols=["close"], engine=engine)
+    full = read_ohlcv_csv(SAMPLE, engine=engine)
+    pd.testing.assert_frame_equal(df, full.iloc[5:][["close"]])
+    nots = tmp_path / "nots.csv"
+    nots.write_text("open,close\n1,2\n")
+    with pytest.raises(ValueError, match="'date' or 'datetime'"):
+        read_ohlcv_csv(nots, engine=engine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cache_keyed_by_mtime(tmp_path, engine):
+    csv = tmp_path / "BTC_USDT_5m.csv"
+    lines = open(SAMPLE).read().splitlines()
+    csv.write_text("\n".join(lines[:5]) + "\n")
+    cache = tmp_path / "cache"
+    first = read_ohlcv_csv(csv, cache_dir=cache, engine=engine)
+    assert len(list(cache.glob("BTC_USDT_5m.*.parquet"))) == 1
+    pd.testing.assert_frame_equal(read_ohlcv_csv(csv, cache_dir=cache), first)
+    csv.write_text("\n".join(lines) + "\n")
+    os.utime(csv, ns=(1, 10**18))
+    second = read_ohlcv_csv(csv, cache_dir=cache, engine=engine)
+    assert len(second) == len(lines) - 1
+    assert len(list(cache.glob("BTC_USDT_5m.*.parquet"))) == 1
+    by_hash = read_ohlcv_csv(csv, cache_dir=cache, cache_key="hash", engine=engine)
+    pd.testing.assert_frame_equal(by_hash, second)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cache_keeps_same_named_sources(tmp_path, engine):
+    lines = open(SAMPLE).read().splitlines()
+    cache = tmp_path / "cache"
+    frames = []
+    for n, sub in ((5, "a"), (7, "b")):
+        csv = tmp_path / sub / "BTC_USDT_5m.csv"
+        csv.parent.mkdir()
+        csv.write_text("\n".join(lines[:n]) + "\n")
+        frames.append((csv, read_ohlcv_csv(csv, cache_dir=cache, engine=engine)))
+    assert len(list(cache.glob("BTC_USDT_5m.*.parquet"))) == 2
+    for csv, df in frames:
+        pd.testing.assert_frame_equal(read_ohlcv_csv(csv, cache_dir=cache), df)
+
+
+def test_time_format_is_strict():
+    values = pd.Series(["2025-01-01 00:05:00", "2025-01-01T00:10:00"])
+    idx = parse_timestamps(values[:1], "%Y-%m-%d %H:%M:%S")
+    assert idx[0] == pd.Timestamp("2025-01-01 00:05:00", tz="UTC")
+    with pytest.raises(ValueError, match="Bad timestamp: 2025-01-01T00:10:00"):
+        parse_timestamps(values, "%Y-%m-%d %H:%M:%S")
+    with pytest.raises(ValueError, match="Bad timestamp: 1735689900"):
+        parse_timestamps(pd.Series([1735689900]), "%Y-%m-%d %H:%M:%S")
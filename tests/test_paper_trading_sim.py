@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from scripts.trading.paper_trading_sim import (
+    iter_dataset_chunks,
+    run_sim,
+    run_sim_chunked,
+)
+
+
+def _random_ohlc(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, 0.002, n))
+    flat = rng.random(n) < 0.1  # signal 0 bars
+    open_[flat] = close[flat]
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame({"open": open_, "close": close}, index=idx)
+
+
+def test_numpy_engine_matches_loop():
+    for seed, cash in [(0, 1000.0), (1, 150.0), (2, 99.0), (3, 0.0)]:
+        df = _random_ohlc(400, seed)
+        ref = run_sim(df, cash, 0.1, 0.001, engine="loop")
+        fast = run_sim(df, cash, 0.1, 0.001, engine="numpy")
+        assert fast == ref
+
+
+def test_midnight_index_ledger_matches_loop():
+    # Daily bars: every timestamp at midnight (DatetimeIndex.astype(str) would
+    # drop the time, the loop's str(ts) keeps it).
+    from scripts.trading.paper_trading_sim import run_portfolio
+
+    for seed in range(4):
+        df = _random_ohlc(60, seed)
+        df.index = pd.date_range("2025-01-01", periods=len(df), freq="D")
+        ref = run_sim(df, 1000.0, 0.1, 0.001, engine="loop")
+        assert ref["trades"] and ref["trades"][0]["ts"].endswith("00:00:00")
+        assert run_sim(df, 1000.0, 0.1, 0.001, engine="numpy") == ref
+        for sizes in ([1] * 59, [1, 2, 3, 5, 8], [30]):
+            out = run_sim_chunked(_chunks(df, sizes), 1000.0, 0.1, 0.001)
+            out.pop("metrics")
+            assert out == ref
+        report, _ = run_portfolio({"A/USDT": df}, 1000.0, 0.1, 0.001, 1)
+        assert [t["ts"] for t in report["trades"]] == [t["ts"] for t in ref["trades"]]
+
+
+def test_numpy_engine_short_inputs():
+    df = _random_ohlc(1, 4)
+    assert run_sim(df, 1000.0, 0.1, 0.001) == run_sim(
+        df, 1000.0, 0.1, 0.001, engine="loop"
+    )
+
+
+def _portfolio_loop(close, signal, cash, fee, slip, max_open):
+    n, k = close.shape
+    holding = [False] * k
+    trades = []
+    for i in range(n - 1):
+        for p in range(k):
+            nxt = close[i + 1, p]
+            if signal[i, p] == 1 and not holding[p]:
+                cost = nxt * (1 + slip) + fee
+                if sum(holding) < max_open and cash >= cost:
+                    cash -= cost
+                    holding[p] = True
+                    trades.append((i, p, True))
+            elif signal[i, p] == -1 and holding[p]:
+                cash += nxt * (1 - slip) - fee
+                holding[p] = False
+                trades.append((i, p, False))
+    return cash, trades
+
+
+def test_portfolio_matches_reference_loop():
+    from scripts.trading.paper_trading_sim import (
+        run_portfolio,
+        simple_signal_array,
+        simulate_portfolio_arrays,
+    )
+
+    frames = {f"P{j}/USDT": _random_ohlc(300, 10 + j) for j in range(4)}
+    # drop a few bars from one pair so alignment matters
+    frames["P1/USDT"] = frames["P1/USDT"].iloc[::2]
+    common = frames["P1/USDT"].index
+    frames = {k: v.loc[common] for k, v in frames.items()}
+    close = np.column_stack([f["close"].to_numpy() for f in frames.values()])
+    open_ = np.column_stack([f["open"].to_numpy() for f in frames.values()])
+    signal = simple_signal_array(open_, close)
+    for cash, max_open in [(1000.0, 2), (250.0, 4), (1000.0, 1)]:
+        res = simulate_portfolio_arrays(close, signal, cash, 0.1, 0.001, max_open)
+        ref_cash, ref_trades = _portfolio_loop(
+            close, signal, cash, 0.1, 0.001, max_open
+        )
+        got = list(
+            zip(
+                res["trade_bar"].tolist(),
+                res["trade_pair"].tolist(),
+                res["trade_buy"].tolist(),
+            )
+        )
+        assert got == ref_trades
+        assert np.isclose(res["cash"], ref_cash)
+
+    report, equity = run_portfolio(frames, 1000.0, 0.1, 0.001, 2)
+    assert list(equity.columns) == list(frames) + ["portfolio", "drawdown"]
+    assert np.isclose(equity["portfolio"].iloc[-1], report["final_net"])
+
+
+def test_single_pair_portfolio_matches_run_sim():
+    from scripts.trading.paper_trading_sim import run_portfolio
+
+    df = _random_ohlc(500, 7)
+    report, _ = run_portfolio({"BTC/USDT": df}, 1000.0, 0.1, 0.001, 1)
+    single = run_sim(df, 1000.0, 0.1, 0.001)
+    assert [(t["ts"], t["side"]) for t in report["trades"]] == [
+        (t["ts"], t["side"]) for t in single["trades"]
+    ]
+    assert np.isclose(report["final_net"], single["final_net"])
+
+
+def _replay_equity(df, out):
+    # Per-bar replay of the ledger: cash and position change on the fill bar,
+    # the bar after the signal bar whose timestamp the ledger records.
+    by_ts = {t["ts"]: t for t in out["trades"]}
+    cash, units, fee, equity = out["initial_cash"], 0.0, 0.1, []
+    signal_ts = [None] + [str(ts) for ts in df.index[:-1]]
+    for ts, close in zip(signal_ts, df["close"]):
+        t = by_ts.get(ts)
+        if t is not None:
+            if t["side"] == "buy":
+                cash, units = cash - t["price"] - fee, 1.0
+            else:
+                cash, units = cash + t["price"] - fee, 0.0
+        equity.append(cash + units * close)
+    return np.asarray(equity)
+
+
+def test_equity_curve_matches_ledger_replay():
+    df = _random_ohlc(500, 5)
+    for engine in ("numpy", "loop"):
+        out, equity = run_sim(df, 1000.0, 0.1, 0.001, engine, with_equity=True)
+        assert np.allclose(equity["equity"].to_numpy(), _replay_equity(df, out))
+        assert np.isclose(equity["equity"].iloc[-1], out["final_net"])
+        assert (equity["drawdown"] <= 0).all()
+        m = out["metrics"]
+        peak = np.maximum.accumulate(equity["equity"].to_numpy())
+        assert np.isclose(m["max_drawdown"], (peak - equity["equity"]).max())
+        assert np.isclose(m["max_drawdown_pct"], -equity["drawdown"].min())
+        assert 0.0 < m["exposure_time_pct"] < 1.0
+    fast = run_sim(df, 1000.0, 0.1, 0.001, "numpy", with_equity=True)[0]
+    ref = run_sim(df, 1000.0, 0.1, 0.001, "loop", with_equity=True)[0]
+    assert fast == ref
+
+
+def test_equity_on_daily_index_and_rising_path():
+    df = _random_ohlc(60, 11)
+    df.index = pd.date_range("2025-01-01", periods=len(df), freq="D")
+    fast, fast_eq = run_sim(df, 1000.0, 0.1, 0.001, "numpy", with_equity=True)
+    ref, ref_eq = run_sim(df, 1000.0, 0.1, 0.001, "loop", with_equity=True)
+    assert fast == ref
+    assert fast_eq.equals(ref_eq)
+    assert np.allclose(fast_eq["equity"].to_numpy(), _replay_equity(df, fast))
+    # Rising closes, frictionless fills: a position is marked at its own fill
+    # price on the fill bar, so equity never drops.
+    close = np.linspace(100.0, 200.0, 80)
+    rising = pd.DataFrame(
+        {"open": close - np.where(np.arange(80) % 3, 1.0, -1.0), "close": close},
+        index=pd.date_range("2025-01-01", periods=80, freq="D"),
+    )
+    out, equity = run_sim(rising, 1000.0, 0.0, 0.0, with_equity=True)
+    assert len(out["trades"]) > 10
+    assert np.all(np.diff(equity["equity"].to_numpy()) >= -1e-9)
+    assert out["metrics"]["max_drawdown"] < 1e-9
+
+
+def _chunks(df, sizes):
+    start = 0
+    for size in sizes:
+        yield df.iloc[start : start + size]
+        start += size
+    yield df.iloc[start:]
+
+
+def test_chunked_matches_in_memory():
+    df = _random_ohlc(700, 8)
+    ref, equity = run_sim(df, 500.0, 0.1, 0.001, with_equity=True)
+    ref_metrics = ref.pop("metrics")
+    for sizes in ([1, 1, 250, 3], [699], [100] * 6, []):
+        out = run_sim_chunked(_chunks(df, sizes), 500.0, 0.1, 0.001)
+        metrics = out.pop("metrics")
+        assert out == ref
+        assert metrics["exposure_time_pct"] == ref_metrics["exposure_time_pct"]
+        for key in ("max_drawdown", "max_drawdown_pct", "sharpe"):
+            assert np.isclose(metrics[key], ref_metrics[key])
+
+
+def test_chunked_streams_parquet(tmp_path):
+    from fastparquet import write
+
+    df = _random_ohlc(900, 9)
+    src = tmp_path / "ds.parquet"
+    write(str(src), df, row_group_offsets=200)
+    eq_path = tmp_path / "eq.parquet"
+    out = run_sim_chunked(
+        iter_dataset_chunks(src, 200, columns=["open", "close"]),
+        1000.0,
+        0.1,
+        0.001,
+        equity_path=eq_path,
+    )
+    ref, equity = run_sim(df, 1000.0, 0.1, 0.001, with_equity=True)
+    assert out["trades"] == ref["trades"]
+    assert out["final_net"] == ref["final_net"]
+    streamed = pd.read_parquet(eq_path)
+    assert streamed.index.equals(equity.index)
+    assert np.allclose(streamed.to_numpy(), equity.to_numpy())
@@ -0,0 +1,108 @@
+import json
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.training.train_baseline import (
+    compute_metrics,
+    parse_reg_grid,
+    regularization_path,
+    train_ols_tikhonov,
+)
+
+
+def make_xy(n=2000, d=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, d)) + 0.5
+    X[:, -1] = X[:, 0] + 1e-3 * rng.normal(size=n)  # near-collinear pair
+    y = X @ rng.normal(size=d) + 0.3 + rng.normal(0, 1.0, size=n)
+    return X, y
+
+
+def test_path_matches_individual_fits():
+    X, y = make_xy()
+    grid = parse_reg_grid("log:-4:3:15")
+    coefs, intercepts, rows = regularization_path(X, y, grid)
+    assert [r["lmbd"] for r in rows] == grid
+    assert not intercepts.any()
+    for coef, row in zip(coefs, rows):
+        model, y_pred = train_ols_tikhonov(X, y, row["lmbd"])
+        np.testing.assert_allclose(coef, model.coef_, rtol=1e-6, atol=1e-9)
+        ref = compute_metrics(y, y_pred)
+        for key in ("mse", "r2", "resid_mean", "resid_std"):
+            np.testing.assert_allclose(row[key], ref[key], rtol=1e-7, atol=1e-10)
+        resid = y - y_pred
+        hat_df = np.trace(X @ np.linalg.solve(X.T @ X + row["lmbd"] * np.eye(6), X.T))
+        np.testing.assert_allclose(row["df"], hat_df, rtol=1e-8)
+        n = len(y)
+        np.testing.assert_allclose(
+            row["gcv"], n * resid @ resid / (n - hat_df) ** 2, rtol=1e-7
+        )
+
+
+def test_path_with_intercept_matches_centered_fit():
+    X, y = make_xy(seed=1)
+    coefs, intercepts, rows = regularization_path(X, y, [0.0, 1.0, 50.0], True)
+    Xc, yc = X - X.mean(axis=0), y - y.mean()
+    for coef, b0, row in zip(coefs, intercepts, rows):
+        model, _ = train_ols_tikhonov(Xc, yc, row["lmbd"])
+        np.testing.assert_allclose(coef, model.coef_, rtol=1e-6, atol=1e-9)
+        ref = compute_metrics(y, X @ coef + b0)
+        np.testing.assert_allclose(row["mse"], ref["mse"], rtol=1e-7)
+        np.testing.assert_allclose(row["r2"], ref["r2"], rtol=1e-7)
+        assert row["resid_mean"] == 0.0
+
+
+def test_parse_reg_grid():
+    assert parse_reg_grid("0,0.1,1") == [0.0, 0.1, 1.0]
+    assert np.allclose(parse_reg_grid("log:-2:0:3"), [0.01, 0.1, 1.0])
+    assert parse_reg_grid("log:1:1:1") == [10.0]
+    for spec in ("log:-3:3:0", "log:-2:2", "log:-2:2:3:4", "log:a:2:3", "", "-1,2"):
+        with pytest.raises(ValueError, match="Regularization grid needs values"):
+            parse_reg_grid(spec)
+
+
+def test_reg_grid_cli_records_best(tmp_path):
+    X, y = make_xy(n=600)
+    idx = pd.date_range("2025-01-01", periods=len(y), freq="5min", tz="UTC")
+    df = pd.DataFrame(X, index=idx, columns=[f"f_{i}" for i in range(X.shape[1])])
+    df["label_R_H3_pct"] = y
+    dataset = tmp_path / "ds.pkl"
+    df.to_pickle(dataset)
+    out_json = tmp_path / "out.json"
+    cmd = [
+        sys.executable,
+        "scripts/training/train_baseline.py",
+        "--dataset",
+        str(dataset),
+        "--label-name",
+        "label_R_H3_pct",
+        "--train-from",
+        "2025-01-01",
+        "--train-to",
+        "2025-01-03",
+        "--model-tag",
+        "UNIT_TEST_REG_PATH",
+        "--out-json",
+        str(out_json),
+        "--reg-grid",
+        "log:-3:4:100",
+    ]
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    summary = json.loads(out_json.read_text())
+    path = summary["regularization_path"]
+    assert len(path["table"]) == 100
+    best = min(path["table"], key=lambda r: r["gcv"])
+    assert path["best"] == best["lmbd"]
+    assert summary["model"][path["param"]] == best["lmbd"]
+    try:
+        meta = json.loads(open("models/UNIT_TEST_REG_PATH/metadata.json").read())
+    finally:
+        shutil.rmtree("models/UNIT_TEST_REG_PATH", ignore_errors=True)
+    assert meta["regularization_path"]["best"] == best["lmbd"]
+    assert meta["algo"]["params"][path["param"]] == best["lmbd"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from scripts.trading.paper_trading_sim import run_sim, simple_signal_array
+from scripts.trading.robustness_mc import (
+    bootstrap_path,
+    run_monte_carlo,
+    summarize,
+)
+
+
+def _arrays(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, 0.002, n))
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    df = pd.DataFrame({"open": open_, "close": close}, index=idx)
+    return df, close, simple_signal_array(open_, close)
+
+
+def test_unperturbed_run_matches_simulator():
+    df, close, signal = _arrays(600, 11)
+    ref, _ = run_sim(df, 1000.0, 0.1, 0.0, with_equity=True)
+    # Slippage jitter is uniform 0..2x, so only a zero level reproduces the reference.
+    rows = run_monte_carlo(close, signal, 3, 1000.0, [0.1], (0.0, 0.0), [1], 0, 0, 1)
+    for row in rows:
+        assert np.isclose(row["final_net"], ref["final_net"])
+        assert np.isclose(row["max_drawdown"], ref["metrics"]["max_drawdown"])
+        assert row["trades_count"] == len(ref["trades"])
+
+
+def test_results_independent_of_workers():
+    _, close, signal = _arrays(500, 12)
+    args = (close, signal, 10, 1000.0, [0.05, 0.2], (0.0005, 0.003), [1, 2, 3], 50, 7)
+    serial = run_monte_carlo(*args, 1)
+    parallel = run_monte_carlo(*args, 2)
+    assert serial == parallel
+    q = summarize(serial)
+    assert q["final_net"]["p05"] <= q["final_net"]["p50"] <= q["final_net"]["p95"]
+
+
+def test_bootstrap_keeps_bar_returns_with_signals():
+    _, close, signal = _arrays(300, 13)
+    path, sig = bootstrap_path(close, signal, 20, np.random.default_rng(0))
+    ratio, new_ratio = close[1:] / close[:-1], path[1:] / path[:-1]
+    for r, s in zip(new_ratio, sig[1:]):
+        assert np.abs(ratio[signal[1:] == s] - r).min() < 1e-9
+    assert path[0] == close[0] and path.shape == close.shape
+
+
+def test_drawdown_on_rising_path_is_zero():
+    # Long/flat on a strictly rising path without friction never loses value
+    n = 400
+    close = 100.0 * np.cumprod(np.full(n, 1.002))
+    signal = np.where(np.arange(n) % 7 < 4, 1, -1).astype(np.int8)
+    rows = run_monte_carlo(
+        close, signal, 6, 1000.0, [0.0], (0.0, 0.0), [1, 2, 3], 0, 5, 1
+    )
+    for row in rows:
+        assert row["trades_count"] > 0
+        assert row["max_drawdown"] < 1e-9 and row["max_drawdown_pct"] < 1e-12
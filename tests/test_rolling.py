@@ -0,0 +1,72 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from src.matrix.feature.rolling import (
+    IndexableSkiplist,
+    RollingRobustZScore,
+    rolling_robust_zscore,
+)
+
+
+def test_skiplist_matches_sorted_list():
+    rng = random.Random(0)
+    sl, ref = IndexableSkiplist(32, seed=1), []
+    for step in range(3000):
+        if ref and rng.random() < 0.45:
+            value = rng.choice(ref)
+            ref.remove(value)
+            sl.remove(value)
+        else:
+            value = rng.choice([rng.random(), float(rng.randint(0, 4))])
+            ref.append(value)
+            sl.insert(value)
+        if step % 100 == 0:
+            ordered = sorted(ref)
+            assert [sl[k] for k in range(len(sl))] == ordered
+    with pytest.raises(KeyError):
+        sl.remove(-1.0)
+    with pytest.raises(IndexError):
+        sl[len(sl)]
+
+
+def _volume(n, seed):
+    rng = np.random.default_rng(seed)
+    vol = rng.random(n) * 1000
+    vol[::5] = np.round(vol[::5], -2)  # ties
+    vol[40:45] = np.nan
+    vol[60:70] = 7.0  # zero IQR stretch
+    return vol
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 30])
+def test_streaming_matches_batch(window):
+    vol = _volume(400, window)
+    batch = rolling_robust_zscore(vol, window)
+    stream = RollingRobustZScore(window).update_many(vol)
+    np.testing.assert_array_equal(stream, batch)
+
+
+def test_batch_matches_numpy_definition():
+    vol = np.random.default_rng(3).random(200)
+    z = rolling_robust_zscore(vol, 20)
+    for t in (0, 1, 19, 20, 199):
+        win = vol[max(0, t - 19) : t + 1]
+        q75, q25 = np.percentile(win, [75, 25])
+        expected = 0.0 if q75 == q25 else (vol[t] - np.median(win)) / (q75 - q25)
+        assert np.isclose(z[t], expected)
+
+
+def test_snapshot_restore_and_history():
+    vol = _volume(300, 9)
+    full = RollingRobustZScore(25).update_many(vol)
+    live = RollingRobustZScore(25)
+    live.update_many(vol[:150])
+    resumed = RollingRobustZScore.restore(json.loads(json.dumps(live.snapshot())))
+    np.testing.assert_array_equal(resumed.update_many(vol[150:]), full[150:])
+    primed = RollingRobustZScore.from_history(vol[:200], 25)
+    np.testing.assert_array_equal(primed.update_many(vol[200:]), full[200:])
+    with pytest.raises(ValueError):
+        RollingRobustZScore.restore({"version": 0})
@@ -0,0 +1,55 @@
+"""
+Tests for the incremental SignalMapper (must match the batch mapping exactly).
+"""
+
+import json
+import random
+
+from src.matrix.strategy.mapping import map_predictions_to_signals
+from src.matrix.strategy.signal_mapper import SignalMapper
+
+
+def _random_case(rng: random.Random):
+    n = rng.randint(1, 80)
+    preds = [rng.choice([rng.uniform(-0.3, 0.3), 0.1, -0.1]) for _ in range(n)]
+    params = dict(
+        up=0.1,
+        dn=-0.1,
+        hysteresis=rng.choice([0.0, 0.02, 0.2]),
+        cooldown_bars=rng.choice([0, 1, 3]),
+    )
+    return preds, params
+
+
+def test_streaming_matches_batch():
+    rng = random.Random(5)
+    for _ in range(100):
+        preds, params = _random_case(rng)
+        mapper = SignalMapper(**params)
+        assert mapper.update_many(preds) == map_predictions_to_signals(preds, **params)
+
+
+def test_snapshot_restore_resumes_exactly():
+    rng = random.Random(9)
+    for _ in range(100):
+        preds, params = _random_case(rng)
+        cut = rng.randint(0, len(preds))
+        first = SignalMapper(**params)
+        head = first.update_many(preds[:cut])
+        snap = json.loads(json.dumps(first.snapshot()))
+        resumed = SignalMapper.restore(snap)
+        tail = resumed.update_many(preds[cut:])
+        expected = map_predictions_to_signals(preds, **params)
+        for k in expected:
+            assert head[k] + tail[k] == expected[k]
+        assert resumed.bars_seen == len(preds)
+
+
+def test_restore_rejects_unknown_version():
+    snap = SignalMapper(up=0.1, dn=-0.1, hysteresis=0.0, cooldown_bars=0).snapshot()
+    snap["version"] = 99
+    try:
+        SignalMapper.restore(snap)
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for unknown snapshot version")
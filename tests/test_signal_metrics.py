@@ -0,0 +1,77 @@
+"""
+Signal metrics kernel vs. the original two-pass loop from simulate_thresholds.
+"""
+
+import random
+import statistics
+
+import numpy as np
+
+from src.matrix.strategy.mapping import map_predictions_to_signals
+from src.matrix.strategy.signal_metrics import signal_metrics
+
+
+def _legacy_metrics(signals, cooldown):
+    entries = sum(signals["enter_long"]) + sum(signals["enter_short"])
+    exits_lt_cooldown = 0
+    last_entry = None
+    for i, (el, es) in enumerate(zip(signals["enter_long"], signals["enter_short"])):
+        if el or es:
+            last_entry = i
+        if signals["exit_long"][i] or signals["exit_short"][i]:
+            if last_entry is not None and (i - last_entry) < cooldown:
+                exits_lt_cooldown += 1
+            last_entry = None
+    hold_times = []
+    state = None
+    entry_idx = None
+    for i, (el, es) in enumerate(zip(signals["enter_long"], signals["enter_short"])):
+        if el or es:
+            state = "long" if el else "short"
+            entry_idx = i
+        if state and (signals["exit_long"][i] or signals["exit_short"][i]):
+            hold_times.append(i - entry_idx)
+            state = None
+    return entries, exits_lt_cooldown, hold_times
+
+
+def _flat_bars(signals):
+    level = 0
+    flat = 0
+    for i in range(len(signals["enter_long"])):
+        level -= signals["exit_long"][i] + signals["exit_short"][i]
+        level += signals["enter_long"][i] + signals["enter_short"][i]
+        flat += level <= 0
+    return flat
+
+
+def test_kernel_matches_legacy_loops():
+    rng = random.Random(21)
+    for _ in range(150):
+        n = rng.randint(1, 120)
+        preds = [rng.uniform(-0.3, 0.3) for _ in range(n)]
+        cooldown = rng.choice([0, 1, 4])
+        signals = map_predictions_to_signals(
+            preds,
+            up=0.1,
+            dn=-0.1,
+            hysteresis=rng.choice([0.0, 0.05, 0.2]),
+            cooldown_bars=cooldown,
+        )
+        m = signal_metrics(signals, cooldown)
+        entries, churn, holds = _legacy_metrics(signals, cooldown)
+        assert m["n_entries"] == entries
+        assert m["n_churn"] == churn
+        assert m["trigger_rate"] == entries / n
+        assert m["n_holds"] == len(holds)
+        if holds:
+            assert m["avg_hold"] == sum(holds) / len(holds)
+            assert m["hold_median"] == statistics.median(holds)
+            assert np.isclose(m["hold_p90"], np.percentile(holds, 90))
+        assert m["neutral_time_pct"] == _flat_bars(signals) / n
+
+
+def test_empty_signals():
+    empty = {k: [] for k in ("enter_long", "enter_short", "exit_long", "exit_short")}
+    m = signal_metrics(empty, 3)
+    assert m["trigger_rate"] == 0.0 and m["n_entries"] == 0
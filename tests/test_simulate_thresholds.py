@@ -0,0 +1,107 @@
+import csv
+
+import numpy as np
+
+from scripts.sim.simulate_thresholds import (
+    ascii_sparkline,
+    load_preds,
+    parse_range,
+    run_sweep,
+    threshold_grid,
+    write_sweep_table,
+)
+
+
+def test_parse_range_inclusive_and_lists():
+    assert parse_range("0.05:0.2:0.05") == [0.05, 0.1, 0.15, 0.2]
+    assert parse_range("-0.2:-0.1:0.05") == [-0.2, -0.15, -0.1]
+    assert parse_range("0,0.02") == [0.0, 0.02]
+
+
+def test_sweep_pool_matches_inline(tmp_path):
+    rng = np.random.default_rng(0)
+    preds = np.sin(np.arange(2000) / 9.0) + rng.uniform(-0.3, 0.3, 2000)
+    grid = threshold_grid(
+        up=[0.1, 0.3], dn=[-0.1, -0.3], hysteresis=[0.0, 0.05], cooldown_bars=[0, 2]
+    )
+    inline = run_sweep(preds, grid, workers=1)
+    pooled = run_sweep(preds, grid, workers=2)
+    for k in inline:
+        assert np.array_equal(inline[k], pooled[k]), k
+
+    out = tmp_path / "sweep.csv"
+    write_sweep_table(pooled, out)
+    with open(out) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(grid)
+    assert {"trigger_rate", "churn_rate", "avg_hold"} <= set(rows[0])
+
+
+def test_sweep_on_prediction_file(tmp_path):
+    import subprocess
+    import sys
+
+    import pandas as pd
+
+    rng = np.random.default_rng(1)
+    preds = np.sin(np.arange(3000) / 7.0) + rng.uniform(-0.2, 0.2, 3000)
+    np.save(tmp_path / "preds.npy", preds)
+    pd.DataFrame({"label": rng.normal(size=3000), "pred": preds}).to_parquet(
+        tmp_path / "preds.parquet"
+    )
+    assert np.array_equal(load_preds(tmp_path / "preds.npy"), preds)
+    assert np.array_equal(load_preds(tmp_path / "preds.parquet"), preds)
+    grid = threshold_grid(
+        up=[0.2, 0.4], dn=[-0.2], hysteresis=[0.05], cooldown_bars=[1]
+    )
+    expected = run_sweep(preds, grid, workers=1)
+    for name in ("preds.npy", "preds.parquet"):
+        out = tmp_path / f"{name}.csv"
+        cmd = [
+            sys.executable,
+            "scripts/sim/simulate_thresholds.py",
+            "--sweep",
+            "--preds",
+            str(tmp_path / name),
+            "--up-range",
+            "0.2,0.4",
+            "--dn",
+            "-0.2",
+            "--hysteresis",
+            "0.05",
+            "--cooldown",
+            "1",
+            "--workers",
+            "1",
+            "--out",
+            str(out),
+        ]
+        res = subprocess.run(cmd, capture_output=True, text=True)
+        assert res.returncode == 0, res.stderr
+        with open(out) as f:
+            rows = list(csv.DictReader(f))
+        assert [int(r["n_entries"]) for r in rows] == expected["n_entries"].tolist()
+
+
+def test_single_mode_with_nan_predictions(tmp_path):
+    import subprocess
+    import sys
+
+    preds = np.sin(np.arange(200) / 7.0)
+    preds[0] = preds[-1] = np.nan
+    assert ascii_sparkline(preds, width=200)[0] == " "
+    assert ascii_sparkline(preds, width=200)[-1] == " "
+    assert ascii_sparkline([np.nan, np.nan]) == "  "
+    np.save(tmp_path / "preds.npy", preds)
+    out = tmp_path / "summary.md"
+    cmd = [
+        sys.executable,
+        "scripts/sim/simulate_thresholds.py",
+        "--preds",
+        str(tmp_path / "preds.npy"),
+        "--out",
+        str(out),
+    ]
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    assert "Trigger Rate" in out.read_text()
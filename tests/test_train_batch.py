@@ -0,0 +1,137 @@
+import json
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.training.train_baseline import (
+    SKLEARN_AVAILABLE,
+    compute_metrics,
+    train_ols_tikhonov,
+)
+from scripts.training.train_batch import group_jobs, plan_jobs, train_batch
+
+LABELS = ["label_R_H3_pct", "label_R_H6_pct", "label_R_H12_pct"]
+
+
+def make_dataset(path, seed):
+    rng = np.random.default_rng(seed)
+    n = 1500
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    df = pd.DataFrame(
+        rng.normal(size=(n, 3)), index=idx, columns=["f_ret_1", "f_ret_3", "f_vol_z"]
+    )
+    for h, label in zip((3, 6, 12), LABELS):
+        df[label] = df.to_numpy()[:, :3] @ rng.normal(size=3) * h * 1e-3
+    df.to_pickle(path)
+    return df
+
+
+def reference_fit(X, y, job):
+    # Single-label fit with the model train_batch picks (ridge with sklearn)
+    if SKLEARN_AVAILABLE:
+        from sklearn.linear_model import Ridge
+
+        model = Ridge(alpha=job["alpha"]).fit(X, y)
+        return {"type": "ridge", "alpha": job["alpha"]}, model.predict(X)
+    _, y_pred = train_ols_tikhonov(X, y, job["lmbd"])
+    return {"type": "ols", "lmbd": job["lmbd"]}, y_pred
+
+
+def test_batch_matches_single_fits(tmp_path):
+    frames = {
+        pair: make_dataset(tmp_path / f"{pair}.pkl", seed)
+        for seed, pair in enumerate(["BTC_USDT", "ETH_USDT"])
+    }
+    manifest = {
+        "dataset_template": str(tmp_path / "{pair}.pkl"),
+        "model_tag_template": "UNIT_TEST_BATCH_{pair}_{label}",
+        "train_from": "2025-01-01",
+        "train_to": "2025-01-04",
+        "alpha": 0.5,
+        "lmbd": 0.5,
+        "jobs": [{"pair": pair, "label": label} for pair in frames for label in LABELS]
+        + [
+            {
+                "pair": "BTC_USDT",
+                "label": LABELS[0],
+                "alpha": 5.0,
+                "lmbd": 5.0,
+                "model_tag": "UNIT_TEST_BATCH_L5",
+            },
+            {
+                "pair": "BTC_USDT",
+                "label": "label_missing",
+                "model_tag": "UNIT_TEST_BATCH_BAD",
+                "train_to": "2025-01-03",
+            },
+        ],
+    }
+    out_dir = tmp_path / "out"
+    jobs = plan_jobs(manifest, out_dir)
+    # BTC (4 jobs incl. alpha/lmbd=5), ETH (3 jobs), BTC with another window
+    assert [len(g) for g in group_jobs(jobs)] == [4, 3, 1]
+    try:
+        batch = train_batch(manifest, out_dir, workers=2)
+        assert batch["n_jobs"] == 8 and batch["n_groups"] == 3
+        assert batch["n_failed"] == 1
+        assert "label_missing" in batch["jobs"][-1]["error"]
+        for job, entry in zip(jobs[:-1], batch["jobs"][:-1]):
+            df = frames[Path(job["dataset"]).stem]
+            train = df.loc[: pd.Timestamp("2025-01-04", tz="UTC")]
+            X = train[["f_ret_1", "f_ret_3", "f_vol_z"]].to_numpy()
+            model_type, y_pred = reference_fit(X, train[job["label"]], job)
+            summary = json.loads(Path(job["out_json"]).read_text())
+            assert summary["run_tag"] == job["model_tag"]
+            assert summary["train"]["n"] == len(train)
+            assert summary["model"] == model_type
+            ref = compute_metrics(train[job["label"]], y_pred)
+            for key, value in ref.items():
+                np.testing.assert_allclose(
+                    summary["metrics"][key], value, rtol=1e-8, atol=1e-15
+                )
+            meta = json.loads(
+                Path(f"models/{job['model_tag']}/metadata.json").read_text()
+            )
+            assert meta["provenance"]["generator"] == "scripts/training/train_batch.py"
+            assert meta["train_window"]["rows"] == len(train)
+            assert entry["rows"] == len(train)
+        assert not Path("models/UNIT_TEST_BATCH_BAD").exists()
+        assert json.loads((out_dir / "_batch.json").read_text())["n_failed"] == 1
+    finally:
+        for job in jobs:
+            shutil.rmtree(f"models/{job['model_tag']}", ignore_errors=True)
+
+
+def test_save_model_and_pipeline(tmp_path):
+    make_dataset(tmp_path / "ds.pkl", 3)
+    manifest = {
+        "dataset": str(tmp_path / "ds.pkl"),
+        "train_from": "2025-01-01",
+        "train_to": "2025-01-05",
+        "robust_scale": True,
+        "save_model": str(tmp_path / "models" / "{model_tag}.pkl"),
+        "jobs": [
+            {"model_tag": "UNIT_TEST_BATCH_P3", "label": LABELS[0]},
+            {"model_tag": "UNIT_TEST_BATCH_P6", "label": LABELS[1]},
+        ],
+    }
+    for job in manifest["jobs"]:
+        job["save_model"] = manifest["save_model"].format(model_tag=job["model_tag"])
+    try:
+        batch = train_batch(manifest, tmp_path / "out", workers=1)
+        assert batch["n_failed"] == 0 and batch["n_groups"] == 1
+        for job in manifest["jobs"]:
+            with open(job["save_model"], "rb") as f:
+                model = pickle.load(f)
+            assert model.coef_.shape == (3,)
+            meta = json.loads(
+                Path(f"models/{job['model_tag']}/metadata.json").read_text()
+            )
+            assert meta["artifacts"]["pickle_path"] == job["save_model"]
+            assert meta["artifacts"]["pipeline_path"].endswith(".pipeline.json")
+    finally:
+        for job in manifest["jobs"]:
+            shutil.rmtree(f"models/{job['model_tag']}", ignore_errors=True)
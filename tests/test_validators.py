@@ -33,3 +33,27 @@ def test_check_workspace_health_smoke():
     assert "ws_health:" in out
     assert "en_policy_exit:" in out
     assert "registry_check_exact:" in out
+
+
+def test_validate_ohlcv_csv_cli(tmp_path):
+    path = "scripts/qa/validate_ohlcv_csv.py"
+    sample = "docs/REPORTS/RAW/OHLCV_SAMPLE.csv"
+    code, out = run_script(path, ["--file", sample, "--timeframe", "5m"])
+    assert code == 0
+    assert "Checked 8 rows: OK" in out
+    lines = open(sample).read().splitlines()
+    bad = tmp_path / "bad.csv"
+    bad.write_text("\n".join(lines[:3] + ["2025-09-19 08:aa:00" + lines[3][19:]]))
+    code, out = run_script(path, ["--file", str(bad), "--timeframe", "5m"])
+    assert code == 1
+    assert "Bad timestamp: 2025-09-19 08:aa:00" in out
+    iso = tmp_path / "iso.csv"
+    iso.write_text("\n".join(lines[:3] + ["2025-09-19T08:10:00" + lines[3][19:]]))
+    code, out = run_script(path, ["--file", str(iso), "--timeframe", "5m"])
+    assert code == 1
+    assert "Bad timestamp: 2025-09-19T08:10:00" in out
+    dup = tmp_path / "dup.csv"
+    dup.write_text("\n".join(lines[:3] + [lines[2]]))
+    code, out = run_script(path, ["--file", str(dup), "--timeframe", "5m"])
+    assert code == 1
+    assert "not strictly increasing" in out